@@ -1,69 +1,163 @@
-from typing import List, Dict, Optional
+import heapq
+import sys
+import time
+from typing import Callable, List, Dict, Optional
 from datetime import datetime, date
-import re
+import knowledge
+import tasks
 from tasks import load_tasks
-from knowledge import load_knowledge
+from knowledge import load_knowledge, add_entry
+from session import file_stat
+from text_index import KnowledgeGaps, KnowledgeIndex, entry_text
+
+class RecentItems:
+    """The ``n`` largest items by ``key``, kept in a bounded min-heap.
+
+    Matches ``sorted(items, key=key, reverse=True)[:n]``, including the
+    order of ties, but adding an item costs O(log n).
+    """
+
+    def __init__(self, key: Callable[[Dict], object], n: int = 3):
+        self.key = key
+        self.n = n
+        self.rebuild([])
+
+    def rebuild(self, items: List[Dict]):
+        self._seq = 0
+        self._heap: List[tuple] = []
+        for item in items:
+            self.add(item)
+
+    def add(self, item: Dict):
+        # earlier items win ties, as with a stable reverse sort
+        entry = (self.key(item), -self._seq, item)
+        self._seq += 1
+        if len(self._heap) < self.n:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self) -> List[Dict]:
+        return [entry[2] for entry in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
+
 
 class AIAgent:
-    """AI agent that provides intelligent suggestions based on tasks and knowledge."""
+    """AI agent that provides intelligent suggestions based on tasks and knowledge.
+
+    With a ``session.DataSession`` the agent shares the session's in-memory
+    lists and updates its indexes from the session's change events instead
+    of reloading the JSON files. Without one it reloads (and rebuilds the
+    brief) only when either file's mtime or size changed.
+    """
 
-    def __init__(self):
+    def __init__(self, session=None):
+        self.session = session
         self.tasks = []
         self.knowledge = []
-        self.refresh_data()
+        self.knowledge_index = KnowledgeIndex()
+        self.gaps = KnowledgeGaps()
+        # materialized daily brief: kept current from change events
+        self.recent_tasks = RecentItems(lambda t: t.get('id', 0))
+        self.recent_knowledge = RecentItems(lambda e: e['created_at'])
+        self._focus_relevance: Optional[tuple] = None  # (task id, entries)
+        self._brief: Optional[str] = None
+        self._stats: Optional[tuple] = None  # (tasks, knowledge) file stats at the last load
+        if session is not None:
+            session.subscribe(self._on_session_change)
+            self._bind_session()
+        else:
+            self.refresh_data()
 
     def refresh_data(self):
-        """Reload data from storage."""
+        """Reload data from storage if it changed since the last load."""
+        if self.session is not None:
+            self.session.refresh()  # reloads (and re-binds via the event) only if a file changed
+            return
+        stats = (file_stat(tasks.DATA_FILE), file_stat(knowledge.DATA_FILE))
+        if stats == self._stats:
+            return
+        self._stats = stats
         self.tasks = load_tasks()
         self.knowledge = load_knowledge()
+        self._reindex()
+
+    def _reindex(self):
+        self.knowledge_index.build(self.knowledge)
+        # term counts are long-lived: only changed tasks/entries are re-tokenized
+        self.gaps.tasks.sync({t['id']: t['description'] for t in self.tasks})
+        self.gaps.knowledge.sync({e['id']: entry_text(e) for e in self.knowledge})
+        self.recent_tasks.rebuild(self.tasks)
+        self.recent_knowledge.rebuild(self.knowledge)
+        self._focus_relevance = None
+        self._brief = None
+
+    def _bind_session(self):
+        self.tasks = self.session.tasks
+        self.knowledge = self.session.knowledge
+        self._reindex()
+
+    def _on_session_change(self, event: str, item: Optional[Dict]):
+        if event == "reloaded":
+            self._bind_session()
+        elif event == "task_added":
+            self.gaps.tasks.add(item['id'], item['description'])
+            self.recent_tasks.add(item)
+            self._brief = None
+        elif event == "entry_added":
+            self._index_entry(item)
+
+    def _index_entry(self, entry: Dict):
+        self.knowledge_index.add(entry)
+        self.gaps.knowledge.add(entry['id'], entry_text(entry))
+        self.recent_knowledge.add(entry)
+        self._focus_relevance = None
+        self._brief = None
+
+    def add_entry(self, title: str, content: str, tags: Optional[List[str]] = None) -> Dict:
+        """Save a knowledge entry and index it without a full reload."""
+        if self.session is not None:
+            return self.session.add_entry(title, content, tags)
+        self.refresh_data()
+        entry = add_entry(title, content, tags, entries=self.knowledge)
+        self._stats = (self._stats[0], file_stat(knowledge.DATA_FILE))  # our own write
+        self._index_entry(entry)
+        return entry
 
-    def get_relevant_knowledge(self, task_description: str) -> List[Dict]:
-        """Find knowledge entries relevant to a task."""
-        # Extract key terms from task description
-        keywords = re.findall(r'\w+', task_description.lower())
-        
-        relevant_entries = []
-        for entry in self.knowledge:
-            # Check if any keyword matches in title, content, or tags
-            if any(
-                keyword in entry['title'].lower() or
-                keyword in entry['content'].lower() or
-                any(keyword in tag.lower() for tag in entry['tags'])
-                for keyword in keywords
-            ):
-                relevant_entries.append(entry)
-        
-        return relevant_entries
+    def get_relevant_knowledge(self, task_description: str, limit: Optional[int] = None) -> List[Dict]:
+        """Find knowledge entries relevant to a task, best match first."""
+        return self.knowledge_index.search(task_description, limit)
+
+    def _focus_knowledge(self, task: Dict) -> List[Dict]:
+        """Top 2 entries for the focus task, cached until it or the knowledge changes."""
+        if self._focus_relevance is None or self._focus_relevance[0] != task.get('id'):
+            self._focus_relevance = (task.get('id'), self.get_relevant_knowledge(task['description'], limit=2))
+        return self._focus_relevance[1]
 
     def suggest_next_actions(self) -> str:
         """Provide intelligent suggestions for what to do next."""
         if not self.tasks:
             return "No tasks found. Consider adding some tasks to get started!"
 
-        # Sort tasks by creation date (assuming newer = more important)
-        sorted_tasks = sorted(
-            self.tasks,
-            key=lambda x: x.get('id', 0),
-            reverse=True
-        )
+        # Newest tasks first (assuming newer = more important)
+        recent_tasks = self.recent_tasks.items()
 
         suggestions = ["Here's what I suggest:"]
         
         # Suggest the newest task first
-        newest_task = sorted_tasks[0]
+        newest_task = recent_tasks[0]
         suggestions.append(f"\n1. Focus on your newest task: {newest_task['description']}")
         
         # Find relevant knowledge for the newest task
-        relevant_knowledge = self.get_relevant_knowledge(newest_task['description'])
+        relevant_knowledge = self._focus_knowledge(newest_task)
         if relevant_knowledge:
             suggestions.append("\nRelevant knowledge entries that might help:")
-            for entry in relevant_knowledge[:2]:  # Show top 2 relevant entries
+            for entry in relevant_knowledge:  # Show top 2 relevant entries
                 suggestions.append(f"- {entry['title']}: {entry['content'][:100]}...")
 
         # Additional task suggestions
-        if len(sorted_tasks) > 1:
+        if len(recent_tasks) > 1:
             suggestions.append("\nAfter that, consider working on:")
-            for task in sorted_tasks[1:3]:  # Next 2 tasks
+            for task in recent_tasks[1:3]:  # Next 2 tasks
                 suggestions.append(f"- {task['description']}")
 
         return "\n".join(suggestions)
@@ -73,53 +167,64 @@ class AIAgent:
         if not self.tasks or not self.knowledge:
             return "Add some tasks and knowledge entries to get started!"
 
-        # Extract common terms from tasks
-        task_terms = set()
-        for task in self.tasks:
-            terms = re.findall(r'\w+', task['description'].lower())
-            task_terms.update(terms)
-
-        # Extract terms from knowledge base
-        knowledge_terms = set()
-        for entry in self.knowledge:
-            terms = re.findall(r'\w+', entry['title'].lower() + ' ' + entry['content'].lower())
-            knowledge_terms.update(terms)
-
-        # Find terms in tasks that don't have corresponding knowledge entries
-        missing_terms = task_terms - knowledge_terms
-        
+        missing_terms = self.gaps.top(5)
         if missing_terms:
             suggestions = ["Consider adding knowledge entries about:"]
-            for term in list(missing_terms)[:5]:  # Top 5 missing terms
-                suggestions.append(f"- {term}")
+            for term, count in missing_terms:
+                suggestions.append(f"- {term} ({count} task{'s' if count != 1 else ''})")
             return "\n".join(suggestions)
         else:
             return "Your knowledge base seems well-aligned with your tasks!"
 
-    def get_daily_brief(self) -> str:
-        """Get a daily briefing of tasks and relevant knowledge."""
+    def get_daily_brief(self, timings: bool = False) -> str:
+        """Get a daily briefing of tasks and relevant knowledge.
+
+        The brief is materialized and only rebuilt after tasks or knowledge
+        change. With ``timings=True`` a per-phase breakdown is appended.
+        """
+        phases = []
+        started = time.perf_counter()
         self.refresh_data()  # Ensure we have the latest data
-        
+        phases.append(("refresh", time.perf_counter() - started))
+
+        cached = self._brief is not None
+        if not cached:
+            self._brief = self._build_brief(phases)
+        if not timings:
+            return self._brief
+
+        lines = ["", "⏱ Timings" + (" (cached brief)" if cached else "")]
+        lines.extend(f"- {name}: {seconds * 1000:.2f} ms" for name, seconds in phases)
+        lines.append(f"- total: {(time.perf_counter() - started) * 1000:.2f} ms")
+        return self._brief + "\n" + "\n".join(lines)
+
+    def _build_brief(self, phases: List[tuple]) -> str:
         sections = ["📋 Daily Brief"]
         
         # Task summary
+        started = time.perf_counter()
         task_count = len(self.tasks)
         sections.append(f"\nTasks: {task_count} total")
         if self.tasks:
             sections.append("Recent tasks:")
-            for task in sorted(self.tasks, key=lambda x: x.get('id', 0), reverse=True)[:3]:
+            for task in self.recent_tasks.items():
                 sections.append(f"- {task['description']}")
+        phases.append(("tasks", time.perf_counter() - started))
 
         # Knowledge summary
+        started = time.perf_counter()
         knowledge_count = len(self.knowledge)
         sections.append(f"\nKnowledge Base: {knowledge_count} entries")
         if self.knowledge:
             sections.append("Recent entries:")
-            for entry in sorted(self.knowledge, key=lambda x: x['created_at'], reverse=True)[:3]:
+            for entry in self.recent_knowledge.items():
                 sections.append(f"- {entry['title']}")
+        phases.append(("knowledge", time.perf_counter() - started))
 
         # Add suggestions
+        started = time.perf_counter()
         sections.append("\n" + self.suggest_next_actions())
+        phases.append(("suggestions", time.perf_counter() - started))
         
         return "\n".join(sections)
 
@@ -128,7 +233,7 @@ def main():
     agent = AIAgent()
     print("Testing AI Agent...")
     print("\n=== Daily Brief ===")
-    print(agent.get_daily_brief())
+    print(agent.get_daily_brief(timings="--timings" in sys.argv))
     print("\n=== Knowledge Gap Analysis ===")
     print(agent.analyze_knowledge_gaps())
 
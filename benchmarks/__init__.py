@@ -0,0 +1,9 @@
+"""Storage and agent benchmarks over synthetic data.
+
+    python -m benchmarks --sizes 1000 10000 --output results.json
+    python -m benchmarks --sizes 1000 10000 --baseline results.json
+
+``datagen`` builds the datasets, ``scenarios`` holds the targets and timed
+scenarios, and ``__main__`` runs them, writes JSON results and compares
+them with a saved baseline.
+"""
@@ -0,0 +1,108 @@
+"""Time storage scenarios on synthetic data and compare with a saved baseline."""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from .datagen import generate
+from .scenarios import ALL_SCENARIOS, TARGETS, run_target
+
+Key = Tuple[str, str, int]
+
+
+def _key(result: Dict) -> Key:
+    return (result["target"], result["scenario"], result["size"])
+
+
+def compare(
+    results: List[Dict], baseline: List[Dict], threshold: float, min_ms: float = 0.0
+) -> Tuple[List[str], int]:
+    """Report lines comparing median times with ``baseline``, and the regression count.
+
+    A run slower than ``threshold`` times its baseline is a regression,
+    unless it is less than ``min_ms`` slower in absolute terms (timer noise
+    on microsecond operations). One faster than ``1 / threshold`` is
+    marked as an improvement.
+    """
+    before = {_key(r): r for r in baseline}
+    lines = [f"{'target':<14} {'scenario':<18} {'size':>8} {'baseline':>12} {'now':>12} {'ratio':>7}"]
+    regressions = 0
+    for result in results:
+        old = before.get(_key(result))
+        if old is None:
+            continue
+        ratio = result["median_ms"] / old["median_ms"] if old["median_ms"] else float("inf")
+        mark = ""
+        if ratio > threshold and result["median_ms"] - old["median_ms"] > min_ms:
+            mark = "  REGRESSION"
+            regressions += 1
+        elif ratio < 1 / threshold:
+            mark = "  faster"
+        lines.append(
+            f"{result['target']:<14} {result['scenario']:<18} {result['size']:>8}"
+            f" {old['median_ms']:>10.3f}ms {result['median_ms']:>10.3f}ms {ratio:>6.2f}x{mark}"
+        )
+    return lines, regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__)
+    p.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000],
+                   help="tasks per dataset (knowledge: size/2, conversations: size/10)")
+    p.add_argument("--targets", nargs="+", choices=list(TARGETS), default=list(TARGETS))
+    p.add_argument("--scenarios", nargs="+", choices=ALL_SCENARIOS, default=ALL_SCENARIOS)
+    p.add_argument("--ops", type=int, default=20, help="timed calls per scenario")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--output", type=Path, help="write results as JSON (usable as a baseline)")
+    p.add_argument("--baseline", type=Path, help="compare with results saved by --output")
+    p.add_argument("--threshold", type=float, default=1.25,
+                   help="slowdown ratio reported as a regression")
+    p.add_argument("--min-ms", type=float, default=0.05,
+                   help="ignore slowdowns smaller than this many milliseconds")
+    p.add_argument("--fail-on-regression", action="store_true", help="exit 1 if any scenario regressed")
+    args = p.parse_args(argv)
+
+    results: List[Dict] = []
+    for size in args.sizes:
+        data = generate(size, args.seed)
+        for target in args.targets:
+            with tempfile.TemporaryDirectory() as tmp:
+                for result in run_target(target, data, Path(tmp), args.scenarios, args.ops, args.seed):
+                    results.append(result)
+                    print(
+                        f"{target:<14} {result['scenario']:<18} {size:>8}"
+                        f" median {result['median_ms']:10.3f} ms  p95 {result['p95_ms']:10.3f} ms"
+                        f"  ({result['ops']} ops)",
+                        flush=True,
+                    )
+
+    if args.output:
+        meta = {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "ops": args.ops,
+        }
+        args.output.write_text(json.dumps({"meta": meta, "results": results}, indent=2))
+        print(f"\nresults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        lines, regressions = compare(results, baseline["results"], args.threshold, args.min_ms)
+        print(f"\ncompared with {args.baseline} ({baseline['meta'].get('created', '?')}):")
+        print("\n".join(lines))
+        print(f"{regressions} regression(s) beyond {args.threshold:.2f}x")
+        if regressions and args.fail_on_regression:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
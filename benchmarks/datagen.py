@@ -0,0 +1,121 @@
+"""Synthetic tasks, knowledge entries and conversations for the benchmarks.
+
+Text is drawn from a fixed vocabulary with Zipf-like word frequencies, so
+a few words are common (broad searches) and most are rare (selective
+ones), as in real notes. Everything is derived from ``seed``: the same
+arguments always produce the same dataset.
+"""
+from __future__ import annotations
+
+import random
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List
+
+from pkms.models import Task
+
+VERBS = (
+    "write review plan fix update call email draft prepare schedule book clean buy read "
+    "refactor test deploy research outline organize submit renew pay cancel order"
+).split()
+NOUNS = (
+    "report budget sprint meeting invoice proposal slides roadmap release backlog contract "
+    "dentist groceries taxes car insurance garden kitchen newsletter database migration api "
+    "docs tests server laptop backup flight hotel passport interview resume blog podcast "
+    "course chapter thesis paper dataset dashboard metrics pipeline cache index query schema "
+    "benchmark profile memory latency throughput network router firewall password account"
+).split()
+QUALIFIERS = (
+    "quarterly weekly monthly annual urgent draft final shared team personal client "
+    "internal public legacy new old first second"
+).split()
+TAGS = "work home errands health money learning writing ops infra family travel".split()
+PRIORITIES = ("low", "normal", "high", "urgent")
+PRIORITY_WEIGHTS = (20, 55, 20, 5)
+
+# Zipf-like weights: the word at rank r is drawn with weight 1 / (r + 1)
+_VOCAB = NOUNS + QUALIFIERS
+_WEIGHTS = [1 / (rank + 1) for rank in range(len(_VOCAB))]
+
+TODAY = datetime(2025, 1, 15, 12, 0, 0)
+
+
+@dataclass
+class Dataset:
+    tasks: List[Task]
+    knowledge: List[Dict] = field(default_factory=list)
+    conversations: List[List[Dict]] = field(default_factory=list)
+
+
+def _phrase(rng: random.Random, words: int) -> str:
+    return " ".join([rng.choice(VERBS)] + rng.choices(_VOCAB, _WEIGHTS, k=words - 1))
+
+
+def generate_tasks(n: int, seed: int = 0, today: datetime = TODAY) -> List[Task]:
+    """``n`` pkms tasks with ids 1..n.
+
+    About 40% have a due date within four weeks either side of ``today``,
+    30% are done (completed within the last 60 days) and a quarter carry
+    a note long enough for the summarizer.
+    """
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(1, n + 1):
+        created = today - timedelta(days=rng.randint(0, 120), seconds=rng.randint(0, 86_399))
+        done = rng.random() < 0.3
+        tasks.append(
+            Task(
+                id=i,
+                title=_phrase(rng, rng.randint(3, 7)),
+                priority=rng.choices(PRIORITIES, PRIORITY_WEIGHTS)[0],
+                due=(today.date() + timedelta(days=rng.randint(-28, 28))) if rng.random() < 0.4 else None,
+                tags=rng.sample(TAGS, rng.randint(0, 3)),
+                note=" ".join(_phrase(rng, 8) for _ in range(rng.randint(4, 10))) if rng.random() < 0.25 else None,
+                created_at=created,
+                done=done,
+                done_at=(today - timedelta(days=rng.randint(0, 60))) if done else None,
+            )
+        )
+    return tasks
+
+
+def generate_knowledge(n: int, seed: int = 0) -> List[Dict]:
+    """``n`` knowledge entries as ``{"title", "content", "tags"}`` dicts."""
+    rng = random.Random(seed + 1)
+    return [
+        {
+            "title": " ".join(rng.choices(_VOCAB, _WEIGHTS, k=3)).title(),
+            "content": ". ".join(_phrase(rng, 10) for _ in range(rng.randint(2, 6))),
+            "tags": rng.sample(TAGS, rng.randint(1, 3)),
+        }
+        for _ in range(n)
+    ]
+
+
+def generate_conversations(n: int, seed: int = 0) -> List[List[Dict]]:
+    """``n`` short chat transcripts; user turns ask about task topics."""
+    rng = random.Random(seed + 2)
+    openers = ("what do I know about", "help me", "remind me how to", "any notes on")
+    conversations = []
+    for _ in range(n):
+        turns = []
+        for _ in range(rng.randint(1, 4)):
+            turns.append({"role": "user", "content": f"{rng.choice(openers)} {_phrase(rng, 3)}"})
+            turns.append({"role": "assistant", "content": _phrase(rng, 12)})
+        conversations.append(turns)
+    return conversations
+
+
+def generate(size: int, seed: int = 0) -> Dataset:
+    """Tasks at ``size``, with a knowledge base and chat history scaled to it."""
+    return Dataset(
+        tasks=generate_tasks(size, seed),
+        knowledge=generate_knowledge(max(size // 2, 1), seed),
+        conversations=generate_conversations(max(size // 10, 1), seed),
+    )
+
+
+def search_terms(k: int, seed: int = 0) -> List[str]:
+    """``k`` search keywords with the same frequency skew as the generated text."""
+    rng = random.Random(seed + 3)
+    return rng.choices(_VOCAB, _WEIGHTS, k=k)
@@ -0,0 +1,328 @@
+"""Benchmark targets (one adapter per storage layer) and the timed scenarios.
+
+A target exposes the operations it supports as methods; a scenario is
+skipped for targets that lack its method. ``load`` is the bulk insert of
+the whole dataset and doubles as the ``bulk-add`` scenario.
+"""
+from __future__ import annotations
+
+import contextlib
+import copy
+import io
+import random
+import statistics
+import sys
+import time
+from argparse import Namespace
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# after ROOT, so the root main.py wins over tasks2/main.py
+for _path in (ROOT / "tasks2", ROOT / "tasks5" / "src"):
+    if str(_path) not in sys.path:
+        sys.path.append(str(_path))
+
+import main as pkms_cli  # noqa: E402
+from pkms.models import Task  # noqa: E402
+from pkms.storage import registry  # noqa: E402
+
+from .datagen import Dataset, TODAY, search_terms  # noqa: E402
+
+BATCH = 10_000
+
+
+# --- Targets ----------------------------------------------------------------
+class PkmsTarget:
+    """A pkms backend from the registry, driven through main.py's commands."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+
+    def setup(self, workdir: Path):
+        self.path = workdir / f"tasks.{self.backend}"
+        self.store = registry.open_store(self.backend, self.path)
+        self.args = Namespace(
+            storage=self.backend,
+            **{arg: self.path for arg in pkms_cli.PATH_ARGS.values()},
+            archive_after=0,
+        )
+
+    def close(self):
+        if hasattr(self.store, "close"):
+            self.store.close()
+
+    def load(self, data: Dataset):
+        tasks = data.tasks
+        for start in range(0, len(tasks), BATCH):
+            self.store.put_many(copy.deepcopy(tasks[start : start + BATCH]))
+
+    def add(self, task: Task):
+        self.store.add(task)
+
+    def list(self):
+        return self.store.list()
+
+    def search(self, term: str):
+        return self.store.search(term)
+
+    def complete(self, task_id: int):
+        return self.store.complete(task_id)
+
+    def _cli(self, command: Callable[[Namespace], None]):
+        # the CLI prints its answer; the store is opened per call, as in real use
+        with contextlib.redirect_stdout(io.StringIO()):
+            command(self.args)
+
+    def prioritize(self):
+        self._cli(pkms_cli.cmd_prioritize)
+
+    def weekly_summary(self):
+        self._cli(pkms_cli.cmd_weekly_summary)
+
+
+class Tasks5Target:
+    """The tasks5 TaskStore (``json``) or SQLiteTaskStore (``sqlite``)."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+
+    def setup(self, workdir: Path):
+        from tasks_manager.__main__ import BACKENDS
+
+        store_class, data_file = BACKENDS[self.backend]
+        self.store = store_class(str(workdir / data_file))
+
+    def close(self):
+        if hasattr(self.store, "close"):
+            self.store.close()
+
+    def load(self, data: Dataset):
+        with self.store.batch():
+            for task in data.tasks:
+                self.store.add_task(task.title)
+
+    def add(self, task: Task):
+        self.store.add_task(task.title)
+
+    def list(self):
+        return self.store.get_all_tasks()
+
+    def complete(self, task_id: int):
+        return self.store.toggle_complete(task_id)
+
+
+class Tasks2Target:
+    """The tasks2 TaskManager and KnowledgeManager behind its AIAssistant."""
+
+    def setup(self, workdir: Path):
+        from src.ai_assistant import AIAssistant
+        from src.knowledge_manager import KnowledgeManager
+        from src.task_manager import TaskManager
+
+        self.tasks = TaskManager(str(workdir / "tasks2"))
+        self.knowledge = KnowledgeManager(str(workdir / "tasks2"))
+        self.assistant = AIAssistant(self.tasks, self.knowledge)
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _task(task: Task, task_id: int):
+        from src.task_manager import Task as Tasks2Task
+
+        return Tasks2Task(
+            id=task_id,
+            title=task.title,
+            description=task.note or "",
+            priority=task.priority,
+            due_date=task.due.isoformat() if task.due else None,
+            status="completed" if task.done else "not-started",
+            categories=task.tags[:1],
+            tags=task.tags,
+            created_at=task.created_at.isoformat(),
+            completed_at=task.done_at.isoformat() if task.done_at else None,
+        )
+
+    def load(self, data: Dataset):
+        from src.knowledge_manager import KnowledgeEntry
+
+        self.tasks.tasks = [self._task(t, t.id) for t in data.tasks]
+        self.tasks.save_tasks()
+        now = TODAY.isoformat()
+        self.knowledge.entries = [
+            KnowledgeEntry(
+                id=i, title=e["title"], content=e["content"], categories=e["tags"][:1],
+                tags=e["tags"], references=[], created_at=now, updated_at=now, related_tasks=[],
+            )
+            for i, e in enumerate(data.knowledge, 1)
+        ]
+        self.knowledge.save_entries()
+        self.knowledge._rebuild_relevance()
+
+    def add(self, task: Task):
+        self.tasks.add_task(task.title, task.note or "", task.priority, tags=task.tags)
+
+    def list(self):
+        return self.tasks.search_tasks(status="not-started")
+
+    def search(self, term: str):
+        return self.tasks.search_tasks(query=term)
+
+    def complete(self, task_id: int):
+        return self.tasks.update_task(task_id, status="completed")
+
+    def prioritize(self):
+        return self.assistant.suggest_next_actions()
+
+    def weekly_summary(self):
+        return self.assistant.get_productivity_insights()
+
+    def related_knowledge(self, text: str):
+        # the assistant only reads title and description from the task
+        probe = self._task(Task(None, text, "normal", None, [], None, TODAY, False, None), 0)
+        return self.assistant.find_related_knowledge(probe)
+
+
+class AgentTarget:
+    """Root tasks.py/knowledge.py through a DataSession and the chat AIAgent."""
+
+    def setup(self, workdir: Path):
+        import knowledge
+        import tasks
+        from ai_agent import AIAgent
+        from session import DataSession
+
+        self._modules = {tasks: tasks.DATA_FILE, knowledge: knowledge.DATA_FILE}
+        tasks.DATA_FILE = str(workdir / "tasks_data.json")
+        knowledge.DATA_FILE = str(workdir / "knowledge_data.json")
+        self._tasks, self._knowledge = tasks, knowledge
+        self.session = DataSession()
+        self.agent = AIAgent(self.session)
+
+    def close(self):
+        for module, data_file in self._modules.items():
+            module.DATA_FILE = data_file
+
+    def load(self, data: Dataset):
+        self._tasks.import_tasks(t.title for t in data.tasks)
+        with self._knowledge.batch():
+            entries = self._knowledge.load_knowledge()
+            for e in data.knowledge:
+                self._knowledge.add_entry(e["title"], e["content"], e["tags"], entries=entries, quiet=True)
+        self.session.refresh()
+
+    def add(self, task: Task):
+        with contextlib.redirect_stdout(io.StringIO()):  # tasks.add_task confirms on stdout
+            self.session.add_task(task.title)
+
+    def list(self):
+        return list(self.session.tasks)
+
+    def search(self, term: str):
+        return self._tasks.find_tasks(term, self.session.tasks)
+
+    def prioritize(self):
+        return self.agent.suggest_next_actions()
+
+    def related_knowledge(self, text: str):
+        return self.agent.get_relevant_knowledge(text, limit=5)
+
+    def knowledge_gaps(self):
+        return self.agent.analyze_knowledge_gaps()
+
+
+TARGETS: Dict[str, Callable[[], object]] = {
+    "pkms-json": lambda: PkmsTarget("json"),
+    "pkms-sqlite": lambda: PkmsTarget("sqlite"),
+    "pkms-mmap": lambda: PkmsTarget("mmap"),
+    "tasks5-json": lambda: Tasks5Target("json"),
+    "tasks5-sqlite": lambda: Tasks5Target("sqlite"),
+    "tasks2": Tasks2Target,
+    "agent": AgentTarget,
+}
+
+
+# --- Scenarios --------------------------------------------------------------
+@dataclass
+class Context:
+    data: Dataset
+    rng: random.Random
+    terms: List[str]
+    queries: List[str]
+
+    def new_task(self, i: int) -> Task:
+        return Task(None, f"benchmark task {i}", "normal", None, [], None, TODAY, False, None)
+
+
+# scenario -> (target method, arguments for call i); run in this order, so
+# the mutating scenarios come last and don't change what the reads see
+SCENARIOS: Dict[str, Tuple[str, Callable[[Context, int], tuple]]] = {
+    "list": ("list", lambda ctx, i: ()),
+    "search": ("search", lambda ctx, i: (ctx.terms[i % len(ctx.terms)],)),
+    "prioritize": ("prioritize", lambda ctx, i: ()),
+    "weekly-summary": ("weekly_summary", lambda ctx, i: ()),
+    "related-knowledge": ("related_knowledge", lambda ctx, i: (ctx.queries[i % len(ctx.queries)],)),
+    "knowledge-gaps": ("knowledge_gaps", lambda ctx, i: ()),
+    "add": ("add", lambda ctx, i: (ctx.new_task(i),)),
+    "complete": ("complete", lambda ctx, i: (ctx.rng.randint(1, len(ctx.data.tasks)),)),
+}
+ALL_SCENARIOS = ["bulk-add", *SCENARIOS]
+
+
+def _summary(times_ms: List[float]) -> Dict[str, float]:
+    ordered = sorted(times_ms)
+    return {
+        "ops": len(ordered),
+        "total_ms": sum(ordered),
+        "median_ms": statistics.median(ordered),
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+def run_target(
+    name: str,
+    data: Dataset,
+    workdir: Path,
+    scenarios: Optional[List[str]] = None,
+    ops: int = 20,
+    seed: int = 0,
+) -> List[Dict]:
+    """Load ``data`` into target ``name`` and time each supported scenario.
+
+    Returns one result dict per scenario run. ``bulk-add`` is the timed
+    load itself; every other scenario makes ``ops`` calls and is timed
+    per call.
+    """
+    wanted = scenarios or ALL_SCENARIOS
+    size = len(data.tasks)
+    target = TARGETS[name]()
+    target.setup(workdir)
+    results = []
+    try:
+        start = time.perf_counter()
+        target.load(data)
+        load_ms = (time.perf_counter() - start) * 1000
+        if "bulk-add" in wanted:
+            results.append({"target": name, "scenario": "bulk-add", "size": size,
+                            **_summary([load_ms]), "ops": size})
+        conversation_turns = [
+            turn["content"] for convo in data.conversations for turn in convo if turn["role"] == "user"
+        ]
+        ctx = Context(data, random.Random(seed), search_terms(ops, seed), conversation_turns)
+        for scenario, (method, make_args) in SCENARIOS.items():
+            if scenario not in wanted or not hasattr(target, method):
+                continue
+            call = getattr(target, method)
+            times = []
+            for i in range(ops):
+                args = make_args(ctx, i)
+                t0 = time.perf_counter()
+                call(*args)
+                times.append((time.perf_counter() - t0) * 1000)
+            results.append({"target": name, "scenario": scenario, "size": size, **_summary(times)})
+    finally:
+        target.close()
+    return results
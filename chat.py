@@ -1,5 +1,9 @@
 import cmd
+import contextlib
+import io
+import itertools
 import shlex
+import sys
 from typing import List, Optional
 from datetime import datetime
 
@@ -7,6 +11,23 @@ from tasks import load_tasks, save_tasks, add_task, list_tasks, search_tasks
 from knowledge import load_knowledge, save_knowledge, add_entry, list_entries, search_entries, view_entry
 from ai_agent import AIAgent
 from chat_logger import ChatLogger
+from query_planner import QueryPlanner
+from session import DataSession
+
+class _Tee(io.StringIO):
+    """Writes through to ``stream`` as it goes and keeps a copy."""
+
+    def __init__(self, stream):
+        super().__init__()
+        self.stream = stream
+
+    def write(self, text):
+        self.stream.write(text)
+        return super().write(text)
+
+    def flush(self):
+        self.stream.flush()
+
 
 class ChatInterface(cmd.Cmd):
     """Interactive CLI chat interface for tasks and knowledge management."""
@@ -31,11 +52,11 @@ class ChatInterface(cmd.Cmd):
 
         command = args[0]
         if command == "add" and len(args) > 1:
-            add_task(args[1])
+            self.session.add_task(args[1])
         elif command == "list":
-            list_tasks()
+            list_tasks(self.session.tasks)
         elif command == "search" and len(args) > 1:
-            search_tasks(args[1])
+            search_tasks(args[1], self.session.tasks)
         else:
             print("Invalid task command or missing arguments")
 
@@ -57,15 +78,15 @@ class ChatInterface(cmd.Cmd):
             title = args[1]
             content = args[2]
             tags = args[3].split(",") if len(args) > 3 else []
-            add_entry(title, content, tags)
+            self.agent.add_entry(title, content, tags)
         elif command == "list":
-            list_entries()
+            list_entries(self.session.knowledge)
         elif command == "search" and len(args) > 1:
-            search_entries(args[1])
+            search_entries(args[1], self.session.knowledge)
         elif command == "view" and len(args) > 1:
             try:
                 entry_id = int(args[1])
-                view_entry(entry_id)
+                view_entry(entry_id, self.session.knowledge)
             except ValueError:
                 print("Invalid entry ID")
         else:
@@ -74,7 +95,56 @@ class ChatInterface(cmd.Cmd):
     def __init__(self):
         """Initialize the chat interface with AI agent."""
         super().__init__()
-        self.agent = AIAgent()
+        # one in-memory copy of tasks/knowledge shared by every command
+        self.session = DataSession()
+        self.agent = AIAgent(self.session)
+        self.planner = QueryPlanner(self.session, self.agent)
+        self.logger = ChatLogger()
+
+    def precmd(self, line):
+        """Pick up edits made to the data files by other programs."""
+        self.session.refresh()
+        return line
+
+    def onecmd(self, line):
+        """Run a command; `ask` exchanges are also logged so `history` can show them."""
+        command = line.split(maxsplit=1)[0] if line.strip() else ""
+        if command != "ask":
+            return super().onecmd(line)
+
+        output = _Tee(sys.stdout)
+        try:
+            with contextlib.redirect_stdout(output):
+                return super().onecmd(line)
+        finally:
+            # logged even if the command fails part way, with whatever it printed
+            self.logger.log_message("user", line)
+            text = output.getvalue().strip()
+            if text:
+                self.logger.log_message("assistant", text)
+
+    def do_history(self, arg):
+        """Show recent `ask` questions and answers: history [count]
+        Examples:
+            history
+            history 25
+        """
+        try:
+            count = int(arg) if arg else 10
+        except ValueError:
+            print("Usage: history [count]")
+            return
+
+        # newest-first stream: only the end of the latest day file is read
+        messages = list(itertools.islice(self.logger.iter_messages(), count))
+        if not messages:
+            print("No chat history yet.")
+            return
+        print("🕘 Recent history:")
+        for entry in reversed(messages):
+            when = entry["timestamp"][:16].replace("T", " ")
+            first_line = entry["message"].splitlines()[0] if entry["message"] else ""
+            print(f"{when} {entry['role']}: {first_line[:100]}")
 
     def do_ask(self, arg):
         """Ask a natural language question about your tasks or knowledge.
@@ -90,45 +160,15 @@ class ChatInterface(cmd.Cmd):
             print("Please ask a question!")
             return
 
-        query = arg.lower()
-        
-        # Special AI agent commands
-        if "suggest" in query or "what next" in query or "what should i do" in query:
-            print(self.agent.suggest_next_actions())
-            return
-            
-        if "gap" in query or "missing" in query:
-            print(self.agent.analyze_knowledge_gaps())
-            return
-            
-        if "brief" in query or "summary" in query or "overview" in query:
-            print(self.agent.get_daily_brief())
-            return
-        
-        # Regular search
-        if "task" in query or "todo" in query or "due" in query:
-            print("\nRelevant tasks:")
-            search_tasks(query)
-        
-        if "know" in query or "learn" in query or "find" in query:
-            print("\nRelevant knowledge entries:")
-            search_entries(query)
-            
-        # Find relevant knowledge for tasks
-        if "task" in query and "knowledge" in query:
-            tasks = load_tasks()
-            if tasks:
-                print("\nFinding relevant knowledge for your tasks:")
-                for task in tasks[:3]:  # Look at most recent 3 tasks
-                    relevant = self.agent.get_relevant_knowledge(task["description"])
-                    if relevant:
-                        print(f"\nFor task: {task['description']}")
-                        for entry in relevant[:2]:  # Show top 2 relevant entries
-                            print(f"- {entry['title']}: {entry['content'][:100]}...")
+        # parsed once, answered from the session snapshot, cached per data version
+        answer = self.planner.answer(arg)
+        if answer:
+            print(answer)
 
     def do_exit(self, arg):
         """Exit the chat interface."""
         print("Goodbye! 👋")
+        self.logger.flush()
         return True
 
     def do_help(self, arg):
@@ -138,6 +178,7 @@ class ChatInterface(cmd.Cmd):
             print("  task  - Manage your tasks")
             print("  know  - Manage your knowledge base")
             print("  ask   - Ask questions in natural language")
+            print("  history - Show recent questions and answers")
             print("  exit  - Exit the program")
             print("\nType 'help <command>' for more details on each command.")
         else:
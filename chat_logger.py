@@ -1,57 +1,194 @@
+import atexit
 import json
-from datetime import datetime
+import sqlite3
+import struct
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date as Date, datetime, timedelta
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Iterator, Optional
+
+from conversation_archive import ConversationArchive
+from conversation_index import ConversationIndex
+
+OFFSET = struct.Struct("<Q")  # one little-endian uint64 per logged line
+REVERSE_BATCH = 256  # lines read per seek when walking a day file backwards
+
+# loggers with messages to write at exit; weak, so a logger can still be collected
+_LOGGERS: "weakref.WeakSet[ChatLogger]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_all():
+    for logger in list(_LOGGERS):
+        logger.flush()
+
 
 class ChatLogger:
-    """Logger for storing chat conversations with timestamps."""
-    
-    def __init__(self, log_dir: str = "conversations"):
+    """Logger for storing chat conversations with timestamps.
+
+    Each day is an append-only ``conversation_YYYY-MM-DD.jsonl`` file (one
+    message per line) with a ``.idx`` sidecar holding the byte offset of every
+    line. Messages are buffered and flushed in batches, so logging costs O(1)
+    per message no matter how busy the day is. Older pretty-printed
+    ``conversation_YYYY-MM-DD.json`` files are still read.
+
+    Searches go through a SQLite FTS5 index (``index.sqlite3``) that is fed
+    from the same files as they grow. ``archive`` rolls old days into
+    compressed monthly segments under ``archive/``; reads and searches see
+    archived days exactly like live ones.
+    """
+
+    def __init__(self, log_dir: str = "conversations", flush_every: int = 20,
+                 flush_interval: float = 2.0):
         """Initialize the chat logger.
-        
+
         Args:
             log_dir: Directory where conversation logs will be stored
+            flush_every: Write buffered messages once this many are pending
+            flush_interval: ...or once the oldest pending message is this many seconds
+                old; a background timer flushes an idle session too
         """
         self.log_dir = Path(log_dir)
         self.log_dir.mkdir(exist_ok=True)
         self.current_conversation = []
         self.current_date = datetime.now().strftime("%Y-%m-%d")
         self.current_file = None
-    
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._pending: List[Dict] = []
+        self._pending_since = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()  # guards _pending and _timer
+        self._write_lock = threading.Lock()  # one flush at a time: day file and .idx stay in step
+        try:
+            self.index: Optional[ConversationIndex] = ConversationIndex(self.log_dir / "index.sqlite3")
+        except sqlite3.OperationalError:
+            self.index = None  # SQLite built without FTS5: fall back to scanning
+        self.archives = ConversationArchive(self.log_dir / "archive")
+        _LOGGERS.add(self)
+
     def _get_conversation_file(self) -> Path:
         """Get the current conversation file path."""
-        return self.log_dir / f"conversation_{self.current_date}.json"
-    
+        return self._day_file(self.current_date)
+
+    def _day_file(self, date: str) -> Path:
+        return self.log_dir / f"conversation_{date}.jsonl"
+
+    def _index_file(self, date: str) -> Path:
+        return self.log_dir / f"conversation_{date}.idx"
+
+    def _legacy_file(self, date: str) -> Path:
+        return self.log_dir / f"conversation_{date}.json"
+
+    def _live_dates(self) -> List[str]:
+        """Dates with a day file in log_dir, oldest first."""
+        dates = {
+            file.name[len("conversation_"):].split(".")[0]
+            for pattern in ("conversation_*.jsonl", "conversation_*.json")
+            for file in self.log_dir.glob(pattern)
+        }
+        return sorted(dates)
+
+    def _dates(self) -> List[str]:
+        """All dates with logged messages, live or archived, oldest first."""
+        return sorted(set(self._live_dates()) | set(self.archives.days()))
+
+    def _read_offsets(self, date: str) -> List[int]:
+        """Line offsets for a day, rebuilding the sidecar if it is stale."""
+        data_file = self._day_file(date)
+        if not data_file.exists():
+            return []
+        index_file = self._index_file(date)
+        raw = index_file.read_bytes() if index_file.exists() else b""
+        offsets = [o for (o,) in OFFSET.iter_unpack(raw[:len(raw) - len(raw) % OFFSET.size])]
+        size = data_file.stat().st_size
+        if not offsets:
+            return self._rebuild_index(date) if size else []
+        # the last indexed line must end exactly at EOF, otherwise a write was torn
+        with open(data_file, "rb") as f:
+            f.seek(offsets[-1])
+            tail = f.readline()
+        if offsets[-1] + len(tail) != size:
+            offsets = self._rebuild_index(date)
+        return offsets
+
+    def _rebuild_index(self, date: str) -> List[int]:
+        offsets = []
+        with open(self._day_file(date), "rb") as f:
+            pos = 0
+            for line in f:
+                if line.strip():
+                    offsets.append(pos)
+                pos += len(line)
+        self._index_file(date).write_bytes(b"".join(OFFSET.pack(o) for o in offsets))
+        return offsets
+
     def load_conversations(self, date: str = None) -> List[Dict]:
         """Load conversations for a specific date or current date."""
-        if date:
-            file_path = self.log_dir / f"conversation_{date}.json"
-        else:
-            file_path = self._get_conversation_file()
-            
-        if not file_path.exists():
-            return []
-            
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            return []
-    
+        date = date or self.current_date
+        self.flush()
+
+        return self._load_day(date)
+
     def save_conversations(self):
         """Save the current conversation to file."""
-        file_path = self._get_conversation_file()
-        existing_conversations = self.load_conversations()
-        
-        # Merge existing conversations with current one
-        all_conversations = existing_conversations + self.current_conversation
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(all_conversations, f, indent=2)
-    
+        self.flush()
+
+    def flush(self):
+        """Append all buffered messages to their day files."""
+        with self._write_lock:
+            with self._lock:
+                pending, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if pending:
+                self._write(pending)
+
+    def _write(self, pending: List[Dict]):
+        # caller holds _write_lock
+        by_date: Dict[str, List[Dict]] = {}
+        for entry in pending:
+            by_date.setdefault(entry["timestamp"][:10], []).append(entry)
+
+        for date, entries in by_date.items():
+            if not self._index_file(date).exists() and self._day_file(date).exists():
+                self._rebuild_index(date)
+            offsets = []
+            with open(self._day_file(date), 'ab') as f:
+                f.seek(0, 2)
+                pos = f.tell()
+                for entry in entries:
+                    line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+                    offsets.append(pos)
+                    f.write(line)
+                    pos += len(line)
+            with open(self._index_file(date), 'ab') as f:
+                f.write(b"".join(OFFSET.pack(o) for o in offsets))
+            if self.index:
+                self.index.catch_up(date, self._day_file(date), self._legacy_file(date))
+
+    def _refresh_index(self):
+        """Index log files written by other processes or before the index existed."""
+        known = self.index.sources()
+        # days archived before the index existed, or while it was unavailable
+        for date in self.archives.days():
+            if date not in known:
+                self.index.add_archived(date, self.archives.load_day(date))
+        for date in self._live_dates():
+            indexed_bytes, legacy_indexed = known.get(date, (0, False))
+            day_file = self._day_file(date)
+            size = day_file.stat().st_size if day_file.exists() else 0
+            if size > indexed_bytes or (not legacy_indexed and self._legacy_file(date).exists()):
+                self.index.catch_up(date, day_file, self._legacy_file(date))
+
     def log_message(self, role: str, message: str):
         """Log a message in the current conversation.
-        
+
         Args:
             role: The role of the message sender (user/assistant)
             message: The content of the message
@@ -63,66 +200,218 @@ class ChatLogger:
             "message": message
         }
         self.current_conversation.append(entry)
-        self.save_conversations()
-    
+        with self._lock:
+            if not self._pending:
+                self._pending_since = time.monotonic()
+            self._pending.append(entry)
+            due = (len(self._pending) >= self.flush_every
+                   or time.monotonic() - self._pending_since >= self.flush_interval)
+            if not due and self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if due:
+            self.flush()
+
     def start_new_conversation(self):
         """Start a new conversation."""
+        self.flush()
         self.current_conversation = []
         self.current_date = datetime.now().strftime("%Y-%m-%d")
-    
+
     def get_recent_conversations(self, days: int = 7) -> Dict[str, List[Dict]]:
         """Get conversations from the last n days.
-        
+
         Args:
             days: Number of days to look back
-            
+
         Returns:
             Dictionary with dates as keys and conversations as values
         """
-        conversations = {}
-        log_files = self.log_dir.glob("conversation_*.json")
-        
-        for file in sorted(log_files, reverse=True)[:days]:
-            date = file.stem.replace("conversation_", "")
-            conversations[date] = self.load_conversations(date)
-            
+        self.flush()
+        return self.load_days(list(reversed(self._dates()))[:days])
+
+    def load_days(self, dates: Iterable[str], max_workers: int = 4) -> Dict[str, List[Dict]]:
+        """Load several days in parallel (for exports); keeps the given order."""
+        dates = list(dates)
+        self.flush()
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            loaded = pool.map(self._load_day, dates)
+        return dict(zip(dates, loaded))
+
+    def _load_day(self, date: str) -> List[Dict]:
+        # like load_conversations, minus the flush (not safe to run concurrently)
+        return self.archives.load_day(date) + self._load_live_day(date)
+
+    def _load_live_day(self, date: str) -> List[Dict]:
+        """A day's messages still in log_dir (legacy JSON, then JSONL)."""
+        conversations = list(self._iter_legacy(date))
+        file_path = self._day_file(date)
+        if file_path.exists():
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        conversations.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # torn final line after a crash
         return conversations
-    
-    def search_conversations(self, query: str) -> List[Dict]:
+
+    def iter_messages(self, newest_first: bool = True, since: Optional[str] = None) -> Iterator[Dict]:
+        """Stream messages across days without loading whole days up front.
+
+        Newest-first walks each JSONL day backwards through its offset index,
+        so the first page of history only touches the end of today's file.
+        ``since`` (YYYY-MM-DD) stops the walk at that day.
+        """
+        self.flush()
+        dates = [d for d in self._dates() if not since or d >= since]
+        if not newest_first:
+            for date in dates:
+                yield from self._load_day(date)
+            return
+        for date in reversed(dates):
+            yield from self._iter_day_reversed(date)
+            yield from reversed(list(self._iter_legacy(date)))
+            yield from reversed(self.archives.load_day(date))
+
+    def archive(self, older_than_days: int = 30, retention_days: Optional[int] = None,
+                today: Optional[Date] = None) -> Dict[str, int]:
+        """Compress old days into monthly segments and apply the retention policy.
+
+        Args:
+            older_than_days: Days older than this move into archive/
+            retention_days: If set, logs older than this are deleted outright
+                (whole archived months once every day in them has expired)
+            today: Reference date, for tests
+
+        Returns:
+            Counts of archived and deleted days
+        """
+        self.flush()
+        today = today or Date.today()
+        stats = {"archived": 0, "deleted": 0}
+
+        expired = None
+        if retention_days is not None:
+            expired = (today - timedelta(days=retention_days)).isoformat()
+            for month in self.archives.months():
+                # a month expires once its last possible day is past the cutoff
+                if f"{month}-31" < expired:
+                    for day in self.archives.drop_month(month):
+                        if self.index:
+                            self.index.drop_day(day)
+                        stats["deleted"] += 1
+
+        cutoff = (today - timedelta(days=older_than_days)).isoformat()
+        for day in self._live_dates():
+            if day >= cutoff:
+                break
+            files = [self._legacy_file(day), self._day_file(day), self._index_file(day)]
+            deleted = expired and day < expired
+            if deleted:
+                if self.index:
+                    self.index.drop_day(day)
+                stats["deleted"] += 1
+            else:
+                if self.index:
+                    # make sure search has every message before the day file goes away
+                    self.index.catch_up(day, self._day_file(day), self._legacy_file(day))
+                # only the live part: earlier frames of the day are already archived
+                self.archives.append_day(day, self._load_live_day(day))
+                stats["archived"] += 1
+            for file in files:
+                file.unlink(missing_ok=True)
+            if self.index and not deleted:
+                self.index.mark_archived(day)
+        return stats
+
+    def _iter_legacy(self, date: str) -> Iterator[Dict]:
+        legacy = self._legacy_file(date)
+        if legacy.exists():
+            try:
+                yield from json.loads(legacy.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                return
+
+    def _iter_day_reversed(self, date: str) -> Iterator[Dict]:
+        offsets = self._read_offsets(date)
+        if not offsets:
+            return
+        with open(self._day_file(date), "rb") as f:
+            end = f.seek(0, 2)
+            stop = len(offsets)
+            while stop > 0:
+                start = max(0, stop - REVERSE_BATCH)
+                f.seek(offsets[start])
+                chunk = f.read(end - offsets[start])
+                base = offsets[start]
+                for i in range(stop - 1, start - 1, -1):
+                    line = chunk[offsets[i] - base:(offsets[i + 1] if i + 1 < stop else end) - base]
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                end = offsets[start]
+                stop = start
+
+    def search_conversations(self, query: str, since: Optional[str] = None,
+                             until: Optional[str] = None, role: Optional[str] = None,
+                             limit: Optional[int] = None) -> List[Dict]:
         """Search through all conversations for specific terms.
-        
+
         Args:
-            query: Search term
-            
+            query: Search terms; wrap words in double quotes to match a phrase
+            since: Only messages on or after this YYYY-MM-DD date
+            until: Only messages on or before this YYYY-MM-DD date
+            role: Only messages from this role (user/assistant)
+            limit: Maximum number of results
+
         Returns:
-            List of matching conversation entries
+            List of matching conversation entries, best match first
         """
+        self.flush()
+        if self.index:
+            self._refresh_index()
+            return self.index.search(query, since=since, until=until, role=role, limit=limit)
+
         results = []
-        log_files = self.log_dir.glob("conversation_*.json")
-        
-        for file in log_files:
-            conversations = self.load_conversations(file.stem.replace("conversation_", ""))
+        for date in self._dates():
+            if (since and date < since) or (until and date > until):
+                continue
+            conversations = self.load_conversations(date)
             for entry in conversations:
+                if role and entry["role"] != role:
+                    continue
                 if query.lower() in entry["message"].lower():
                     results.append(entry)
-                    
-        return results
+
+        return results[:limit] if limit else results
 
 def main():
-    """Test the chat logger functionality."""
+    """Test the chat logger functionality, or run `archive [older_than_days] [retention_days]`."""
+    if len(sys.argv) > 1 and sys.argv[1] == "archive":
+        older_than = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+        retention = int(sys.argv[3]) if len(sys.argv) > 3 else None
+        stats = ChatLogger().archive(older_than, retention)
+        print(f"📦 Archived {stats['archived']} day(s), deleted {stats['deleted']} day(s)")
+        return
+
     logger = ChatLogger()
-    
+
     # Test logging some messages
     logger.log_message("user", "Hello AI!")
     logger.log_message("assistant", "Hello! How can I help you today?")
     logger.log_message("user", "Can you help me with Python?")
-    
+
     # Test loading conversations
     conversations = logger.load_conversations()
     print("\nToday's conversations:")
     for conv in conversations:
         print(f"{conv['timestamp']}: {conv['role']} - {conv['message']}")
-    
+
     # Test searching
     results = logger.search_conversations("python")
     print("\nSearch results for 'python':")
@@ -130,4 +419,4 @@ def main():
         print(f"{result['timestamp']}: {result['role']} - {result['message']}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
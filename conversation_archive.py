@@ -0,0 +1,116 @@
+import gzip
+import json
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; gzip is always available
+    zstandard = None
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("This archive segment is zstd-compressed; install 'zstandard' to read it")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class ConversationArchive:
+    """Monthly compressed segments of old conversation days.
+
+    ``archive/conversation_YYYY-MM.jsonl.gz`` (or ``.zst``) holds one
+    compressed frame per archived day, one JSON message per line. The
+    ``conversation_YYYY-MM.index.json`` next to it maps each day to the byte
+    range(s) of its frames, so reading a day decompresses only that day.
+    """
+
+    def __init__(self, archive_dir: Path):
+        self.dir = Path(archive_dir)
+        self.codec = "zstd" if zstandard is not None else "gzip"
+        self._cache: Dict[Path, tuple] = {}  # index path -> (mtime, index)
+
+    def _segment_file(self, month: str, codec: str) -> Path:
+        suffix = ".zst" if codec == "zstd" else ".gz"
+        return self.dir / f"conversation_{month}.jsonl{suffix}"
+
+    def _index_file(self, month: str) -> Path:
+        return self.dir / f"conversation_{month}.index.json"
+
+    def _read_index(self, month: str) -> Optional[Dict]:
+        path = self._index_file(month)
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        cached = self._cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        index = json.loads(path.read_text(encoding="utf-8"))
+        self._cache[path] = (mtime, index)
+        return index
+
+    def months(self) -> List[str]:
+        if not self.dir.exists():
+            return []
+        return sorted(
+            p.name[len("conversation_"):-len(".index.json")]
+            for p in self.dir.glob("conversation_*.index.json")
+        )
+
+    def days(self) -> List[str]:
+        days = []
+        for month in self.months():
+            days.extend(self._read_index(month)["days"])
+        return sorted(days)
+
+    def load_day(self, date: str) -> List[Dict]:
+        index = self._read_index(date[:7])
+        if not index or date not in index["days"]:
+            return []
+        messages = []
+        with open(self._segment_file(date[:7], index["codec"]), "rb") as f:
+            for offset, length in index["days"][date]:
+                f.seek(offset)
+                for line in _decompress(f.read(length), index["codec"]).splitlines():
+                    if line.strip():
+                        messages.append(json.loads(line))
+        return messages
+
+    def append_day(self, date: str, messages: List[Dict]):
+        """Compress one day into its month's segment and record it in the index."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        month = date[:7]
+        index = self._read_index(month) or {"codec": self.codec, "days": {}}
+        payload = "".join(json.dumps(m, ensure_ascii=False) + "\n" for m in messages)
+        frame = _compress(payload.encode("utf-8"), index["codec"])
+
+        segment = self._segment_file(month, index["codec"])
+        with open(segment, "ab") as f:
+            offset = f.seek(0, 2)
+            f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+        index["days"].setdefault(date, []).append([offset, len(frame)])
+
+        tmp = self._index_file(month).with_suffix(".tmp")
+        tmp.write_text(json.dumps(index, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self._index_file(month))
+
+    def drop_month(self, month: str) -> List[str]:
+        """Delete a month's segment; returns the days it contained."""
+        index = self._read_index(month)
+        if not index:
+            return []
+        self._segment_file(month, index["codec"]).unlink(missing_ok=True)
+        self._index_file(month).unlink(missing_ok=True)
+        self._cache.pop(self._index_file(month), None)
+        return sorted(index["days"])
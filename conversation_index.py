@@ -0,0 +1,177 @@
+import json
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+  id INTEGER PRIMARY KEY,
+  day TEXT NOT NULL,
+  timestamp TEXT NOT NULL,
+  role TEXT NOT NULL,
+  message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS messages_day ON messages(day);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+  message, content='messages', content_rowid='id'
+);
+CREATE TABLE IF NOT EXISTS sources (
+  day TEXT PRIMARY KEY,
+  indexed_bytes INTEGER NOT NULL DEFAULT 0,
+  legacy_indexed INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+PHRASE_RE = re.compile(r'"([^"]+)"|(\S+)')
+WORD_RE = re.compile(r'\w+')
+
+
+def to_fts_query(query: str) -> str:
+    """Translate a user query into an FTS5 MATCH expression.
+
+    Quoted text is matched as a phrase; bare words are prefix matches so that
+    "pyth" still finds "python", as the old substring search did. All parts
+    must match.
+    """
+    parts = []
+    for phrase, word in PHRASE_RE.findall(query):
+        if phrase:
+            tokens = WORD_RE.findall(phrase)
+            if tokens:
+                parts.append('"' + " ".join(tokens) + '"')
+        else:
+            parts.extend(f'"{token}"*' for token in WORD_RE.findall(word))
+    return " ".join(parts)
+
+
+class ConversationIndex:
+    """SQLite FTS5 index over every message in a ChatLogger directory.
+
+    The index remembers how many bytes of each day's JSONL file it has seen,
+    so catching up after new messages only reads the appended tail. Days
+    already in the compressed archive are indexed whole, once.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self._con = sqlite3.connect(self.path, check_same_thread=False)
+        self._con.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._con.close()
+
+    def _insert(self, day: str, entries: Iterable[Dict]):
+        for entry in entries:
+            cur = self._con.execute(
+                "INSERT INTO messages (day, timestamp, role, message) VALUES (?, ?, ?, ?)",
+                (day, entry["timestamp"], entry["role"], entry["message"]),
+            )
+            self._con.execute(
+                "INSERT INTO messages_fts (rowid, message) VALUES (?, ?)",
+                (cur.lastrowid, entry["message"]),
+            )
+
+    def catch_up(self, day: str, jsonl_file: Path, legacy_file: Optional[Path] = None):
+        """Index whatever part of a day's logs has not been indexed yet."""
+        with self._lock, self._con:
+            row = self._con.execute(
+                "SELECT indexed_bytes, legacy_indexed FROM sources WHERE day = ?", (day,)
+            ).fetchone()
+            indexed_bytes, legacy_indexed = row or (0, 0)
+
+            if legacy_file is not None and not legacy_indexed and legacy_file.exists():
+                try:
+                    self._insert(day, json.loads(legacy_file.read_text(encoding="utf-8")))
+                except json.JSONDecodeError:
+                    pass
+                legacy_indexed = 1
+
+            if jsonl_file.exists() and jsonl_file.stat().st_size > indexed_bytes:
+                entries = []
+                with open(jsonl_file, "rb") as f:
+                    f.seek(indexed_bytes)
+                    for line in f:
+                        if not line.endswith(b"\n"):
+                            break  # partial write; pick it up next time
+                        indexed_bytes += len(line)
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+                self._insert(day, entries)
+
+            self._set_source(day, indexed_bytes, legacy_indexed)
+
+    def _set_source(self, day: str, indexed_bytes: int, legacy_indexed: int):
+        self._con.execute(
+            "INSERT INTO sources (day, indexed_bytes, legacy_indexed) VALUES (?, ?, ?)"
+            " ON CONFLICT(day) DO UPDATE SET indexed_bytes = excluded.indexed_bytes,"
+            " legacy_indexed = excluded.legacy_indexed",
+            (day, indexed_bytes, legacy_indexed),
+        )
+
+    def add_archived(self, day: str, entries: Iterable[Dict]):
+        """Index an archived day that was never indexed while its files were live."""
+        with self._lock, self._con:
+            self._insert(day, entries)
+            self._set_source(day, 0, 1)
+
+    def mark_archived(self, day: str):
+        """Record that a day's live files moved to the archive.
+
+        Its messages stay indexed; a day file started again for the same
+        date is then read from its first byte.
+        """
+        with self._lock, self._con:
+            self._con.execute(
+                "UPDATE sources SET indexed_bytes = 0, legacy_indexed = 1 WHERE day = ?", (day,)
+            )
+
+    def sources(self) -> Dict[str, tuple]:
+        """day -> (indexed_bytes, legacy_indexed) for every day seen so far."""
+        with self._lock:
+            rows = self._con.execute("SELECT day, indexed_bytes, legacy_indexed FROM sources").fetchall()
+        return {day: (size, bool(legacy)) for day, size, legacy in rows}
+
+    def drop_day(self, day: str):
+        """Forget every message of a day (used when its logs are deleted)."""
+        with self._lock, self._con:
+            self._con.execute(
+                "DELETE FROM messages_fts WHERE rowid IN (SELECT id FROM messages WHERE day = ?)",
+                (day,),
+            )
+            self._con.execute("DELETE FROM messages WHERE day = ?", (day,))
+            self._con.execute("DELETE FROM sources WHERE day = ?", (day,))
+
+    def search(self, query: str, since: Optional[str] = None, until: Optional[str] = None,
+               role: Optional[str] = None, limit: Optional[int] = None) -> List[Dict]:
+        """Best-ranked messages first; ``since``/``until`` are inclusive YYYY-MM-DD."""
+        match = to_fts_query(query)
+        if not match:
+            return []
+        sql = [
+            "SELECT m.timestamp, m.role, m.message FROM messages_fts",
+            "JOIN messages m ON m.id = messages_fts.rowid",
+            "WHERE messages_fts MATCH ?",
+        ]
+        params: list = [match]
+        if since:
+            sql.append("AND m.day >= ?")
+            params.append(since)
+        if until:
+            sql.append("AND m.day <= ?")
+            params.append(until)
+        if role:
+            sql.append("AND m.role = ?")
+            params.append(role)
+        sql.append("ORDER BY bm25(messages_fts), m.timestamp DESC")
+        if limit:
+            sql.append("LIMIT ?")
+            params.append(limit)
+        with self._lock:
+            rows = self._con.execute(" ".join(sql), params).fetchall()
+        return [{"timestamp": ts, "role": r, "message": msg} for ts, r, msg in rows]
@@ -1,41 +1,129 @@
 import json
 import sys
 import os
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 
 DATA_FILE = "knowledge_data.json"
 
+# File layout: {"next_id": N, "entries": [...]}. next_id only ever grows, so
+# ids are never reused after a delete. Plain lists from older versions still load.
+_batch = None  # open batch(): {"entries": list, "dirty": bool}
+
+class EntryList(list):
+    """Knowledge entries loaded from a file, carrying that file's ``next_id``.
+
+    Ids are allocated from the list an entry is added to, never from
+    whichever file happened to be loaded last.
+    """
+
+    def __init__(self, entries=(), next_id=None):
+        super().__init__(entries)
+        # a hand-edited file may hold ids at or past its stored next_id
+        self.next_id = max(next_id or 1, _next_free(self))
+
+def _next_free(entries):
+    return max([0] + [e["id"] for e in entries]) + 1
+
 def load_knowledge():
     """Load knowledge entries from JSON file."""
+    if _batch is not None:
+        return _batch["entries"]
     if not os.path.exists(DATA_FILE):
-        return []
+        return EntryList()
     with open(DATA_FILE, "r") as f:
-        return json.load(f)
+        data = json.load(f)
+    if isinstance(data, list):
+        return EntryList(data)
+    return EntryList(data["entries"], data.get("next_id"))
 
 def save_knowledge(entries):
-    """Save knowledge entries to JSON file."""
-    with open(DATA_FILE, "w") as f:
-        json.dump(entries, f, indent=4)
+    """Save knowledge entries to JSON file (deferred inside ``batch()``)."""
+    if _batch is not None:
+        _batch["entries"] = entries
+        _batch["dirty"] = True
+        return
+    _write_knowledge(entries)
+
+def _write_knowledge(entries):
+    # plain lists (no next_id of their own) fall back to the highest id + 1
+    next_id = entries.next_id if isinstance(entries, EntryList) else _next_free(entries)
+    tmp = DATA_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(json.dumps({"next_id": next_id, "entries": entries}, indent=4))
+    os.replace(tmp, DATA_FILE)
+
+def _allocate_id(entries):
+    if not isinstance(entries, EntryList):
+        return _next_free(entries)
+    entry_id = entries.next_id
+    entries.next_id += 1
+    return entry_id
 
-def add_entry(title, content, tags=None):
-    """Add a new knowledge entry."""
-    entries = load_knowledge()
+@contextmanager
+def batch():
+    """Group many mutations into one write: ``with knowledge.batch(): ...``
+
+    Inside the block load_knowledge() hands out the same in-memory list and
+    save_knowledge() only marks it dirty; the file is written once on exit.
+    If the block raises, nothing is written.
+    """
+    global _batch
+    if _batch is not None:  # nested: the outermost batch writes
+        yield
+        return
+    _batch = {"entries": load_knowledge(), "dirty": False}
+    try:
+        yield
+        state = _batch
+    finally:
+        _batch = None
+    if state["dirty"]:
+        _write_knowledge(state["entries"])
+
+def add_entry(title, content, tags=None, entries=None, quiet=False):
+    """Add a new knowledge entry; pass ``entries`` to reuse an already loaded list."""
+    if entries is None:
+        entries = load_knowledge()
+    now = datetime.now().isoformat()
     entry = {
-        "id": len(entries) + 1,
+        "id": _allocate_id(entries),
         "title": title,
         "content": content,
         "tags": tags or [],
-        "created_at": datetime.now().isoformat(),
-        "updated_at": datetime.now().isoformat()
+        "created_at": now,
+        "updated_at": now
     }
     entries.append(entry)
     save_knowledge(entries)
-    print(f"✅ Added knowledge entry: {title}")
+    if not quiet:
+        print(f"✅ Added knowledge entry: {title}")
+    return entry
+
+def import_entries(lines):
+    """Add one entry per JSON line (title, content, optional tags) with a single write.
 
-def list_entries():
+    Tags may be a list or a comma-separated string. Returns the number added.
+    """
+    count = 0
+    with batch():
+        entries = load_knowledge()
+        for line in lines:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            tags = record.get("tags") or []
+            if isinstance(tags, str):
+                tags = [t.strip() for t in tags.split(",") if t.strip()]
+            add_entry(record["title"], record.get("content", ""), tags, entries=entries, quiet=True)
+            count += 1
+    return count
+
+def list_entries(entries=None):
     """List all knowledge entries."""
-    entries = load_knowledge()
+    if entries is None:
+        entries = load_knowledge()
     if not entries:
         print("No knowledge entries found.")
     else:
@@ -46,16 +134,21 @@ def list_entries():
             print(f"   Created: {entry['created_at']}")
             print("   " + "-" * 40)
 
-def search_entries(query):
-    """Search knowledge entries by title, content, or tags."""
-    entries = load_knowledge()
+def find_entries(query, entries):
+    """Entries whose title, content or a tag contains ``query`` (case-insensitive)."""
     query = query.lower()
-    matches = [
+    return [
         e for e in entries
         if query in e["title"].lower() or 
            query in e["content"].lower() or
            any(query in tag.lower() for tag in e["tags"])
     ]
+
+def search_entries(query, entries=None):
+    """Search knowledge entries by title, content, or tags."""
+    if entries is None:
+        entries = load_knowledge()
+    matches = find_entries(query, entries)
     
     if matches:
         print("🔍 Search results:")
@@ -65,9 +158,10 @@ def search_entries(query):
     else:
         print("No matching entries found.")
 
-def view_entry(entry_id):
+def view_entry(entry_id, entries=None):
     """View a specific knowledge entry."""
-    entries = load_knowledge()
+    if entries is None:
+        entries = load_knowledge()
     entry = next((e for e in entries if e["id"] == entry_id), None)
     
     if entry:
@@ -83,7 +177,7 @@ def view_entry(entry_id):
 def main():
     """Main CLI interface."""
     if len(sys.argv) < 2:
-        print("Usage: python knowledge.py [add|list|search|view] [arguments]")
+        print("Usage: python knowledge.py [add|list|search|view|import] [arguments]")
         return
 
     command = sys.argv[1]
@@ -104,6 +198,10 @@ def main():
             view_entry(entry_id)
         except ValueError:
             print("Invalid entry ID")
+    elif command == "import":
+        # one JSON object per line on stdin: {"title": ..., "content": ..., "tags": [...]}
+        count = import_entries(sys.stdin)
+        print(f"✅ Imported {count} knowledge entries")
     else:
         print("Invalid command or missing arguments.")
 
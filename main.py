@@ -1,15 +1,24 @@
 from __future__ import annotations
+import time
+
+_IMPORT_START = time.perf_counter()  # --timings reports the imports below as "import"
+
 import argparse
+import functools
 import os
+import sys
 from datetime import date, datetime, timedelta
 from pathlib import Path
 from typing import List, Optional
 
 # Storage backends (keep these module names matching your repo)
-from pkms.storage.json_store import JSONStore
-from pkms.storage.sqlite_store import SQLiteStore
+from pkms.storage.base import SORT_KEYS, sort_key
+from pkms.storage.registry import BACKENDS, migrate, open_store
 # Your Task model should live in pkms/models.py; adapt imports if different.
 from pkms.models import Task  # expects dataclass with fields similar to: id,title,priority,due,tags,note,created_at,done,done_at
+from pkms.summarizer import PkmsSource, SummaryPipeline, MIN_LENGTH, llm_summarizer, local_summarize
+from pkms.instrumentation import PROFILE_SORTS, phase, profile_call, start_timings, stop_timings, trace_memory
+from pkms.metrics import REGISTRY, task_gauges
 
 # --- Optional LLM adapter (non-fatal if missing) ----------------------------
 try:
@@ -18,9 +27,12 @@ try:
 except Exception:  # module not present or not configured
     llm_respond = None  # noqa: F401
 
+_IMPORT_MS = (time.perf_counter() - _IMPORT_START) * 1000
+
 # --- Defaults / constants ---------------------------------------------------
-DEFAULT_DB = Path("~/.pkms/tasks.db").expanduser()
-DEFAULT_JSON = Path("~/.pkms/tasks.json").expanduser()
+# backend -> the flag that overrides its default path (see pkms.storage.registry)
+PATH_ARGS = {"sqlite": "db_path", "json": "json_path", "mmap": "mmap_path",
+             "chat": "chat_path", "tasks2": "manager_dir", "tasks3": "manager_dir"}
 PRIORITIES = ("low", "normal", "high", "urgent")
 
 
@@ -31,6 +43,15 @@ def parse_date(s: Optional[str]) -> Optional[date]:
     return date.fromisoformat(s)
 
 
+def parse_sort(s: str) -> str:
+    """argparse type for --sort: a SORT_KEYS field, optionally prefixed with -."""
+    try:
+        sort_key(s)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return s
+
+
 def fmt_task(t: Task) -> str:
     due = t.due.isoformat() if t.due else "—"
     tags = ",".join(t.tags) if getattr(t, "tags", None) else "—"
@@ -39,9 +60,12 @@ def fmt_task(t: Task) -> str:
 
 
 def get_store(args):
-    if args.storage == "sqlite":
-        return SQLiteStore(args.db_path or DEFAULT_DB)
-    return JSONStore(args.json_path or DEFAULT_JSON)
+    # completed tasks older than --archive-after days move to the cold tier on open
+    archive_after = getattr(args, "archive_after", None)
+    options = {"archive_after_days": archive_after} if archive_after else {}
+    path = getattr(args, PATH_ARGS.get(args.storage, ""), None)
+    with phase("open"):
+        return open_store(args.storage, path, **options)
 
 
 # --- AI agent (heuristic + optional LLM) ------------------------------------
@@ -121,14 +145,24 @@ def cmd_add(args):
 
 def cmd_list(args):
     store = get_store(args)
-    tasks = store.list(include_done=args.all)
+    tasks = store.query(
+        done=None if args.all else False,
+        priority=args.priority,
+        tag=args.tag,
+        sort=args.sort,
+        limit=args.limit,
+    )
     if not tasks:
         print("(no tasks)")
         return
-    for t in tasks:
-        print(fmt_task(t))
-        if getattr(t, "note", None):
-            print(f"    note: {t.note}")
+    with phase("render"):
+        for t in tasks:
+            print(fmt_task(t))
+            # summaries are produced ahead of time by `pkms summarize`; never call the model here
+            if getattr(t, "summary", None):
+                print(f"    summary: {t.summary}")
+            elif getattr(t, "note", None):
+                print(f"    note: {t.note}")
 
 
 def cmd_done(args):
@@ -149,8 +183,9 @@ def cmd_search(args):
     if not hits:
         print("(no matches)")
         return
-    for t in hits:
-        print(fmt_task(t))
+    with phase("render"):
+        for t in hits:
+            print(fmt_task(t))
 
 
 def cmd_prioritize(args):
@@ -161,8 +196,9 @@ def cmd_prioritize(args):
     if not ranked:
         print("(no tasks)")
         return
-    for t in ranked:
-        print(fmt_task(t))
+    with phase("render"):
+        for t in ranked:
+            print(fmt_task(t))
 
 
 def cmd_suggest(args):
@@ -175,11 +211,10 @@ def cmd_suggest(args):
 def cmd_weekly_summary(args):
     store = get_store(args)
     today = date.today()
-    all_tasks = store.list(include_done=True)
-    completed = [
-        t for t in all_tasks
-        if t.done and getattr(t, "done_at", None) and (today - t.done_at.date()).days <= 7
-    ]
+    # the store searches the archive too: a short --archive-after or `pkms archive --days`
+    # may already have moved this week's completions there
+    week_start = datetime.combine(today - timedelta(days=7), datetime.min.time())
+    completed = store.query(done=True, done_since=week_start)
     upcoming = [
         t for t in store.list(include_done=False)
         if t.due and 0 <= (t.due - today).days <= 7
@@ -188,11 +223,95 @@ def cmd_weekly_summary(args):
     print(agent.weekly_summary(completed, upcoming))
 
 
+def cmd_summarize(args):
+    store = get_store(args)
+    summarize = local_summarize
+    if llm_respond and os.getenv("PKMS_ENABLE_LLM", "0") in {"1", "true", "True"}:
+        summarize = llm_summarizer(llm_respond)
+    pipeline = SummaryPipeline(
+        PkmsSource(store), summarize=summarize, workers=args.workers, min_length=args.min_length
+    )
+    try:
+        written = pipeline.run_once()
+    finally:
+        pipeline.stop()
+    print(f"📝 Summarized {written} task(s)" if written else "(nothing to summarize)")
+
+
+def cmd_stats(args):
+    store = get_store(args)
+    # metrics are per process: time a few full reads so latency and bytes have samples
+    for _ in range(args.probe):
+        store.list(include_done=True)
+    gauges = task_gauges(store)
+    if args.prometheus:
+        print(REGISTRY.render(gauges), end="")
+        return
+    counts = ", ".join(f"{state} {n}" for state, n in store.counts().items())
+    print(f"📊 {args.storage} storage: {counts}")
+    for (backend, op), calls in sorted(REGISTRY.calls.items()):
+        avg = REGISTRY.seconds[(backend, op)] / calls * 1000
+        print(f"  {op:<12} {calls:5d} call(s)  avg {avg:8.2f} ms")
+    for (backend, direction), n in sorted(REGISTRY.bytes.items()):
+        print(f"  bytes {direction:<6} {n}")
+    ratio = REGISTRY.cache_ratio(getattr(store, "metrics_label", args.storage), "hot_file")
+    if ratio is not None:
+        print(f"  cache hit ratio {ratio:.0%}")
+
+
+def cmd_archive(args):
+    store = get_store(args)
+    if not hasattr(store, "archive"):
+        print("(storage has no archive tier)")
+        return
+    moved = store.archive(args.days)
+    print(f"📦 Archived {moved} task(s)" if moved else "(nothing to archive)")
+
+
+def cmd_migrate(args):
+    source_path = getattr(args, PATH_ARGS.get(args.storage, ""), None) or BACKENDS[args.storage][1]
+    target_path = args.to_path or BACKENDS[args.to][1]
+    if Path(source_path).expanduser().resolve() == Path(target_path).expanduser().resolve():
+        # copying a store onto itself would rewrite it while iterate() is still reading it
+        raise SystemExit(f"❌ {target_path} is the source store; pick another --to-path")
+    source = get_store(args)
+    target = open_store(args.to, target_path)
+    copied = migrate(source, target, batch_size=args.batch_size)
+    print(f"📦 Copied {copied} task(s) from {args.storage} to {args.to}")
+
+
+def run_command(args) -> None:
+    """Run ``args.func`` under the --timings/--profile/--trace-memory hooks that are on.
+
+    Reports go to stderr so the command's own output stays clean.
+    """
+    call = functools.partial(args.func, args)
+    reports: List[str] = []
+    if args.profile:
+        profiled = call
+        call = lambda: profile_call(  # noqa: E731
+            profiled, reports.append, sort=args.profile_sort, dump=args.profile_out)
+    if args.trace_memory:
+        traced = call
+        call = lambda: trace_memory(traced, reports.append)  # noqa: E731
+    timings = start_timings() if args.timings else None
+    if timings is not None:
+        timings.add("import", _IMPORT_MS)
+    start = time.perf_counter()
+    try:
+        call()
+    finally:
+        if timings is not None:
+            stop_timings()
+            reports.append(timings.report((time.perf_counter() - start) * 1000))
+        for report in reports:
+            print(report, file=sys.stderr)
+
+
 # --- Main -------------------------------------------------------------------
 def main(argv: list[str] | None = None):
     # If run without arguments, launch web interface
     if argv is None:
-        import sys
         if len(sys.argv) == 1:
             print("No command provided. Launching web interface...")
             print("(Use --help to see CLI commands)")
@@ -201,9 +320,25 @@ def main(argv: list[str] | None = None):
             return 0
     
     p = argparse.ArgumentParser(prog="pkms", description="AI-powered Task Manager (PKMS)")
-    p.add_argument("--storage", choices=["sqlite", "json"], default="sqlite")
+    p.add_argument("--storage", choices=list(BACKENDS), default="sqlite")
     p.add_argument("--db-path", default=None, help="path to SQLite DB (for --storage sqlite)")
     p.add_argument("--json-path", default=None, help="path to JSON file (for --storage json)")
+    p.add_argument("--mmap-path", default=None, help="path to record file (for --storage mmap)")
+    p.add_argument("--chat-path", default=None, help="chat.py's tasks_data.json (for --storage chat)")
+    p.add_argument("--manager-dir", default=None,
+                   help="TaskManager data directory (for --storage tasks2 or tasks3)")
+    p.add_argument(
+        "--archive-after", type=int, default=30, metavar="DAYS",
+        help="archive tasks completed more than DAYS ago (0 = never; json and sqlite)",
+    )
+
+    p.add_argument("--timings", action="store_true",
+                   help="print wall time per phase (import, open, read, write, compute, render)")
+    p.add_argument("--profile", action="store_true", help="run the command under cProfile")
+    p.add_argument("--profile-sort", default="cumulative", choices=PROFILE_SORTS,
+                   help="pstats sort key (default: cumulative)")
+    p.add_argument("--profile-out", default=None, metavar="PATH", help="also save raw stats for pstats")
+    p.add_argument("--trace-memory", action="store_true", help="report tracemalloc peak and top allocators")
 
     sub = p.add_subparsers(dest="cmd", required=False)
 
@@ -217,6 +352,11 @@ def main(argv: list[str] | None = None):
 
     sp = sub.add_parser("list", help="list tasks")
     sp.add_argument("--all", action="store_true", help="include completed tasks")
+    sp.add_argument("--priority", choices=list(PRIORITIES))
+    sp.add_argument("--tag")
+    sp.add_argument("--sort", default="id", type=parse_sort,
+                    help=f"one of {', '.join(SORT_KEYS)}; --sort=-FIELD reverses")
+    sp.add_argument("--limit", type=int)
     sp.set_defaults(func=cmd_list)
 
     sp = sub.add_parser("done", help="mark a task complete")
@@ -240,9 +380,30 @@ def main(argv: list[str] | None = None):
     sp = sub.add_parser("weekly-summary", help="summary of completed and upcoming")
     sp.set_defaults(func=cmd_weekly_summary)
 
+    sp = sub.add_parser("summarize", help="store short summaries for tasks with long notes")
+    sp.add_argument("--workers", type=int, default=2)
+    sp.add_argument("--min-length", type=int, default=MIN_LENGTH, help="note length that triggers a summary")
+    sp.set_defaults(func=cmd_summarize)
+
+    sp = sub.add_parser("stats", help="task counts and storage metrics")
+    sp.add_argument("--probe", type=int, default=3, help="full reads to time before reporting")
+    sp.add_argument("--prometheus", action="store_true",
+                    help="print the Prometheus text format (e.g. for a textfile collector)")
+    sp.set_defaults(func=cmd_stats)
+
+    sp = sub.add_parser("archive", help="move old completed tasks to the archive")
+    sp.add_argument("--days", type=int, default=30, help="archive tasks completed more than DAYS ago")
+    sp.set_defaults(func=cmd_archive, archive_after=0)
+
+    sp = sub.add_parser("migrate", help="copy every task to another storage backend")
+    sp.add_argument("--to", choices=list(BACKENDS), required=True)
+    sp.add_argument("--to-path", default=None, help="target path (default: the backend's default)")
+    sp.add_argument("--batch-size", type=int, default=1000)
+    sp.set_defaults(func=cmd_migrate, archive_after=0)
+
     args = p.parse_args(argv)
     if hasattr(args, 'func'):
-        args.func(args)
+        run_command(args)
     else:
         # No command provided, show help
         p.print_help()
@@ -0,0 +1,137 @@
+"""Opt-in timing, profiling and memory hooks for pkms commands.
+
+Storage classes mark their I/O with ``timed("read")`` / ``timed("write")``
+(or ``with phase(...)``). Nothing is recorded unless a ``Timings`` is
+active, and then each phase gets its exclusive wall time: time spent in
+a nested phase is charged to the inner one only. While inactive, a hook
+costs one function call and a None check.
+"""
+from __future__ import annotations
+
+import contextlib
+import cProfile
+import functools
+import io
+import pstats
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# phases main.py reports, in display order; "compute" is whatever is left over
+PHASES = ("import", "open", "read", "write", "compute", "render")
+# accepted by profile_call's ``sort``
+PROFILE_SORTS = tuple(key.value for key in pstats.SortKey)
+
+_NULL = contextlib.nullcontext()
+_active: Optional["Timings"] = None
+
+
+class Timings:
+    """Exclusive wall time and call counts per phase."""
+
+    def __init__(self) -> None:
+        self.ms: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._stack: List[List[float]] = []  # [start, time spent in children]
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        frame = [time.perf_counter(), 0.0]
+        self._stack.append(frame)
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.ms[name] += (elapsed - frame[1]) * 1000
+            self.calls[name] += 1
+            if self._stack:
+                self._stack[-1][1] += elapsed
+
+    def add(self, name: str, ms: float) -> None:
+        self.ms[name] += ms
+        self.calls[name] += 1
+
+    def report(self, total_ms: float) -> str:
+        """One line per phase; ``compute`` is ``total_ms`` minus the measured phases."""
+        measured = sum(ms for name, ms in self.ms.items() if name != "import")
+        ms = dict(self.ms, compute=max(total_ms - measured, 0.0))
+        lines = ["timings (ms):"]
+        for name in PHASES + tuple(sorted(set(ms) - set(PHASES))):
+            calls = self.calls.get(name)
+            suffix = f"  ({calls} call{'s' if calls != 1 else ''})" if calls and name != "import" else ""
+            lines.append(f"  {name:<8} {ms.get(name, 0.0):10.2f}{suffix}")
+        lines.append(f"  {'total':<8} {total_ms + self.ms.get('import', 0.0):10.2f}")
+        return "\n".join(lines)
+
+
+def start_timings() -> Timings:
+    global _active
+    _active = Timings()
+    return _active
+
+
+def stop_timings() -> None:
+    global _active
+    _active = None
+
+
+def phase(name: str):
+    """Context manager charging the block to phase ``name`` (no-op when inactive)."""
+    return _active.phase(name) if _active is not None else _NULL
+
+
+def timed(name: str) -> Callable[[F], F]:
+    """Decorator form of ``phase`` for store methods."""
+
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active is None:
+                return func(*args, **kwargs)
+            with _active.phase(name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def profile_call(func: Callable[[], Any], report: Callable[[str], Any], sort: str = "cumulative",
+                 limit: int = 25, dump: Optional[str] = None) -> None:
+    """Run ``func`` under cProfile and pass the top ``limit`` rows, sorted by ``sort``, to ``report``.
+
+    The report is produced even when ``func`` raises. With ``dump`` the raw
+    stats are also saved for ``python -m pstats``.
+    """
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(func)
+    finally:
+        if dump:
+            profiler.dump_stats(dump)
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        report(out.getvalue())
+
+
+def trace_memory(func: Callable[[], Any], report: Callable[[str], Any], limit: int = 10) -> None:
+    """Run ``func`` under tracemalloc and pass the peak and top allocating lines to ``report``.
+
+    The report is produced even when ``func`` raises.
+    """
+    tracemalloc.start()
+    try:
+        func()
+    finally:
+        _, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().statistics("lineno")
+        tracemalloc.stop()
+        lines = [f"memory peak: {peak / 1024:.1f} KiB; top allocators still held:"]
+        for stat in stats[:limit]:
+            frame = stat.traceback[0]
+            lines.append(f"  {stat.size / 1024:10.1f} KiB  {stat.count:7d} blocks  {frame.filename}:{frame.lineno}")
+        report("\n".join(lines))
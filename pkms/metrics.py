@@ -0,0 +1,204 @@
+"""Always-on storage metrics, exported as Prometheus text.
+
+Store methods are wrapped with ``measured``; each public call updates an
+operation counter, a latency histogram, an error counter and the number
+of rows returned. Stores also report bytes read/written (``add_bytes``)
+and cache lookups (``cache_lookup``). Everything lives in the
+process-wide ``REGISTRY``; ``render`` produces the text exposition format
+served by web_app's ``/metrics`` and printed by ``pkms stats``.
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import inspect
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+# latency bucket upper bounds in seconds (Prometheus "le"); +Inf is implicit
+BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Metrics:
+    """Counters and histograms keyed by (backend, operation)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.calls: Dict[Tuple[str, str], int] = defaultdict(int)
+            self.errors: Dict[Tuple[str, str], int] = defaultdict(int)
+            self.rows: Dict[Tuple[str, str], int] = defaultdict(int)
+            self.seconds: Dict[Tuple[str, str], float] = defaultdict(float)
+            self.buckets: Dict[Tuple[str, str], List[int]] = defaultdict(lambda: [0] * (len(BUCKETS) + 1))
+            self.bytes: Dict[Tuple[str, str], int] = defaultdict(int)  # (backend, direction)
+            self.cache: Dict[Tuple[str, str, str], int] = defaultdict(int)  # (backend, cache, result)
+
+    def observe(self, backend: str, op: str, seconds: float, rows: Optional[int], error: bool) -> None:
+        key = (backend, op)
+        with self._lock:
+            self.calls[key] += 1
+            self.seconds[key] += seconds
+            self.buckets[key][bisect.bisect_left(BUCKETS, seconds)] += 1
+            if error:
+                self.errors[key] += 1
+            if rows is not None:
+                self.rows[key] += rows
+
+    def add_bytes(self, backend: str, direction: str, n: int) -> None:
+        with self._lock:
+            self.bytes[(backend, direction)] += n
+
+    def cache_lookup(self, backend: str, cache: str, hit: bool) -> None:
+        with self._lock:
+            self.cache[(backend, cache, "hit" if hit else "miss")] += 1
+
+    def cache_ratio(self, backend: str, cache: str) -> Optional[float]:
+        hits = self.cache.get((backend, cache, "hit"), 0)
+        total = hits + self.cache.get((backend, cache, "miss"), 0)
+        return hits / total if total else None
+
+    def render(self, gauges: Optional[Dict[str, Tuple[str, Dict[Tuple[Tuple[str, str], ...], float]]]] = None) -> str:
+        """Prometheus text exposition of every metric, plus ``gauges``.
+
+        ``gauges`` maps a metric name to ``(help, {labels: value})`` where
+        labels is a tuple of ``(name, value)`` pairs.
+        """
+        out: List[str] = []
+
+        def family(name: str, kind: str, help_: str, samples: List[Tuple[str, Tuple, float]]) -> None:
+            out.append(f"# HELP {name} {help_}")
+            out.append(f"# TYPE {name} {kind}")
+            for suffix, labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                out.append(f"{name}{suffix}{{{label_text}}} {_number(value)}")
+
+        with self._lock:
+            ops = sorted(self.calls)
+            family("pkms_store_operations_total", "counter", "Store method calls.",
+                   [("", (("backend", b), ("op", o)), self.calls[(b, o)]) for b, o in ops])
+            family("pkms_store_errors_total", "counter", "Store method calls that raised.",
+                   [("", (("backend", b), ("op", o)), self.errors.get((b, o), 0)) for b, o in ops])
+            family("pkms_store_rows_total", "counter", "Tasks returned by store methods.",
+                   [("", (("backend", b), ("op", o)), n) for (b, o), n in sorted(self.rows.items())])
+            samples = []
+            for b, o in ops:
+                labels = (("backend", b), ("op", o))
+                cumulative = 0
+                for bound, count in zip(BUCKETS + (float("inf"),), self.buckets[(b, o)]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    samples.append(("_bucket", labels + (("le", le),), cumulative))
+                samples.append(("_sum", labels, self.seconds[(b, o)]))
+                samples.append(("_count", labels, self.calls[(b, o)]))
+            family("pkms_store_operation_seconds", "histogram", "Store method latency.", samples)
+            family("pkms_store_bytes_total", "counter", "Bytes read from or written to storage files.",
+                   [("", (("backend", b), ("direction", d)), n) for (b, d), n in sorted(self.bytes.items())])
+            family("pkms_store_cache_requests_total", "counter", "Store cache lookups by result.",
+                   [("", (("backend", b), ("cache", c), ("result", r)), n)
+                    for (b, c, r), n in sorted(self.cache.items())])
+        for name, (help_, values) in (gauges or {}).items():
+            family(name, "gauge", help_, [("", labels, v) for labels, v in values.items()])
+        return "\n".join(out) + "\n"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+REGISTRY = Metrics()
+
+
+# per-thread depth of measured calls in progress; only the outermost is recorded
+_calls = threading.local()
+
+
+def measured(func: F) -> F:
+    """Record calls, latency, errors and returned rows for a store method.
+
+    The backend label is the store's ``metrics_label`` attribute; list
+    results count as rows. A measured method called from inside another
+    (``counts`` reading ``header``, ``query`` walking ``iterate``) is
+    charged to the outer call only, so each public operation is counted
+    once under its own name. Generator methods are timed across their
+    iteration and count the tasks they yield.
+    """
+    op = func.__name__
+
+    if inspect.isgeneratorfunction(func):
+
+        @functools.wraps(func)
+        def generator_wrapper(self, *args, **kwargs):
+            tasks = func(self, *args, **kwargs)
+            if getattr(_calls, "depth", 0):
+                return tasks
+            return _measure_iteration(self.metrics_label, op, tasks)
+
+        return generator_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        depth = getattr(_calls, "depth", 0)
+        if depth:
+            return func(self, *args, **kwargs)
+        _calls.depth = 1
+        start = time.perf_counter()
+        result = None
+        error = True
+        try:
+            result = func(self, *args, **kwargs)
+            error = False
+            return result
+        finally:
+            _calls.depth = 0
+            REGISTRY.observe(
+                self.metrics_label, op, time.perf_counter() - start,
+                len(result) if isinstance(result, list) else None, error,
+            )
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _measure_iteration(label: str, op: str, items: Iterator[Any]) -> Iterator[Any]:
+    # time spent in the caller between items is not the store's
+    seconds = 0.0
+    rows = 0
+    error = False
+    try:
+        while True:
+            # the iterator may be drained inside another measured call: restore its depth
+            depth = getattr(_calls, "depth", 0)
+            _calls.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            except Exception:
+                error = True
+                raise
+            finally:
+                seconds += time.perf_counter() - start
+                _calls.depth = depth
+            rows += 1
+            yield item
+    finally:
+        items.close()
+        REGISTRY.observe(label, op, seconds, rows, error)
+
+
+def task_gauges(store) -> Dict[str, Tuple[str, Dict[Tuple[Tuple[str, str], ...], float]]]:
+    """``render`` gauges for a store's open/done/archived row counts."""
+    label = getattr(store, "metrics_label", type(store).__name__)
+    return {
+        "pkms_tasks": (
+            "Tasks in the store by state.",
+            {(("backend", label), ("state", state)): n for state, n in store.counts().items()},
+        )
+    }
@@ -16,6 +16,8 @@ class Task:
     created_at: datetime
     done: bool
     done_at: Optional[datetime]
+    summary: Optional[str] = None
+    summary_hash: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -28,6 +30,8 @@ class Task:
             "created_at": self.created_at.isoformat(),
             "done": self.done,
             "done_at": self.done_at.isoformat() if self.done_at else None,
+            "summary": self.summary,
+            "summary_hash": self.summary_hash,
         }
 
     @staticmethod
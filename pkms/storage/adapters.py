@@ -0,0 +1,250 @@
+"""``StorageBackend`` adapters for the task files of the other front-ends.
+
+chat.py (through the root tasks.py) and the tasks2/tasks3 ``TaskManager``
+keep tasks in their own JSON layouts. These stores read and write those
+files in place, so main.py, ``migrate`` and the tasks5 CLI can use them
+like any other backend while the original front-ends keep working on the
+same file.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pkms.instrumentation import timed
+from pkms.metrics import measured
+from pkms.models import Task
+from pkms.storage.base import Change, ChangeLog, StoreMixin
+
+# chat.py's tasks carry no creation time
+UNKNOWN_CREATED = datetime(1970, 1, 1)
+
+
+class RecordFileStore(StoreMixin):
+    """Tasks as dict records in a ``{"next_id": N, "tasks": [...]}`` file.
+
+    Plain lists from older versions are read too. Every call reads the
+    file and every mutation rewrites it atomically, as the front-ends that
+    share the file do. Subclasses map records to and from ``Task``; there
+    is no cold tier.
+    """
+
+    metrics_label = "records"
+    indent: Optional[int] = None  # match the owning front-end's formatting
+
+    def __init__(self, file: Path, archive_after_days: Optional[int] = None) -> None:
+        # archive_after_days is accepted for a uniform constructor; there is no cold tier
+        self.file = file
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self._log = ChangeLog(self.file.with_name(self.file.name + ".changes"))
+        self._lock = threading.RLock()
+
+    def _to_task(self, record: dict) -> Task:
+        raise NotImplementedError
+
+    def _to_record(self, t: Task, old: Optional[dict]) -> dict:
+        raise NotImplementedError
+
+    @timed("read")
+    def _load(self) -> Tuple[Dict[int, dict], int]:
+        """(records by id, next id)."""
+        if not self.file.exists():
+            return {}, 1
+        data = json.loads(self.file.read_text(encoding="utf-8"))
+        records = data if isinstance(data, list) else data["tasks"]
+        stored = 1 if isinstance(data, list) else data.get("next_id", 1)
+        by_id = {r["id"]: r for r in records}
+        return by_id, max([stored] + [task_id + 1 for task_id in by_id])
+
+    @timed("write")
+    def _save(self, records: Dict[int, dict], next_id: int) -> None:
+        tmp = self.file.with_name(self.file.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"next_id": next_id, "tasks": list(records.values())}, indent=self.indent),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.file)
+
+    # StorageBackend
+    @measured
+    def iterate(self, include_done: bool = True, include_archived: bool = True) -> Iterator[Task]:
+        records, _ = self._load()
+        for record in records.values():
+            t = self._to_task(record)
+            if include_done or not t.done:
+                yield t
+
+    @measured
+    def put_many(self, tasks: Iterable[Task]) -> List[int]:
+        """Insert or replace tasks; tasks without an id get a new one."""
+        ids: List[int] = []
+        with self._lock:
+            records, next_id = self._load()
+            for t in tasks:
+                if t.id is None:
+                    t.id = next_id
+                records[t.id] = self._to_record(t, records.get(t.id))
+                next_id = max(next_id, t.id + 1)
+                ids.append(t.id)
+            if ids:
+                self._save(records, next_id)
+                self._log.append("put", ids)
+        return ids
+
+    @measured
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        with self._lock:
+            records, next_id = self._load()
+            deleted = [task_id for task_id in task_ids if records.pop(task_id, None) is not None]
+            if deleted:
+                self._save(records, next_id)  # next_id is kept: ids are never reused
+                self._log.append("delete", deleted)
+        return len(deleted)
+
+    @measured
+    def changes(self, since: int = 0) -> List[Change]:
+        return self._log.since(since)
+
+    # main.py's commands
+    @measured
+    def counts(self) -> Dict[str, int]:
+        tasks = list(self.iterate())
+        done = sum(t.done for t in tasks)
+        return {"open": len(tasks) - done, "done": done, "archived": 0}
+
+    @measured
+    def list(self, include_done: bool = False, include_archived: bool = True) -> List[Task]:
+        return list(self.iterate(include_done=include_done))
+
+    @measured
+    def add(self, t: Task) -> int:
+        t.id = None
+        return self.put_many([t])[0]
+
+    @measured
+    def complete(self, task_id: int) -> bool:
+        with self._lock:
+            t = self.get(task_id)
+            if t is None or t.done:
+                return False
+            t.done, t.done_at = True, datetime.utcnow()
+            self.put_many([t])
+            return True
+
+    @measured
+    def delete(self, task_id: int) -> bool:
+        return self.delete_many([task_id]) > 0
+
+    @measured
+    def set_summary(self, task_id: int, summary: str, summary_hash: str) -> bool:
+        with self._lock:
+            t = self.get(task_id)
+            if t is None:
+                return False
+            t.summary, t.summary_hash = summary, summary_hash
+            self.put_many([t])
+            return True
+
+    @measured
+    def search(self, keyword: str) -> List[Task]:
+        keyword = keyword.lower()
+        return [
+            t for t in self.iterate()
+            if keyword in t.title.lower() or (t.note and keyword in t.note.lower())
+        ]
+
+
+class ChatTaskStore(RecordFileStore):
+    """chat.py's task file (root tasks.py): ``{"id", "description"}`` records.
+
+    tasks.py reads only ``id`` and ``description``; the other ``Task`` fields
+    are stored next to them, so tasks round-trip through this store without
+    loss.
+    """
+
+    metrics_label = "chat"
+    indent = 4
+
+    def __init__(self, path: Path | str, archive_after_days: Optional[int] = None) -> None:
+        super().__init__(Path(path), archive_after_days)
+
+    def _to_task(self, record: dict) -> Task:
+        data = {k: v for k, v in record.items() if k in Task.__dataclass_fields__}
+        data["title"] = record["description"]
+        data.setdefault("priority", "normal")
+        data.setdefault("due", None)
+        data.setdefault("note", None)
+        data.setdefault("created_at", UNKNOWN_CREATED)
+        data.setdefault("done", False)
+        data.setdefault("done_at", None)
+        return Task.from_dict(data)
+
+    def _to_record(self, t: Task, old: Optional[dict]) -> dict:
+        fields = t.to_dict()
+        record = {"id": fields.pop("id"), "description": fields.pop("title")}
+        record.update(fields)
+        return dict(old or {}, **record)
+
+
+class TaskManagerStore(RecordFileStore):
+    """``<data dir>/tasks.json`` of the tasks2/tasks3 ``TaskManager``.
+
+    Their records have a fixed set of fields, and tasks3 rejects unknown
+    ones. So ``note`` maps to ``description``, ``done`` to ``status ==
+    "completed"`` and ``done_at`` to ``completed_at``, while ``categories``
+    and an in-progress status are kept from the existing record. Only the
+    tasks2 model has ``summary``/``summary_hash``; pass ``summaries=True``
+    to store them.
+    """
+
+    metrics_label = "manager"
+    indent = 2
+
+    def __init__(self, path: Path | str, archive_after_days: Optional[int] = None,
+                 summaries: bool = False) -> None:
+        super().__init__(Path(path) / "tasks.json", archive_after_days)
+        self.summaries = summaries
+
+    def _to_task(self, record: dict) -> Task:
+        return Task(
+            id=record["id"],
+            title=record["title"],
+            priority=record.get("priority") or "normal",
+            due=date.fromisoformat(record["due_date"][:10]) if record.get("due_date") else None,
+            tags=list(record.get("tags") or []),
+            note=record.get("description") or None,
+            created_at=datetime.fromisoformat(record["created_at"]) if record.get("created_at") else UNKNOWN_CREATED,
+            done=record.get("status") == "completed",
+            done_at=datetime.fromisoformat(record["completed_at"]) if record.get("completed_at") else None,
+            summary=record.get("summary"),
+            summary_hash=record.get("summary_hash"),
+        )
+
+    def _to_record(self, t: Task, old: Optional[dict]) -> dict:
+        old = old or {}
+        if t.done:
+            status = "completed"
+        elif old.get("status") not in (None, "completed"):
+            status = old["status"]
+        else:
+            status = "not-started"
+        record = {
+            "id": t.id,
+            "title": t.title,
+            "description": t.note or "",
+            "priority": t.priority,
+            "due_date": t.due.isoformat() if t.due else None,
+            "status": status,
+            "categories": old.get("categories", []),
+            "tags": list(t.tags),
+            "created_at": t.created_at.isoformat(),
+            "completed_at": t.done_at.isoformat() if t.done_at else None,
+        }
+        if self.summaries:
+            record["summary"] = t.summary
+            record["summary_hash"] = t.summary_hash
+        return record
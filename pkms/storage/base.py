@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import heapq
+import json
+import os
+from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Protocol, Tuple
+
+from pkms.metrics import measured
+from pkms.models import Task
+
+PRIORITY_RANK = {"urgent": 0, "high": 1, "normal": 2, "low": 3}
+
+# sort field -> key; tasks without a due date sort after dated ones
+SORT_KEYS: Dict[str, Callable[[Task], tuple]] = {
+    "id": lambda t: (0, t.id or 0),
+    "priority": lambda t: (PRIORITY_RANK.get(t.priority, 2), t.id or 0),
+    "due": lambda t: (0, t.due, t.id or 0) if t.due else (1, date.min, t.id or 0),
+    "created": lambda t: (0, t.created_at, t.id or 0),
+}
+
+
+@dataclass(frozen=True)
+class Change:
+    """One entry of a store's change feed: ``op`` is "put" or "delete"."""
+
+    seq: int
+    op: str
+    task_id: int
+
+
+class StorageBackend(Protocol):
+    """What every pkms task store provides, beyond the CLI's list/add/complete."""
+
+    def get(self, task_id: int) -> Optional[Task]: ...
+
+    def put_many(self, tasks: Iterable[Task]) -> List[int]: ...
+
+    def delete_many(self, task_ids: Iterable[int]) -> int: ...
+
+    def iterate(self, include_done: bool = True, include_archived: bool = True) -> Iterator[Task]: ...
+
+    def query(
+        self,
+        done: Optional[bool] = None,
+        priority: Optional[str] = None,
+        tag: Optional[str] = None,
+        text: Optional[str] = None,
+        due_before: Optional[date] = None,
+        done_since: Optional[datetime] = None,
+        sort: str = "id",
+        limit: Optional[int] = None,
+    ) -> List[Task]: ...
+
+    def changes(self, since: int = 0) -> List[Change]: ...
+
+
+def sort_key(sort: str) -> Tuple[Callable[[Task], tuple], bool]:
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in SORT_KEYS:
+        raise ValueError(f"Unknown sort field {name!r}; choose from {', '.join(SORT_KEYS)}")
+    return SORT_KEYS[name], descending
+
+
+def filter_tasks(
+    tasks: Iterable[Task],
+    done: Optional[bool] = None,
+    priority: Optional[str] = None,
+    tag: Optional[str] = None,
+    text: Optional[str] = None,
+    due_before: Optional[date] = None,
+    done_since: Optional[datetime] = None,
+    sort: str = "id",
+    limit: Optional[int] = None,
+) -> List[Task]:
+    """The ``query`` semantics over any task iterable.
+
+    ``due_before`` is inclusive and excludes tasks without a due date;
+    ``done_since`` keeps tasks completed at or after it, archived or not;
+    ``text`` matches title or note case-insensitively. ``sort`` names a key
+    from ``SORT_KEYS``, prefixed with ``-`` for descending order. With a
+    limit only the best ``limit`` tasks are kept (bounded heap).
+    """
+    key, descending = sort_key(sort)  # validate before any work
+    if limit is not None and limit <= 0:
+        return []
+    needle = text.lower() if text else None
+    matches = (
+        t for t in tasks
+        if (done is None or t.done == done)
+        and (priority is None or t.priority == priority)
+        and (tag is None or tag in (t.tags or []))
+        and (due_before is None or (t.due is not None and t.due <= due_before))
+        and (done_since is None or (t.done_at is not None and t.done_at >= done_since))
+        and (needle is None or needle in t.title.lower() or (t.note and needle in t.note.lower()))
+    )
+    if limit is not None:
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        return pick(limit, matches, key=key)
+    return sorted(matches, key=key, reverse=descending)
+
+
+class StoreMixin:
+    """Default ``StorageBackend`` methods built on ``iterate``.
+
+    Stores override whichever they can answer more cheaply; overrides are
+    wrapped with ``measured`` too, so every backend reports the same ops.
+    """
+
+    @measured
+    def get(self, task_id: int) -> Optional[Task]:
+        return next((t for t in self.iterate() if t.id == task_id), None)
+
+    @measured
+    def query(self, done: Optional[bool] = None, **criteria: Any) -> List[Task]:
+        return filter_tasks(self.iterate(include_done=done is not False), done=done, **criteria)
+
+
+class ChangeLog:
+    """Append-only JSON-lines change feed kept next to a file-based store.
+
+    A change's ``seq`` is the byte offset just past its line, so sequence
+    numbers grow monotonically and ``since(seq)`` seeks straight to the
+    unread part without an index.
+    """
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+
+    def append(self, op: str, task_ids: Iterable[int]) -> None:
+        lines = "".join(json.dumps({"op": op, "id": i}) + "\n" for i in task_ids)
+        if not lines:
+            return
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def since(self, seq: int = 0) -> List[Change]:
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return []
+        changes = []
+        with f:
+            f.seek(seq)
+            offset = seq
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # a writer is mid-append; pick it up next time
+                offset += len(line)
+                entry = json.loads(line)
+                changes.append(Change(offset, entry["op"], entry["id"]))
+        return changes
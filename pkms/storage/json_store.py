@@ -1,67 +1,417 @@
 from __future__ import annotations
 
 import json
+import os
+import threading
 from pathlib import Path
-from typing import List
-from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from datetime import datetime, timedelta
 
+from pkms.instrumentation import timed
+from pkms.metrics import REGISTRY, measured
 from pkms.models import Task
+from pkms.storage.base import Change, ChangeLog, StoreMixin
 
+# The hot file is one JSON document, {"header": {...}, "tasks": [...]}, with
+# the whole header on the first line so it can be read without parsing the
+# tasks. Schema 1 files (a bare list) and files with a bare header line
+# before the list are still read; both are rewritten this way on the next write.
+FORMAT = "pkms-tasks"
+SCHEMA_VERSION = 2
+HEADER_PREFIX = '{"header": '
 
-class JSONStore:
-    def __init__(self, path: Path | str) -> None:
+
+class JSONStore(StoreMixin):
+    """Tasks in one JSON file, with old completed tasks in a cold tier.
+
+    The file's first line holds its header: ``next_id``, the
+    ``open``/``done``/``archived`` counts, a ``version`` that every write
+    increments, and the schema version. ``header()`` and ``counts()`` read
+    only that line.
+
+    ``archive()`` moves tasks completed more than N days ago out of the main
+    ("hot") file into per-month segments under ``<name>.archive/``, so
+    open-task reads only parse the hot file. ``list(include_done=True)``,
+    ``search`` and ``delete`` read the segments transparently.
+
+    Every mutation is appended to ``<name>.changes`` (see ``ChangeLog``).
+
+    The parsed hot file is cached and reused while the file's inode, mtime
+    and size are unchanged; callers always get copies of the cached tasks.
+    """
+
+    metrics_label = "json"
+
+    def __init__(self, path: Path | str, archive_after_days: Optional[int] = None) -> None:
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.archive_dir = self.path.with_name(self.path.stem + ".archive")
+        self._log = ChangeLog(self.path.with_name(self.path.name + ".changes"))
+        # serializes read-modify-write cycles when one store is shared by
+        # several threads (web app requests + background summarizer)
+        self._lock = threading.RLock()
+        self._cache: Optional[Tuple[tuple, dict, List[Task]]] = None  # (file key, header, tasks)
         if not self.path.exists():
-            self._write([])
+            self._save({"version": 0, "next_id": 1, "archived": 0}, [])
+        if archive_after_days is not None:
+            self.archive(archive_after_days)
 
     # basic IO helpers
+    def _file_key(self) -> Optional[tuple]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    @staticmethod
+    def _copy(tasks: List[Task]) -> List[Task]:
+        copies = []
+        for t in tasks:
+            c = Task.__new__(Task)  # cheaper than copy.copy; Task has no __slots__
+            c.__dict__.update(t.__dict__)
+            c.tags = list(t.tags)
+            copies.append(c)
+        return copies
+
+    @timed("read")
+    def _load(self) -> Tuple[dict, List[Task]]:
+        """Header and tasks of the hot file; the tasks are the caller's to mutate."""
+        key = self._file_key()
+        cache = self._cache
+        hit = cache is not None and key is not None and cache[0] == key
+        REGISTRY.cache_lookup(self.metrics_label, "hot_file", hit)
+        if hit:
+            return dict(cache[1]), self._copy(cache[2])
+        data = self.path.read_bytes()
+        REGISTRY.add_bytes(self.metrics_label, "read", len(data))
+        text = data.decode("utf-8")
+        if text.lstrip().startswith("["):
+            tasks = [Task.from_dict(obj) for obj in json.loads(text)]
+            header = self._legacy_header(tasks)
+        elif text.startswith(HEADER_PREFIX):
+            document = json.loads(text)
+            header = self._check(document["header"])
+            tasks = [Task.from_dict(obj) for obj in document["tasks"]]
+        else:  # a bare header line, then the list
+            head, _, body = text.partition("\n")
+            header = self._check(json.loads(head))
+            tasks = [Task.from_dict(obj) for obj in json.loads(body)]
+        self._cache = (key, header, self._copy(tasks)) if key is not None else None
+        return dict(header), tasks
+
     def _read(self) -> List[Task]:
-        data = json.loads(self.path.read_text(encoding="utf-8"))
-        return [Task.from_dict(obj) for obj in data]
+        return self._load()[1]
+
+    def _check(self, header: dict) -> dict:
+        if header.get("format") != FORMAT:
+            raise ValueError(f"{self.path} is not a pkms task file")
+        if header.get("schema", 0) > SCHEMA_VERSION:
+            raise ValueError(
+                f"{self.path} uses schema {header['schema']}; this version reads {SCHEMA_VERSION}"
+            )
+        return header
+
+    def _legacy_header(self, tasks: List[Task]) -> dict:
+        """Derive the header of a schema 1 file (one full scan, then it is stored)."""
+        archived = list(self._archived())
+        return {
+            "format": FORMAT,
+            "schema": 1,
+            "version": 0,
+            "next_id": max([0] + [t.id or 0 for t in tasks + archived]) + 1,
+            "open": sum(1 for t in tasks if not t.done),
+            "done": sum(1 for t in tasks if t.done),
+            "archived": len(archived),
+        }
+
+    @timed("write")
+    def _save(self, header: dict, tasks: List[Task]) -> None:
+        """Write the hot file; counts are recomputed and the version bumped."""
+        serializable = [t.to_dict() for t in tasks]
+        done = sum(1 for t in serializable if t["done"])
+        header = {
+            "format": FORMAT,
+            "schema": SCHEMA_VERSION,
+            "version": header.get("version", 0) + 1,
+            "next_id": header["next_id"],
+            "open": len(serializable) - done,
+            "done": done,
+            "archived": header.get("archived", 0),
+        }
+        self._cache = None
+        self._write_text(
+            self.path,
+            HEADER_PREFIX + json.dumps(header) + ',\n"tasks": ' + json.dumps(serializable, indent=2) + "}\n",
+        )
+        key = self._file_key()
+        if key is not None:
+            self._cache = (key, header, self._copy(tasks))
+
+    def _write_text(self, path: Path, text: str) -> None:
+        data = text.encode("utf-8")
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+        REGISTRY.add_bytes(self.metrics_label, "write", len(data))
+
+    @measured
+    @timed("read")
+    def header(self) -> dict:
+        """The file header, read without parsing the task list."""
+        cache = self._cache
+        if cache is not None and cache[0] == self._file_key():
+            return dict(cache[1])
+        with open(self.path, encoding="utf-8") as f:
+            head = f.readline()
+        REGISTRY.add_bytes(self.metrics_label, "read", len(head.encode("utf-8")))
+        if head.lstrip().startswith("["):
+            return self._load()[0]
+        if head.startswith(HEADER_PREFIX):
+            head = head[len(HEADER_PREFIX):].rstrip().rstrip(",")
+        return self._check(json.loads(head))
+
+    @measured
+    def counts(self) -> Dict[str, int]:
+        """Number of open, done (hot tier) and archived tasks."""
+        header = self.header()
+        return {key: header[key] for key in ("open", "done", "archived")}
+
+    # cold tier: one JSON list per month of completion
+    def _segments(self) -> List[Path]:
+        if not self.archive_dir.exists():
+            return []
+        return sorted(self.archive_dir.glob("tasks-*.json"))
+
+    @timed("read")
+    def _read_segment(self, segment: Path) -> List[Task]:
+        data = segment.read_bytes()
+        REGISTRY.add_bytes(self.metrics_label, "read", len(data))
+        return [Task.from_dict(obj) for obj in json.loads(data)]
+
+    @timed("write")
+    def _write_segment(self, segment: Path, tasks: List[Task]) -> None:
+        self._write_text(segment, json.dumps([t.to_dict() for t in tasks], indent=2))
 
-    def _write(self, tasks: List[Task | dict]) -> None:
-        serializable = [t.to_dict() if isinstance(t, Task) else t for t in tasks]
-        self.path.write_text(json.dumps(serializable, indent=2), encoding="utf-8")
+    def _archived(self, skip_ids: frozenset = frozenset()) -> Iterator[Task]:
+        for segment in self._segments():
+            for t in self._read_segment(segment):
+                if t.id not in skip_ids:  # hot copy wins if an archive run was interrupted
+                    yield t
+
+    def _update_archived(self, task_id: int, change: Callable[[List[Task]], None]) -> bool:
+        """Apply ``change`` to the archive segment holding ``task_id``, if any."""
+        for segment in self._segments():
+            tasks = self._read_segment(segment)
+            if any(t.id == task_id for t in tasks):
+                change(tasks)
+                if tasks:
+                    self._write_segment(segment, tasks)
+                else:
+                    segment.unlink()
+                return True
+        return False
+
+    def _archived_ids(self, task_ids: Set[int]) -> Set[int]:
+        """Those of ``task_ids`` with a copy in the archive segments."""
+        if not task_ids or not self._segments():
+            return set()
+        return {t.id for t in self._archived()} & task_ids
+
+    def _prune_archived(self, task_ids: Set[int]) -> None:
+        """Drop ``task_ids`` from the archive segments (their hot copies are already saved)."""
+        for segment in self._segments():
+            tasks = self._read_segment(segment)
+            kept = [t for t in tasks if t.id not in task_ids]
+            if len(kept) == len(tasks):
+                continue
+            if kept:
+                self._write_segment(segment, kept)
+            else:
+                segment.unlink()
+
+    @measured
+    def archive(self, older_than_days: int = 30, now: Optional[datetime] = None) -> int:
+        """Move tasks completed more than ``older_than_days`` ago to the cold tier."""
+        cutoff = (now or datetime.utcnow()) - timedelta(days=older_than_days)
+        with self._lock:
+            header, tasks = self._load()
+            by_month: Dict[str, List[Task]] = {}
+            hot = []
+            for t in tasks:
+                if t.done and t.done_at and t.done_at < cutoff:
+                    by_month.setdefault(t.done_at.strftime("%Y-%m"), []).append(t)
+                else:
+                    hot.append(t)
+            if not by_month:
+                return 0
+            self.archive_dir.mkdir(parents=True, exist_ok=True)
+            # segments first: a crash in between leaves a duplicate, never a loss
+            for month, moved in by_month.items():
+                segment = self.archive_dir / f"tasks-{month}.json"
+                existing = self._read_segment(segment) if segment.exists() else []
+                moved_ids = {t.id for t in moved}
+                self._write_segment(segment, [t for t in existing if t.id not in moved_ids] + moved)
+            moved_count = len(tasks) - len(hot)
+            # next_id in the header keeps archived ids from being handed out again
+            self._save(dict(header, archived=header.get("archived", 0) + moved_count), hot)
+            return moved_count
 
     # public API used by main.py
-    def list(self, include_done: bool = False) -> List[Task]:
-        tasks = self._read()
-        return tasks if include_done else [t for t in tasks if not t.done]
+    @measured
+    def list(self, include_done: bool = False, include_archived: bool = True) -> List[Task]:
+        header, tasks = self._load()
+        if not include_done:
+            return [t for t in tasks if not t.done]
+        if include_archived and header.get("archived"):
+            hot_ids = frozenset(t.id for t in tasks)
+            tasks = sorted(tasks + list(self._archived(hot_ids)), key=lambda t: t.id or 0)
+        return tasks
 
+    @measured
     def add(self, t: Task) -> int:
-        tasks = self._read()
-        new_id = (max((x.id or 0) for x in tasks) + 1) if tasks else 1
-        t.id = new_id
-        tasks.append(t)
-        self._write(tasks)
-        return new_id
+        with self._lock:
+            header, tasks = self._load()
+            new_id = header["next_id"]
+            t.id = new_id
+            tasks.append(t)
+            self._save(dict(header, next_id=new_id + 1), tasks)
+            self._log.append("put", [new_id])
+            return new_id
 
+    @measured
     def complete(self, task_id: int) -> bool:
-        tasks = self._read()
-        changed = False
-        for t in tasks:
-            if t.id == task_id and not t.done:
-                t.done = True
-                t.done_at = datetime.utcnow()
-                changed = True
-                break
-        if changed:
-            self._write(tasks)
-        return changed
+        with self._lock:
+            header, tasks = self._load()
+            changed = False
+            for t in tasks:
+                if t.id == task_id and not t.done:
+                    t.done = True
+                    t.done_at = datetime.utcnow()
+                    changed = True
+                    break
+            if changed:
+                self._save(header, tasks)
+                self._log.append("put", [task_id])
+            return changed
 
+    @measured
     def delete(self, task_id: int) -> bool:
-        tasks = self._read()
-        before = len(tasks)
-        tasks = [t for t in tasks if t.id != task_id]
-        if len(tasks) != before:
-            self._write(tasks)
+        with self._lock:
+            header, tasks = self._load()
+            before = len(tasks)
+            tasks = [t for t in tasks if t.id != task_id]
+            # also drops an archived copy an interrupted write left next to the hot one
+            in_archive = self._remove_archived(task_id)
+            if len(tasks) == before and not in_archive:
+                return False
+            if len(tasks) == before:
+                header = dict(header, archived=max(0, header.get("archived", 0) - 1))
+            self._save(header, tasks)
+            self._log.append("delete", [task_id])
             return True
-        return False
 
+    def _remove_archived(self, task_id: int) -> bool:
+        def remove(archived: List[Task]) -> None:
+            archived[:] = [t for t in archived if t.id != task_id]
+
+        return self._update_archived(task_id, remove)
+
+    @measured
+    def set_summary(self, task_id: int, summary: str, summary_hash: str) -> bool:
+        with self._lock:
+            header, tasks = self._load()
+            for t in tasks:
+                if t.id == task_id:
+                    t.summary = summary
+                    t.summary_hash = summary_hash
+                    self._save(header, tasks)
+                    self._log.append("put", [task_id])
+                    return True
+
+            def update(archived: List[Task]) -> None:
+                for t in archived:
+                    if t.id == task_id:
+                        t.summary = summary
+                        t.summary_hash = summary_hash
+
+            if not self._update_archived(task_id, update):
+                return False
+            self._save(header, tasks)  # bump the version so caches see the change
+            self._log.append("put", [task_id])
+            return True
+
+    # StorageBackend
+    @measured
+    def get(self, task_id: int) -> Optional[Task]:
+        header, tasks = self._load()
+        for t in tasks:
+            if t.id == task_id:
+                return t
+        if header.get("archived"):
+            return next((t for t in self._archived() if t.id == task_id), None)
+        return None
+
+    @measured
+    def iterate(self, include_done: bool = True, include_archived: bool = True) -> Iterator[Task]:
+        yield from self.list(include_done=include_done, include_archived=include_archived)
+
+    @measured
+    def put_many(self, tasks: Iterable[Task]) -> List[int]:
+        """Insert or replace tasks in one write; tasks without an id get a new one."""
+        tasks = list(tasks)
+        with self._lock:
+            header, current = self._load()
+            by_id = {t.id: t for t in current}
+            next_id = header["next_id"]
+            ids = []
+            for t in tasks:
+                if t.id is None:
+                    t.id = next_id
+                next_id = max(next_id, t.id + 1)
+                ids.append(t.id)
+            if not ids:
+                return ids
+            # a put brings an archived task back to the hot tier; archived copies
+            # of tasks already hot are leftovers of an interrupted write
+            in_archive = self._archived_ids(set(ids))
+            revived = in_archive - set(by_id)
+            by_id.update((t.id, t) for t in tasks)
+            merged = sorted(by_id.values(), key=lambda t: t.id or 0)
+            archived = header.get("archived", 0) - len(revived)
+            self._save(dict(header, next_id=next_id, archived=archived), merged)
+            # pruned only after the hot file holds them: a crash in between leaves
+            # a duplicate, which readers settle by id, instead of losing the task
+            if in_archive:
+                self._prune_archived(in_archive)
+            self._log.append("put", ids)
+            return ids
+
+    @measured
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        with self._lock:
+            header, tasks = self._load()
+            wanted = set(task_ids)
+            kept = [t for t in tasks if t.id not in wanted]
+            hot = {t.id for t in tasks} & wanted
+            in_archive = self._archived_ids(wanted)
+            deleted = hot | in_archive
+            archived = header.get("archived", 0) - len(in_archive - hot)
+            if in_archive:
+                self._prune_archived(in_archive)
+            if deleted:
+                self._save(dict(header, archived=archived), kept)
+                self._log.append("delete", sorted(deleted))
+            return len(deleted)
+
+    @measured
+    def changes(self, since: int = 0) -> List[Change]:
+        return self._log.since(since)
+
+    @measured
     def search(self, keyword: str) -> List[Task]:
         keyword = keyword.lower()
         return [
-            t for t in self._read()
+            t for t in self.list(include_done=True)
             if keyword in t.title.lower() or (t.note and keyword in t.note.lower())
         ]
@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import threading
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pkms.instrumentation import timed
+from pkms.metrics import REGISTRY, measured
+from pkms.models import Task
+from pkms.storage.base import Change, ChangeLog, StoreMixin
+
+# File header: magic, format version, record size, slots used, next id.
+HEADER = struct.Struct("<8sIIQQ")
+MAGIC = b"PKMSREC1"
+VERSION = 1
+
+# One fixed-size record per task, in slot ``id - 1``:
+#   id (0 = deleted), flags, priority, due (date ordinal, 0 = none),
+#   created_at, done_at (microseconds since the epoch, naive UTC),
+#   then (offset, length) into the string heap for title, note, tags,
+#   summary and summary_hash.
+RECORD = struct.Struct("<QIB3xiqq" + "QI" * 5)
+STRINGS = ("title", "note", "tags", "summary", "summary_hash")
+FLAGS_OFFSET = struct.calcsize("<Q")
+DONE_AT_OFFSET = struct.calcsize("<QIB3xiq")
+
+FLAG_DONE = 1
+FLAG_DONE_AT = 2
+NONE_LENGTH = 0xFFFFFFFF  # marks a string field that is None
+TAG_SEP = "\x1f"
+
+PRIORITIES = ("low", "normal", "high", "urgent")
+EPOCH = datetime(1970, 1, 1)
+GROW_SLOTS = 1024
+
+
+def _micros(dt: datetime) -> int:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - EPOCH) // timedelta(microseconds=1)
+
+
+def _datetime(micros: int) -> datetime:
+    return EPOCH + timedelta(microseconds=micros)
+
+
+class MMapStore(StoreMixin):
+    """Tasks as fixed-size binary records in a memory-mapped file.
+
+    Task ``n`` lives in slot ``n - 1`` and ids are never reused, so getting,
+    completing or deleting a task touches one record. Variable-length
+    strings are appended to a separate ``.heap`` file and referenced by
+    offset; an edit appends the new value and leaves the old bytes behind.
+    Scans run over the mapped record array, and strings are decoded only
+    for tasks that pass the flag filter. Each mutation flushes the records
+    it changed and is appended to a ``.changes`` log (see ``ChangeLog``).
+    """
+
+    metrics_label = "mmap"
+
+    def __init__(self, path: Path | str, archive_after_days: Optional[int] = None) -> None:
+        # archive_after_days is accepted for a uniform constructor; there is no cold tier
+        self.path = Path(path)
+        self.heap_path = self.path.with_name(self.path.name + ".heap")
+        self._log = ChangeLog(self.path.with_name(self.path.name + ".changes"))
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        if not self.path.exists():
+            with open(self.path, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0, 1))
+                f.truncate(HEADER.size + GROW_SLOTS * RECORD.size)
+        self._file = open(self.path, "r+b")
+        self._heap = open(self.heap_path, "a+b")
+        self._heap_mm: Optional[mmap.mmap] = None
+        self._dirty: Optional[Tuple[int, int]] = None  # record bytes changed since the last _sync
+        self._map()
+        magic, version, record_size, _, _ = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or record_size != RECORD.size:
+            raise ValueError(f"{self.path} is not a pkms record file")
+        if version > VERSION:
+            raise ValueError(f"{self.path} uses record format {version}; this version reads {VERSION}")
+
+    def _map(self) -> None:
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self._mm.flush()
+            self._mm.close()
+            if self._heap_mm is not None:
+                self._heap_mm.close()
+            self._file.close()
+            self._heap.close()
+
+    # header helpers
+    def _header(self) -> Tuple[int, int]:
+        """(slots used, next id); remaps if another writer grew the file."""
+        _, _, _, count, next_id = HEADER.unpack_from(self._mm, 0)
+        if HEADER.size + count * RECORD.size > len(self._mm):
+            self._sync()
+            self._mm.close()
+            self._map()
+        return count, next_id
+
+    def _set_header(self, count: int, next_id: int) -> None:
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, RECORD.size, count, next_id)
+        self._touch(0, HEADER.size)
+
+    # write-back: each mutator flushes the bytes it changed before returning
+    def _touch(self, offset: int, size: int) -> None:
+        start, end = self._dirty or (offset, offset + size)
+        self._dirty = (min(start, offset), max(end, offset + size))
+
+    def _sync(self) -> None:
+        """Flush the changed part of the record map (msync only writes dirty pages)."""
+        if self._dirty is None:
+            return
+        start, end = self._dirty
+        start -= start % mmap.ALLOCATIONGRANULARITY  # flush offsets must be page aligned
+        self._mm.flush(start, end - start)
+        self._dirty = None
+
+    def _offset(self, task_id: int) -> Optional[int]:
+        count, _ = self._header()
+        if not task_id or task_id < 1 or task_id > count:
+            return None
+        offset = HEADER.size + (task_id - 1) * RECORD.size
+        if struct.unpack_from("<Q", self._mm, offset)[0] != task_id:
+            return None  # deleted
+        return offset
+
+    # string heap
+    def _put_string(self, value: Optional[str]) -> Tuple[int, int]:
+        if value is None:
+            return 0, NONE_LENGTH
+        data = value.encode("utf-8")
+        self._heap.seek(0, os.SEEK_END)
+        offset = self._heap.tell()
+        self._heap.write(data)
+        REGISTRY.add_bytes(self.metrics_label, "write", len(data))
+        return offset, len(data)
+
+    def _get_string(self, offset: int, length: int) -> Optional[str]:
+        if length == NONE_LENGTH:
+            return None
+        if not length:
+            return ""
+        end = offset + length
+        if self._heap_mm is None or end > len(self._heap_mm):
+            # the heap only grows: map it again to cover newly appended strings
+            if self._heap_mm is not None:
+                self._heap_mm.close()
+            self._heap.flush()
+            self._heap_mm = mmap.mmap(self._heap.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._heap_mm[offset:end].decode("utf-8")
+
+    # record encoding
+    def _decode(self, fields: tuple) -> Task:
+        id_, flags, priority, due, created, done_at = fields[:6]
+        refs = fields[6:]
+        strings = [self._get_string(refs[i], refs[i + 1]) for i in range(0, len(refs), 2)]
+        title, note, tags, summary, summary_hash = strings
+        return Task(
+            id=id_,
+            title=title or "",
+            priority=PRIORITIES[priority] if priority < len(PRIORITIES) else "normal",
+            due=date.fromordinal(due) if due else None,
+            tags=tags.split(TAG_SEP) if tags else [],
+            note=note,
+            created_at=_datetime(created),
+            done=bool(flags & FLAG_DONE),
+            done_at=_datetime(done_at) if flags & FLAG_DONE_AT else None,
+            summary=summary,
+            summary_hash=summary_hash,
+        )
+
+    def _write_record(self, offset: int, t: Task) -> None:
+        flags = (FLAG_DONE if t.done else 0) | (FLAG_DONE_AT if t.done_at else 0)
+        refs: List[int] = []
+        for name in STRINGS:
+            value = getattr(t, name)
+            if name == "tags":
+                value = TAG_SEP.join(value) if value else None
+            refs.extend(self._put_string(value))
+        self._heap.flush()  # strings must be on disk before a record points at them
+        RECORD.pack_into(
+            self._mm,
+            offset,
+            t.id,
+            flags,
+            PRIORITIES.index(t.priority) if t.priority in PRIORITIES else 1,
+            t.due.toordinal() if t.due else 0,
+            _micros(t.created_at),
+            _micros(t.done_at) if t.done_at else 0,
+            *refs,
+        )
+        self._touch(offset, RECORD.size)
+        REGISTRY.add_bytes(self.metrics_label, "write", RECORD.size)
+
+    def _records(self) -> Iterator[tuple]:
+        count, _ = self._header()
+        body = memoryview(self._mm)[HEADER.size : HEADER.size + count * RECORD.size]
+        try:
+            yield from RECORD.iter_unpack(body)
+        finally:
+            body.release()
+
+    # public API used by main.py
+    @measured
+    @timed("read")
+    def get(self, task_id: int) -> Optional[Task]:
+        with self._lock:
+            offset = self._offset(task_id)
+            return self._decode(RECORD.unpack_from(self._mm, offset)) if offset is not None else None
+
+    @measured
+    @timed("read")
+    def counts(self) -> Dict[str, int]:
+        """Number of open and done tasks; a flag scan that decodes no strings."""
+        open_ = done = 0
+        with self._lock:
+            for fields in self._records():
+                if fields[0]:
+                    if fields[1] & FLAG_DONE:
+                        done += 1
+                    else:
+                        open_ += 1
+        return {"open": open_, "done": done, "archived": 0}
+
+    @measured
+    @timed("read")
+    def list(self, include_done: bool = False, include_archived: bool = True) -> List[Task]:
+        # no cold tier: every task is in the record file, so include_archived has no effect
+        with self._lock:
+            return [
+                self._decode(fields)
+                for fields in self._records()
+                if fields[0] and (include_done or not fields[1] & FLAG_DONE)
+            ]
+
+    @measured
+    @timed("write")
+    def add(self, t: Task) -> int:
+        with self._lock:
+            _, next_id = self._header()
+            t.id = next_id
+            self._put(t)
+            self._sync()
+            self._log.append("put", [next_id])
+            return next_id
+
+    def _put(self, t: Task) -> None:
+        """Write ``t`` into slot ``t.id - 1``, growing the file if needed."""
+        count, next_id = self._header()
+        needed = HEADER.size + t.id * RECORD.size
+        if needed > len(self._mm):
+            self._sync()
+            self._mm.close()
+            self._file.truncate(needed + GROW_SLOTS * RECORD.size)
+            self._map()
+        self._write_record(HEADER.size + (t.id - 1) * RECORD.size, t)
+        self._set_header(max(count, t.id), max(next_id, t.id + 1))
+
+    @measured
+    @timed("write")
+    def complete(self, task_id: int) -> bool:
+        with self._lock:
+            offset = self._offset(task_id)
+            if offset is None:
+                return False
+            fields = RECORD.unpack_from(self._mm, offset)
+            if fields[1] & FLAG_DONE:
+                return False
+            # flags and done_at are fixed-width: update them in place
+            struct.pack_into("<I", self._mm, offset + FLAGS_OFFSET, fields[1] | FLAG_DONE | FLAG_DONE_AT)
+            struct.pack_into("<q", self._mm, offset + DONE_AT_OFFSET, _micros(datetime.utcnow()))
+            self._touch(offset, RECORD.size)
+            self._sync()
+            self._log.append("put", [task_id])
+            return True
+
+    @measured
+    @timed("write")
+    def delete(self, task_id: int) -> bool:
+        with self._lock:
+            offset = self._offset(task_id)
+            if offset is None:
+                return False
+            struct.pack_into("<Q", self._mm, offset, 0)
+            self._touch(offset, RECORD.size)
+            self._sync()
+            self._log.append("delete", [task_id])
+            return True
+
+    @measured
+    @timed("write")
+    def set_summary(self, task_id: int, summary: str, summary_hash: str) -> bool:
+        with self._lock:
+            offset = self._offset(task_id)
+            if offset is None:
+                return False
+            task = self._decode(RECORD.unpack_from(self._mm, offset))
+            task.summary = summary
+            task.summary_hash = summary_hash
+            self._write_record(offset, task)
+            self._sync()
+            self._log.append("put", [task_id])
+            return True
+
+    @measured
+    def search(self, keyword: str) -> List[Task]:
+        keyword = keyword.lower()
+        return [
+            t for t in self.list(include_done=True)
+            if keyword in t.title.lower() or (t.note and keyword in t.note.lower())
+        ]
+
+    # StorageBackend
+    @measured
+    def iterate(self, include_done: bool = True, include_archived: bool = True) -> Iterator[Task]:
+        """Stream tasks in id order, decoding one chunk of records at a time."""
+        start = 0
+        while True:
+            with self._lock:
+                count, _ = self._header()
+                end = min(start + GROW_SLOTS, count)
+                first = HEADER.size + start * RECORD.size
+                body = memoryview(self._mm)[first : first + (end - start) * RECORD.size]
+                try:
+                    chunk = [
+                        self._decode(fields)
+                        for fields in RECORD.iter_unpack(body)
+                        if fields[0] and (include_done or not fields[1] & FLAG_DONE)
+                    ]
+                finally:
+                    body.release()
+            yield from chunk
+            if end >= count:
+                return
+            start = end
+
+    @measured
+    @timed("write")
+    def put_many(self, tasks: Iterable[Task]) -> List[int]:
+        """Insert or replace tasks; tasks without an id get a new one."""
+        ids: List[int] = []
+        with self._lock:
+            for t in tasks:
+                if t.id is None:
+                    t.id = self._header()[1]
+                self._put(t)
+                ids.append(t.id)
+            self._sync()
+            self._log.append("put", ids)
+        return ids
+
+    @measured
+    @timed("write")
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        deleted: List[int] = []
+        with self._lock:
+            for task_id in task_ids:
+                offset = self._offset(task_id)
+                if offset is not None:
+                    struct.pack_into("<Q", self._mm, offset, 0)
+                    self._touch(offset, RECORD.size)
+                    deleted.append(task_id)
+            self._sync()
+            self._log.append("delete", deleted)
+        return len(deleted)
+
+    @measured
+    def changes(self, since: int = 0) -> List[Change]:
+        return self._log.since(since)
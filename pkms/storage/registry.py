@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from functools import partial
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from pkms.storage.adapters import ChatTaskStore, TaskManagerStore
+from pkms.storage.base import StorageBackend
+from pkms.storage.json_store import JSONStore
+from pkms.storage.mmap_store import MMapStore
+from pkms.storage.sqlite_store import SQLiteStore
+
+# backend name -> (factory(path, **options), default path)
+BACKENDS: Dict[str, Tuple[Callable[..., StorageBackend], Path]] = {
+    "sqlite": (SQLiteStore, Path("~/.pkms/tasks.db").expanduser()),
+    "json": (JSONStore, Path("~/.pkms/tasks.json").expanduser()),
+    "mmap": (MMapStore, Path("~/.pkms/tasks.rec").expanduser()),
+    # other front-ends' files, where those front-ends look for them by default
+    "chat": (ChatTaskStore, Path("tasks_data.json")),
+    "tasks2": (partial(TaskManagerStore, summaries=True), Path("data")),
+    "tasks3": (TaskManagerStore, Path("data")),
+}
+
+
+def register(name: str, factory: Callable[..., StorageBackend], default_path: Path | str) -> None:
+    """Make a backend available to ``open_store`` (and so to ``--storage``).
+
+    ``factory`` is called as ``factory(path, **options)``. main.py adds
+    ``archive_after_days=N`` when ``--archive-after`` is non-zero (the
+    default is 30), so a factory should accept that keyword and may ignore
+    it if the backend has no cold tier, as ``MMapStore`` does.
+    """
+    BACKENDS[name] = (factory, Path(default_path).expanduser())
+
+
+def open_store(name: str, path: Optional[Path | str] = None, **options: Any) -> StorageBackend:
+    """Open backend ``name`` at ``path`` (or its default path); ``options`` go to its constructor."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage {name!r}; choose from {', '.join(BACKENDS)}")
+    factory, default_path = BACKENDS[name]
+    return factory(path or default_path, **options)
+
+
+def migrate(source: StorageBackend, target: StorageBackend, batch_size: int = 1000) -> int:
+    """Copy every task, archived ones included, from ``source`` to ``target``.
+
+    Tasks stream through in batches of ``batch_size`` and keep their ids;
+    tasks already in ``target`` with the same id are replaced. Returns the
+    number of tasks copied.
+    """
+    tasks = source.iterate(include_done=True, include_archived=True)
+    copied = 0
+    while True:
+        batch = list(islice(tasks, batch_size))
+        if not batch:
+            return copied
+        target.put_many(batch)
+        copied += len(batch)
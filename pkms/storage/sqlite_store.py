@@ -2,10 +2,13 @@ from __future__ import annotations
 
 import sqlite3
 from pathlib import Path
-from typing import List
-from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+from datetime import date, datetime, timedelta
 
+from pkms.instrumentation import timed
+from pkms.metrics import measured
 from pkms.models import Task
+from pkms.storage.base import PRIORITY_RANK, Change, StoreMixin, sort_key
 
 
 SCHEMA = """
@@ -18,20 +21,125 @@ CREATE TABLE IF NOT EXISTS tasks (
   note TEXT,
   created_at TEXT NOT NULL,
   done INTEGER NOT NULL DEFAULT 0,
-  done_at TEXT
+  done_at TEXT,
+  summary TEXT,
+  summary_hash TEXT
 );
 """
 
+# cold tier: tasks completed long ago, same columns; only read for history queries
+ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks_archive (
+  id INTEGER PRIMARY KEY,
+  title TEXT NOT NULL,
+  priority TEXT NOT NULL,
+  due TEXT,
+  tags TEXT,
+  note TEXT,
+  created_at TEXT NOT NULL,
+  done INTEGER NOT NULL DEFAULT 0,
+  done_at TEXT,
+  summary TEXT,
+  summary_hash TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_done ON tasks(done, done_at);
+"""
+
+# change feed, filled by triggers; moving a task between tiers is not a change
+CHANGES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS task_changes (
+  seq INTEGER PRIMARY KEY AUTOINCREMENT,
+  op TEXT NOT NULL,
+  task_id INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS tasks_put AFTER INSERT ON tasks BEGIN
+  INSERT INTO task_changes (op, task_id) VALUES ('put', new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_update AFTER UPDATE ON tasks BEGIN
+  INSERT INTO task_changes (op, task_id) VALUES ('put', new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_delete AFTER DELETE ON tasks
+WHEN NOT EXISTS (SELECT 1 FROM tasks_archive WHERE id = old.id) BEGIN
+  INSERT INTO task_changes (op, task_id) VALUES ('delete', old.id);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_archive_update AFTER UPDATE ON tasks_archive BEGIN
+  INSERT INTO task_changes (op, task_id) VALUES ('put', new.id);
+END;
+CREATE TRIGGER IF NOT EXISTS tasks_archive_delete AFTER DELETE ON tasks_archive
+WHEN NOT EXISTS (SELECT 1 FROM tasks WHERE id = old.id) BEGIN
+  INSERT INTO task_changes (op, task_id) VALUES ('delete', old.id);
+END;
+"""
 
-class SQLiteStore:
-    def __init__(self, path: Path | str) -> None:
+# columns added after the first release; older databases get them on open
+MIGRATIONS = {
+    "summary": "ALTER TABLE tasks ADD COLUMN summary TEXT",
+    "summary_hash": "ALTER TABLE tasks ADD COLUMN summary_hash TEXT",
+}
+
+COLUMNS = "id, title, priority, due, tags, note, created_at, done, done_at, summary, summary_hash"
+
+# SQL for base.SORT_KEYS; each term gets DESC for a descending sort
+SORT_SQL = {
+    "id": ["id"],
+    "priority": [
+        "CASE priority "
+        + " ".join(f"WHEN '{name}' THEN {rank}" for name, rank in PRIORITY_RANK.items())
+        + " ELSE 2 END",
+        "id",
+    ],
+    "due": ["due IS NULL", "due", "id"],
+    "created": ["created_at", "id"],
+}
+
+
+
+def _contains_pattern(text: str) -> str:
+    """``LIKE ... ESCAPE '\\'`` pattern matching ``text`` anywhere, wildcards taken literally."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+class SQLiteStore(StoreMixin):
+    """Tasks in SQLite; ``archive()`` moves old completed tasks to ``tasks_archive``.
+
+    Open-task queries only touch ``tasks``. ``list(include_done=True)``,
+    ``search``, ``delete`` and ``set_summary`` also cover the archive table.
+    ``query`` runs as one SQL statement; ``changes`` reads ``task_changes``.
+    """
+
+    metrics_label = "sqlite"
+
+    def __init__(self, path: Path | str, archive_after_days: Optional[int] = None) -> None:
         self.path = Path(path)
         self.path.parent.mkdir(parents=True, exist_ok=True)
         with sqlite3.connect(self.path) as con:
             con.execute(SCHEMA)
+            existing = {row[1] for row in con.execute("PRAGMA table_info(tasks)")}
+            for column, ddl in MIGRATIONS.items():
+                if column not in existing:
+                    con.execute(ddl)
+            con.executescript(ARCHIVE_SCHEMA)
+            con.executescript(CHANGES_SCHEMA)
+        if archive_after_days is not None:
+            self.archive(archive_after_days)
+
+    @measured
+    @timed("write")
+    def archive(self, older_than_days: int = 30, now: Optional[datetime] = None) -> int:
+        """Move tasks completed more than ``older_than_days`` ago to the archive table."""
+        cutoff = ((now or datetime.utcnow()) - timedelta(days=older_than_days)).isoformat()
+        with sqlite3.connect(self.path) as con:
+            con.execute(
+                f"INSERT OR REPLACE INTO tasks_archive ({COLUMNS})"
+                f" SELECT {COLUMNS} FROM tasks WHERE done = 1 AND done_at < ?",
+                (cutoff,),
+            )
+            cur = con.execute("DELETE FROM tasks WHERE done = 1 AND done_at < ?", (cutoff,))
+            return cur.rowcount
 
     def _row_to_task(self, row) -> Task:
-        (id_, title, priority, due, tags, note, created_at, done, done_at) = row
+        (id_, title, priority, due, tags, note, created_at, done, done_at, summary, summary_hash) = row
         return Task.from_dict(
             {
                 "id": id_,
@@ -43,36 +151,63 @@ class SQLiteStore:
                 "created_at": created_at,
                 "done": bool(done),
                 "done_at": done_at,
+                "summary": summary,
+                "summary_hash": summary_hash,
             }
         )
 
-    def list(self, include_done: bool = False) -> List[Task]:
+    @measured
+    @timed("read")
+    def counts(self) -> Dict[str, int]:
+        """Number of open, done (hot tier) and archived tasks."""
         with sqlite3.connect(self.path) as con:
-            cur = con.execute(
-                "SELECT id, title, priority, due, tags, note, created_at, done, done_at FROM tasks"
-                + ("" if include_done else " WHERE done = 0")
-                + " ORDER BY id"
-            )
+            open_, done = con.execute(
+                "SELECT COALESCE(SUM(done = 0), 0), COALESCE(SUM(done = 1), 0) FROM tasks"
+            ).fetchone()
+            (archived,) = con.execute("SELECT COUNT(*) FROM tasks_archive").fetchone()
+        return {"open": open_, "done": done, "archived": archived}
+
+    @measured
+    @timed("read")
+    def list(self, include_done: bool = False, include_archived: bool = True) -> List[Task]:
+        sql = f"SELECT {COLUMNS} FROM tasks" + ("" if include_done else " WHERE done = 0")
+        if include_done and include_archived:
+            sql += f" UNION ALL SELECT {COLUMNS} FROM tasks_archive"
+        with sqlite3.connect(self.path) as con:
+            cur = con.execute(sql + " ORDER BY id")
             return [self._row_to_task(r) for r in cur.fetchall()]
 
+    @staticmethod
+    def _task_to_row(t: Task) -> tuple:
+        return (
+            t.title,
+            t.priority,
+            (t.due.isoformat() if t.due else None),
+            ("".join([]) if not t.tags else ",".join(t.tags)),
+            t.note,
+            t.created_at.isoformat(),
+            int(t.done),
+            (t.done_at.isoformat() if t.done_at else None),
+            t.summary,
+            t.summary_hash,
+        )
+
+    def _insert(self, con: sqlite3.Connection, t: Task) -> int:
+        cur = con.execute(
+            "INSERT INTO tasks (title, priority, due, tags, note, created_at, done, done_at,"
+            " summary, summary_hash) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            self._task_to_row(t),
+        )
+        return int(cur.lastrowid)
+
+    @measured
+    @timed("write")
     def add(self, t: Task) -> int:
         with sqlite3.connect(self.path) as con:
-            cur = con.execute(
-                "INSERT INTO tasks (title, priority, due, tags, note, created_at, done, done_at)"
-                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                (
-                    t.title,
-                    t.priority,
-                    (t.due.isoformat() if t.due else None),
-                    ("".join([]) if not t.tags else ",".join(t.tags)),
-                    t.note,
-                    t.created_at.isoformat(),
-                    int(t.done),
-                    (t.done_at.isoformat() if t.done_at else None),
-                ),
-            )
-            return int(cur.lastrowid)
+            return self._insert(con, t)
 
+    @measured
+    @timed("write")
     def complete(self, task_id: int) -> bool:
         with sqlite3.connect(self.path) as con:
             cur = con.execute(
@@ -81,17 +216,155 @@ class SQLiteStore:
             )
             return cur.rowcount > 0
 
+    @measured
+    @timed("write")
+    def set_summary(self, task_id: int, summary: str, summary_hash: str) -> bool:
+        with sqlite3.connect(self.path) as con:
+            changed = 0
+            for table in ("tasks", "tasks_archive"):
+                cur = con.execute(
+                    f"UPDATE {table} SET summary = ?, summary_hash = ? WHERE id = ?",
+                    (summary, summary_hash, task_id),
+                )
+                changed += cur.rowcount
+            return changed > 0
+
+    @measured
+    @timed("write")
     def delete(self, task_id: int) -> bool:
         with sqlite3.connect(self.path) as con:
             cur = con.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            if cur.rowcount:
+                return True
+            cur = con.execute("DELETE FROM tasks_archive WHERE id = ?", (task_id,))
             return cur.rowcount > 0
 
+    @measured
+    @timed("read")
     def search(self, keyword: str) -> List[Task]:
-        kw = f"%{keyword.lower()}%"
+        kw = _contains_pattern(keyword.lower())
         with sqlite3.connect(self.path) as con:
+            where = " WHERE lower(title) LIKE ? ESCAPE '\\' OR lower(note) LIKE ? ESCAPE '\\'"
             cur = con.execute(
-                "SELECT id, title, priority, due, tags, note, created_at, done, done_at"
-                " FROM tasks WHERE lower(title) LIKE ? OR lower(note) LIKE ?",
-                (kw, kw),
+                f"SELECT {COLUMNS} FROM tasks{where}"
+                f" UNION ALL SELECT {COLUMNS} FROM tasks_archive{where} ORDER BY id",
+                (kw, kw, kw, kw),
             )
             return [self._row_to_task(r) for r in cur.fetchall()]
+
+    # StorageBackend
+    @measured
+    @timed("read")
+    def get(self, task_id: int) -> Optional[Task]:
+        with sqlite3.connect(self.path) as con:
+            row = con.execute(
+                f"SELECT {COLUMNS} FROM tasks WHERE id = ?"
+                f" UNION ALL SELECT {COLUMNS} FROM tasks_archive WHERE id = ?",
+                (task_id, task_id),
+            ).fetchone()
+        return self._row_to_task(row) if row else None
+
+    @measured
+    def iterate(self, include_done: bool = True, include_archived: bool = True) -> Iterator[Task]:
+        """Stream tasks in id order without materializing the whole table."""
+        sql = f"SELECT {COLUMNS} FROM tasks" + ("" if include_done else " WHERE done = 0")
+        if include_done and include_archived:
+            sql += f" UNION ALL SELECT {COLUMNS} FROM tasks_archive"
+        con = sqlite3.connect(self.path)
+        try:
+            cur = con.execute(sql + " ORDER BY id")
+            while True:
+                rows = cur.fetchmany(1000)
+                if not rows:
+                    break
+                for row in rows:
+                    yield self._row_to_task(row)
+        finally:
+            con.close()
+
+    @measured
+    @timed("write")
+    def put_many(self, tasks: Iterable[Task]) -> List[int]:
+        """Insert or replace tasks in one transaction; tasks without an id get a new one."""
+        ids: List[int] = []
+        with sqlite3.connect(self.path) as con:
+            for t in tasks:
+                if t.id is None:
+                    t.id = self._insert(con, t)
+                else:
+                    con.execute(
+                        f"INSERT OR REPLACE INTO tasks ({COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (t.id, *self._task_to_row(t)),
+                    )
+                    # a put brings an archived task back to the hot tier
+                    con.execute("DELETE FROM tasks_archive WHERE id = ?", (t.id,))
+                ids.append(t.id)
+        return ids
+
+    @measured
+    @timed("write")
+    def delete_many(self, task_ids: Iterable[int]) -> int:
+        params = [(i,) for i in task_ids]
+        with sqlite3.connect(self.path) as con:
+            hot = con.executemany("DELETE FROM tasks WHERE id = ?", params).rowcount
+            cold = con.executemany("DELETE FROM tasks_archive WHERE id = ?", params).rowcount
+        return hot + cold
+
+    @measured
+    @timed("read")
+    def query(
+        self,
+        done: Optional[bool] = None,
+        priority: Optional[str] = None,
+        tag: Optional[str] = None,
+        text: Optional[str] = None,
+        due_before: Optional[date] = None,
+        done_since: Optional[datetime] = None,
+        sort: str = "id",
+        limit: Optional[int] = None,
+    ) -> List[Task]:
+        sort_key(sort)  # same validation and error as the other stores
+        descending = sort.startswith("-")
+        where: List[str] = []
+        params: List[Any] = []
+        if done is not None:
+            where.append("done = ?")
+            params.append(int(done))
+        if priority is not None:
+            where.append("priority = ?")
+            params.append(priority)
+        if tag is not None:
+            # exact and case-sensitive, like the other stores
+            where.append("instr(',' || tags || ',', ?) > 0")
+            params.append(f",{tag},")
+        if text:
+            where.append("(lower(title) LIKE ? ESCAPE '\\' OR lower(note) LIKE ? ESCAPE '\\')")
+            params += [_contains_pattern(text.lower())] * 2
+        if due_before is not None:
+            where.append("due IS NOT NULL AND due <= ?")
+            params.append(due_before.isoformat())
+        if done_since is not None:
+            where.append("done_at IS NOT NULL AND done_at >= ?")
+            params.append(done_since.isoformat())
+        source = "tasks"
+        if done is not False:
+            source = f"(SELECT {COLUMNS} FROM tasks UNION ALL SELECT {COLUMNS} FROM tasks_archive)"
+        order = ", ".join(term + (" DESC" if descending else "") for term in SORT_SQL[sort.lstrip("-")])
+        sql = f"SELECT {COLUMNS} FROM {source}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(max(limit, 0))
+        with sqlite3.connect(self.path) as con:
+            return [self._row_to_task(r) for r in con.execute(sql, params).fetchall()]
+
+    @measured
+    @timed("read")
+    def changes(self, since: int = 0) -> List[Change]:
+        with sqlite3.connect(self.path) as con:
+            rows = con.execute(
+                "SELECT seq, op, task_id FROM task_changes WHERE seq > ? ORDER BY seq", (since,)
+            ).fetchall()
+        return [Change(*row) for row in rows]
@@ -0,0 +1,162 @@
+"""Background summarization of long task notes.
+
+Tasks with a long note (pkms) or description (tasks2) are queued to a small
+worker pool that turns the text into a short phrase and stores it back on the
+task. Work is keyed on a hash of the text, so a task is only summarized again
+when its text actually changes. Readers such as ``pkms list`` only ever look at
+the stored ``summary`` field and never wait on the model.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, Optional, Set, Tuple
+
+Summarizer = Callable[[str], str]
+
+MIN_LENGTH = 200  # characters; shorter notes are already readable in a listing
+
+_FILLER = re.compile(r"^(i|we)\s+(need|want|have)\s+to\s+|^please\s+", re.IGNORECASE)
+
+# Same instructions tasks4/main.py gives gpt-4o-mini in summarize_task.
+LLM_SYSTEM = (
+    "You are a helpful assistant that summarizes task descriptions into short, "
+    "concise phrases (3-7 words). Focus on the main action and objective."
+)
+
+
+def text_hash(text: str) -> str:
+    """Stable key for a piece of task text."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def local_summarize(text: str, max_words: int = 7) -> str:
+    """Offline summarizer: the leading clause of the first sentence, trimmed."""
+    flat = " ".join(text.split())
+    sentence = re.split(r"(?<=[.!?])\s+", flat, maxsplit=1)[0]
+    clause = re.split(r"[,;:]\s", sentence, maxsplit=1)[0]
+    clause = _FILLER.sub("", clause.rstrip(".!?"))
+    words = clause.split()[:max_words]
+    if not words:
+        return ""
+    words[0] = words[0][:1].upper() + words[0][1:]
+    return " ".join(words)
+
+
+def llm_summarizer(respond: Callable[..., str]) -> Summarizer:
+    """Wrap an LLM ``respond(prompt, system=...)`` callable as a summarizer."""
+
+    def summarize(text: str) -> str:
+        prompt = f"Summarize this task description into a short phrase:\n\n{text}"
+        return respond(prompt, system=LLM_SYSTEM)
+
+    return summarize
+
+
+# --- Sources ----------------------------------------------------------------
+class PkmsSource:
+    """Adapter over a pkms JSONStore/SQLiteStore; summarizes ``note``."""
+
+    def __init__(self, store) -> None:
+        self.store = store
+
+    def pending(self, min_length: int) -> Iterator[Tuple[int, str]]:
+        for t in self.store.list(include_done=False):
+            if t.note and len(t.note) >= min_length and t.summary_hash != text_hash(t.note):
+                yield t.id, t.note
+
+    def apply(self, task_id: int, summary: str, digest: str) -> bool:
+        return self.store.set_summary(task_id, summary, digest)
+
+
+class TaskManagerSource:
+    """Adapter over a tasks2 TaskManager; summarizes ``description``."""
+
+    def __init__(self, manager) -> None:
+        self.manager = manager
+
+    def pending(self, min_length: int) -> Iterator[Tuple[int, str]]:
+        for t in list(self.manager.tasks):
+            text = t.description
+            if (
+                t.status != "completed"
+                and text
+                and len(text) >= min_length
+                and t.summary_hash != text_hash(text)
+            ):
+                yield t.id, text
+
+    def apply(self, task_id: int, summary: str, digest: str) -> bool:
+        return self.manager.update_task(task_id, summary=summary, summary_hash=digest) is not None
+
+
+# --- Pipeline ---------------------------------------------------------------
+class SummaryPipeline:
+    """Queue long task texts to a worker pool and write summaries back.
+
+    Only the model call runs on worker threads; results are written from the
+    thread driving ``run_once`` so the underlying store sees a single writer.
+    """
+
+    def __init__(
+        self,
+        source,
+        summarize: Summarizer = local_summarize,
+        workers: int = 2,
+        min_length: int = MIN_LENGTH,
+    ) -> None:
+        self.source = source
+        self.summarize = summarize
+        self.min_length = min_length
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pkms-summary")
+        self._inflight: Set[Tuple[int, str]] = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> int:
+        """Summarize every pending task; returns how many summaries were stored."""
+        futures: Dict = {}
+        for task_id, text in self.source.pending(self.min_length):
+            key = (task_id, text_hash(text))
+            if key in self._inflight:
+                continue
+            self._inflight.add(key)
+            futures[self._executor.submit(self.summarize, text)] = key
+
+        written = 0
+        for fut in as_completed(futures):
+            task_id, digest = futures[fut]
+            self._inflight.discard((task_id, digest))
+            try:
+                summary = (fut.result() or "").strip()
+            except Exception:
+                continue  # model failure: the task stays pending for the next pass
+            if summary and self.source.apply(task_id, summary, digest):
+                written += 1
+        return written
+
+    def start(self, interval: float = 30.0) -> None:
+        """Poll the source in a daemon thread every ``interval`` seconds."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception:
+                    pass  # a bad pass must not kill the watcher
+                self._stop.wait(interval)
+
+        self._thread = threading.Thread(target=loop, name="pkms-summary-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,119 @@
+"""Planning and caching for the chat ``ask`` command.
+
+A question is parsed once into an ``Intent`` saying which lookups it needs.
+The planner runs those lookups against the session's in-memory snapshot and
+memoizes the rendered answer on (normalized question, session version), so
+asking for the daily brief again is free until tasks or knowledge change.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from knowledge import find_entries
+from tasks import find_tasks
+
+# Agent reports, checked in this order; the first match answers the question.
+AGENT_ACTIONS = (
+    ("suggest", ("suggest", "what next", "what should i do")),
+    ("gaps", ("gap", "missing")),
+    ("brief", ("brief", "summary", "overview")),
+)
+TASK_WORDS = ("task", "todo", "due")
+KNOWLEDGE_WORDS = ("know", "learn", "find")
+
+
+@dataclass(frozen=True)
+class Intent:
+    """What a question asks for."""
+
+    query: str
+    action: Optional[str] = None  # "suggest" | "gaps" | "brief"
+    search_tasks: bool = False
+    search_knowledge: bool = False
+    related_knowledge: bool = False
+
+
+def normalize(question: str) -> str:
+    return " ".join(question.lower().split())
+
+
+def parse_intent(question: str) -> Intent:
+    query = normalize(question)
+    for action, words in AGENT_ACTIONS:
+        if any(word in query for word in words):
+            return Intent(query, action=action)
+    return Intent(
+        query,
+        search_tasks=any(word in query for word in TASK_WORDS),
+        search_knowledge=any(word in query for word in KNOWLEDGE_WORDS),
+        related_knowledge="task" in query and "knowledge" in query,
+    )
+
+
+class QueryPlanner:
+    """Answers ``ask`` questions from a ``DataSession`` and an ``AIAgent``."""
+
+    def __init__(self, session, agent, cache_size: int = 128):
+        self.session = session
+        self.agent = agent
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._actions: Dict[str, Callable[[], str]] = {
+            "suggest": agent.suggest_next_actions,
+            "gaps": agent.analyze_knowledge_gaps,
+            "brief": agent.get_daily_brief,
+        }
+        self.hits = 0
+        self.misses = 0
+
+    def answer(self, question: str) -> str:
+        self.session.refresh()
+        intent = parse_intent(question)
+        key = (intent.query, self.session.version)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        text = self.execute(intent)
+        self._cache[key] = text
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return text
+
+    def execute(self, intent: Intent) -> str:
+        if intent.action:
+            return self._actions[intent.action]()
+
+        lines: List[str] = []
+        if intent.search_tasks:
+            lines.append("\nRelevant tasks:")
+            matches = find_tasks(intent.query, self.session.tasks)
+            if matches:
+                lines.append("🔍 Search results:")
+                lines.extend(f"{t['id']}: {t['description']}" for t in matches)
+            else:
+                lines.append("No matching tasks found.")
+
+        if intent.search_knowledge:
+            lines.append("\nRelevant knowledge entries:")
+            matches = find_entries(intent.query, self.session.knowledge)
+            if matches:
+                lines.append("🔍 Search results:")
+                for entry in matches:
+                    tags = ", ".join(entry["tags"]) if entry["tags"] else "no tags"
+                    lines.append(f"#{entry['id']}: {entry['title']} [{tags}]")
+            else:
+                lines.append("No matching entries found.")
+
+        if intent.related_knowledge and self.session.tasks:
+            lines.append("\nFinding relevant knowledge for your tasks:")
+            for task in self.session.tasks[:3]:  # Look at most recent 3 tasks
+                relevant = self.agent.get_relevant_knowledge(task["description"], limit=2)
+                if relevant:
+                    lines.append(f"\nFor task: {task['description']}")
+                    for entry in relevant:
+                        lines.append(f"- {entry['title']}: {entry['content'][:100]}...")
+        return "\n".join(lines)
@@ -0,0 +1,75 @@
+import os
+from typing import Callable, Dict, List, Optional
+
+import knowledge
+import tasks
+
+
+def file_stat(path: str) -> Optional[tuple]:
+    """(mtime_ns, size) of ``path``, or None if it doesn't exist."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class DataSession:
+    """Tasks and knowledge for one interactive session, kept in memory.
+
+    Both JSON files are read once; every command is then served from the
+    in-memory lists. Mutations write through to disk, and a file is only
+    read again when its mtime/size shows someone else changed it.
+
+    Listeners registered with ``subscribe`` are called as
+    ``callback(event, item)`` with ``"task_added"``, ``"entry_added"`` or
+    ``"reloaded"`` (item is None) so derived state can update incrementally.
+    ``version`` increases on every change and can key caches.
+    """
+
+    def __init__(self):
+        self.tasks: List[Dict] = []
+        self.knowledge: List[Dict] = []
+        self.version = 0
+        self._stats: Dict[str, Optional[tuple]] = {}
+        self._listeners: List[Callable[[str, Optional[Dict]], None]] = []
+        self.refresh(force=True)
+
+    def subscribe(self, callback: Callable[[str, Optional[Dict]], None]):
+        self._listeners.append(callback)
+
+    def _emit(self, event: str, item: Optional[Dict] = None):
+        self.version += 1
+        for callback in self._listeners:
+            callback(event, item)
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload files changed outside this session; returns True if anything was reloaded."""
+        reloaded = False
+        task_stat = file_stat(tasks.DATA_FILE)
+        if force or task_stat != self._stats.get("tasks"):
+            self.tasks = tasks.load_tasks()
+            self._stats["tasks"] = task_stat
+            reloaded = True
+        knowledge_stat = file_stat(knowledge.DATA_FILE)
+        if force or knowledge_stat != self._stats.get("knowledge"):
+            self.knowledge = knowledge.load_knowledge()
+            self._stats["knowledge"] = knowledge_stat
+            reloaded = True
+        if reloaded:
+            self._emit("reloaded")
+        return reloaded
+
+    def add_task(self, description: str) -> Dict:
+        self.refresh()
+        task = tasks.add_task(description, tasks=self.tasks)
+        self._stats["tasks"] = file_stat(tasks.DATA_FILE)
+        self._emit("task_added", task)
+        return task
+
+    def add_entry(self, title: str, content: str, tags: Optional[List[str]] = None) -> Dict:
+        self.refresh()
+        entry = knowledge.add_entry(title, content, tags, entries=self.knowledge)
+        self._stats["knowledge"] = file_stat(knowledge.DATA_FILE)
+        self._emit("entry_added", entry)
+        return entry
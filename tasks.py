@@ -1,28 +1,110 @@
 import json
 import sys
 import os
+from contextlib import contextmanager
 
 DATA_FILE = "tasks_data.json"
 
+# File layout: {"next_id": N, "tasks": [...]}. next_id only ever grows, so ids
+# are never reused after a delete. Plain lists from older versions still load.
+_batch = None  # open batch(): {"tasks": list, "dirty": bool}
+
+class TaskList(list):
+    """Tasks loaded from a file, carrying that file's ``next_id``.
+
+    Ids are allocated from the list a task is added to, so a list loaded
+    earlier (a DataSession's, say) never hands out ids tracked for another
+    file or a later load.
+    """
+
+    def __init__(self, tasks=(), next_id=None):
+        super().__init__(tasks)
+        # a hand-edited file may hold ids at or past its stored next_id
+        self.next_id = max(next_id or 1, _next_free(self))
+
+def _next_free(tasks):
+    return max([0] + [t["id"] for t in tasks]) + 1
+
 def load_tasks():
+    if _batch is not None:
+        return _batch["tasks"]
     if not os.path.exists(DATA_FILE):
-        return []
+        return TaskList()
     with open(DATA_FILE, "r") as f:
-        return json.load(f)
+        data = json.load(f)
+    if isinstance(data, list):
+        return TaskList(data)
+    return TaskList(data["tasks"], data.get("next_id"))
 
 def save_tasks(tasks):
-    with open(DATA_FILE, "w") as f:
-        json.dump(tasks, f, indent=4)
+    if _batch is not None:
+        _batch["tasks"] = tasks
+        _batch["dirty"] = True
+        return
+    _write_tasks(tasks)
+
+def _write_tasks(tasks):
+    # plain lists (no next_id of their own) fall back to the highest id + 1
+    next_id = tasks.next_id if isinstance(tasks, TaskList) else _next_free(tasks)
+    tmp = DATA_FILE + ".tmp"
+    with open(tmp, "w") as f:
+        f.write(json.dumps({"next_id": next_id, "tasks": tasks}, indent=4))
+    os.replace(tmp, DATA_FILE)
 
-def add_task(description):
-    tasks = load_tasks()
-    task = {"id": len(tasks) + 1, "description": description}
+def _allocate_id(tasks):
+    if not isinstance(tasks, TaskList):
+        return _next_free(tasks)
+    task_id = tasks.next_id
+    tasks.next_id += 1
+    return task_id
+
+@contextmanager
+def batch():
+    """Group many mutations into one write: ``with tasks.batch(): ...``
+
+    Inside the block load_tasks() hands out the same in-memory list and
+    save_tasks() only marks it dirty; the file is written once on exit. If
+    the block raises, nothing is written.
+    """
+    global _batch
+    if _batch is not None:  # nested: the outermost batch writes
+        yield
+        return
+    _batch = {"tasks": load_tasks(), "dirty": False}
+    try:
+        yield
+        state = _batch
+    finally:
+        _batch = None
+    if state["dirty"]:
+        _write_tasks(state["tasks"])
+
+def add_task(description, tasks=None, quiet=False):
+    """Append a task and save; pass ``tasks`` to reuse an already loaded list."""
+    if tasks is None:
+        tasks = load_tasks()
+    task = {"id": _allocate_id(tasks), "description": description}
     tasks.append(task)
     save_tasks(tasks)
-    print(f"✅ Added task: {description}")
+    if not quiet:
+        print(f"✅ Added task: {description}")
+    return task
+
+def import_tasks(lines):
+    """Add one task per non-empty line with a single write; returns the count."""
+    count = 0
+    with batch():
+        tasks = load_tasks()
+        for line in lines:
+            description = line.strip()
+            if description:
+                add_task(description, tasks=tasks, quiet=True)
+                count += 1
+    return count
 
-def list_tasks():
-    tasks = load_tasks()
+def list_tasks(tasks=None):
+    if tasks is None:
+        tasks = load_tasks()
     if not tasks:
         print("No tasks found.")
     else:
@@ -30,9 +112,15 @@ def list_tasks():
         for task in tasks:
             print(f"{task['id']}: {task['description']}")
 
-def search_tasks(keyword):
-    tasks = load_tasks()
-    matches = [t for t in tasks if keyword.lower() in t["description"].lower()]
+def find_tasks(keyword, tasks):
+    """Tasks whose description contains ``keyword`` (case-insensitive)."""
+    keyword = keyword.lower()
+    return [t for t in tasks if keyword in t["description"].lower()]
+
+def search_tasks(keyword, tasks=None):
+    if tasks is None:
+        tasks = load_tasks()
+    matches = find_tasks(keyword, tasks)
     if matches:
         print("🔍 Search results:")
         for t in matches:
@@ -42,7 +130,7 @@ def search_tasks(keyword):
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python tasks.py [add|list|search] [arguments]")
+        print("Usage: python tasks.py [add|list|search|import] [arguments]")
         return
 
     command = sys.argv[1]
@@ -55,6 +143,10 @@ def main():
     elif command == "search" and len(sys.argv) > 2:
         keyword = " ".join(sys.argv[2:])
         search_tasks(keyword)
+    elif command == "import":
+        # one task description per line on stdin
+        count = import_tasks(sys.stdin)
+        print(f"✅ Imported {count} task(s)")
     else:
         print("Invalid command or missing arguments.")
 
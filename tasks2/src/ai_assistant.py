@@ -1,7 +1,6 @@
 from __future__ import annotations
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-import re
+from typing import List, Dict, Any, Tuple
 
 from .task_manager import TaskManager, Task
 from .knowledge_manager import KnowledgeManager, KnowledgeEntry
@@ -79,10 +78,10 @@ class AIAssistant:
                 suggestions.append(f"   Due: {top_task.due_date}")
             
             # Find related knowledge
-            related_knowledge = self.find_related_knowledge(top_task)
+            related_knowledge = self.find_related_knowledge(top_task, top_k=2)
             if related_knowledge:
                 suggestions.append("\n   Relevant knowledge entries:")
-                for entry in related_knowledge[:2]:
+                for entry in related_knowledge:
                     suggestions.append(f"   - {entry.title}")
         
         # Suggest task organization if needed
@@ -93,27 +92,19 @@ class AIAssistant:
         
         return "\n".join(suggestions)
 
-    def find_related_knowledge(self, task: Task) -> List[KnowledgeEntry]:
-        """Find knowledge entries related to a task."""
-        # Extract keywords from task title and description
-        text = f"{task.title} {task.description}"
-        keywords = set(re.findall(r'\w+', text.lower()))
-        
-        # Score each knowledge entry for relevance
-        scored_entries = []
-        for entry in self.knowledge_manager.entries:
-            entry_text = f"{entry.title} {entry.content}"
-            entry_words = set(re.findall(r'\w+', entry_text.lower()))
-            
-            # Calculate relevance score
-            common_words = keywords & entry_words
-            score = len(common_words) / len(keywords) if keywords else 0
-            
-            if score > 0.2:  # Minimum relevance threshold
-                scored_entries.append((score, entry))
-        
-        # Return most relevant entries
-        return [entry for _, entry in sorted(scored_entries, reverse=True)]
+    def find_related_knowledge(self, task: Task, top_k: int = 5) -> List[KnowledgeEntry]:
+        """Find knowledge entries related to a task, most relevant first."""
+        return [entry for entry, _ in self.score_related_knowledge(task, top_k)]
+
+    def score_related_knowledge(self, task: Task, top_k: int = 5) -> List[Tuple[KnowledgeEntry, float]]:
+        """Rank knowledge entries against a task with the manager's BM25 index."""
+        hits = self.knowledge_manager.relevance.top_k(f"{task.title} {task.description}", top_k)
+        scored = []
+        for entry_id, score in hits:
+            entry = self.knowledge_manager.get_entry(entry_id)
+            if entry:
+                scored.append((entry, score))
+        return scored
 
     def analyze_task_patterns(self) -> Dict[str, Any]:
         """Analyze patterns in task completion and categories."""
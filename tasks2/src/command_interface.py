@@ -1,12 +1,57 @@
 from __future__ import annotations
 import cmd
 import shlex
+import sys
+from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
 from .task_manager import TaskManager
 from .knowledge_manager import KnowledgeManager
 from .ai_assistant import AIAssistant
+from .task_query import TaskQuery
+
+try:
+    from pkms import summarizer
+except ImportError:  # run from tasks2/: the summary pipeline lives in the repo root's pkms package
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    from pkms import summarizer
+
+SEARCH_FLAGS = {
+    "--status": "status",
+    "--priority": "priority",
+    "--category": "categories",
+    "--tag": "tags",
+    "--due-after": "due_after",
+    "--due-before": "due_before",
+    "--sort": "sort",
+    "--limit": "limit",
+}
+
+def parse_search_args(args) -> TaskQuery:
+    """Build a TaskQuery from `task search` words and --flags.
+
+    Category and tag flags take comma-separated lists; plain words form the
+    text query. Raises ValueError on unknown flags or missing values.
+    """
+    query = TaskQuery()
+    words = []
+    it = iter(args)
+    for arg in it:
+        if not arg.startswith("--"):
+            words.append(arg)
+            continue
+        field = SEARCH_FLAGS.get(arg)
+        value = next(it, None)
+        if field is None or value is None:
+            raise ValueError(f"Unknown flag or missing value: {arg}")
+        if field in ("categories", "tags"):
+            value = [v.lstrip("#@") for v in value.split(",") if v]
+        elif field == "limit":
+            value = int(value)
+        setattr(query, field, value)
+    query.text = " ".join(words) or None
+    return query
 
 class CommandInterface(cmd.Cmd):
     """Enhanced command-line interface with natural language support."""
@@ -32,8 +77,11 @@ class CommandInterface(cmd.Cmd):
             task list [all|pending|completed]
             task update <id> <field> <value>
             task complete <id>
-            task search <query>
+            task search [query] [--status S] [--priority P] [--category C,..]
+                        [--tag T,..] [--due-after YYYY-MM-DD] [--due-before YYYY-MM-DD]
+                        [--sort [-]id|title|priority|status|due|created] [--limit N]
             task view <id>
+            task summarize [min_length]
         """
         args = shlex.split(arg)
         if not args:
@@ -86,6 +134,8 @@ class CommandInterface(cmd.Cmd):
             for task in tasks:
                 status = "✓" if task.status == "completed" else " "
                 print(f"[{status}] #{task.id}: {task.title}")
+                if task.summary:
+                    print(f"    Summary: {task.summary}")
                 print(f"    Priority: {task.priority}")
                 if task.due_date:
                     print(f"    Due: {task.due_date}")
@@ -113,13 +163,19 @@ class CommandInterface(cmd.Cmd):
                 print("Task not found.")
                 
         elif command == "search" and len(args) > 1:
-            query = args[1]
-            results = self.task_manager.search_tasks(query=query)
+            try:
+                query = parse_search_args(args[1:])
+                # streamed: with --limit the scan stops at the last needed match
+                results = list(self.task_manager.query(query))
+            except ValueError as e:
+                print(f"Invalid search: {e}")
+                return
             
             if results:
                 print("\n🔍 Search results:")
                 for task in results:
-                    print(f"#{task.id}: {task.title}")
+                    due = f" (due {task.due_date})" if task.due_date else ""
+                    print(f"#{task.id}: {task.title}{due}")
             else:
                 print("No matching tasks found.")
                 
@@ -141,6 +197,23 @@ class CommandInterface(cmd.Cmd):
                     print(f"Completed: {task.completed_at}")
             else:
                 print("Task not found.")
+
+        elif command == "summarize":
+            # same pipeline as `pkms summarize`; stores a short phrase for long descriptions
+            min_length = summarizer.MIN_LENGTH
+            if len(args) > 1:
+                if len(args) > 2 or not args[1].isdigit():
+                    print("Usage: task summarize [min_length]")
+                    return
+                min_length = int(args[1])
+            pipeline = summarizer.SummaryPipeline(
+                summarizer.TaskManagerSource(self.task_manager), min_length=min_length
+            )
+            try:
+                written = pipeline.run_once()
+            finally:
+                pipeline.stop()
+            print(f"📝 Summarized {written} task(s)" if written else "(nothing to summarize)")
         else:
             print("Invalid task command or missing arguments")
 
@@ -151,6 +224,7 @@ class CommandInterface(cmd.Cmd):
             know add <title> <content> [#category1,#category2] [@tag1,@tag2]
             know list [category]
             know search <query>
+            know similar <query>
             know view <id>
             know link <entry_id> <task_id>
         """
@@ -214,6 +288,21 @@ class CommandInterface(cmd.Cmd):
             else:
                 print("No matching entries found.")
                 
+        elif command == "similar" and len(args) > 1:
+            query = " ".join(args[1:])
+            try:
+                results = self.knowledge_manager.semantic_search(query)
+            except RuntimeError as e:
+                print(e)
+                return
+            
+            if results:
+                print("\n🧭 Similar entries:")
+                for entry, score in results:
+                    print(f"#{entry.id}: {entry.title} ({score:.2f})")
+            else:
+                print("No similar entries found.")
+                
         elif command == "view" and len(args) > 1:
             entry_id = int(args[1])
             entry = self.knowledge_manager.get_entry(entry_id)
@@ -2,9 +2,13 @@ from __future__ import annotations
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Sequence, Tuple
 import json
 
+from .record_index import RecordIndex
+from .relevance import BM25Index
+from .semantic_index import Embedder, SemanticIndex
+
 @dataclass
 class KnowledgeEntry:
     """Enhanced knowledge entry model."""
@@ -28,33 +32,61 @@ class KnowledgeEntry:
 class KnowledgeManager:
     """Enhanced knowledge management system."""
     
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", embedder: Optional[Embedder] = None):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.knowledge_file = self.data_dir / "knowledge.json"
-        self.entries: List[KnowledgeEntry] = []
+        self._index = RecordIndex(("categories", "tags", "related_tasks"))
+        self.next_id = 1
+        self.relevance = BM25Index()
+        self.embedder = embedder
+        self._semantic: Optional[SemanticIndex] = None
         self.load_entries()
 
+    @property
+    def entries(self) -> List[KnowledgeEntry]:
+        """All entries in insertion order (a copy; mutate through the manager)."""
+        return self._index.values()
+
+    @entries.setter
+    def entries(self, entries: List[KnowledgeEntry]):
+        self._index.clear()
+        for entry in entries:
+            self._index.add(entry)
+        self.next_id = max(self.next_id, max(self._index.ids(), default=0) + 1)
+
     def load_entries(self):
         """Load knowledge entries from JSON file."""
         if not self.knowledge_file.exists():
             self.entries = []
+            self.relevance.clear()
             return
             
         try:
             with open(self.knowledge_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
+                # {"next_id": N, "entries": [...]}; plain lists from older versions still load
+                if isinstance(data, dict):
+                    self.next_id = max(self.next_id, data.get("next_id", 1))
+                    data = data["entries"]
                 self.entries = [KnowledgeEntry.from_dict(entry_data) for entry_data in data]
         except Exception as e:
             print(f"Error loading knowledge entries: {e}")
             self.entries = []
+        self._rebuild_relevance()
+
+    def _rebuild_relevance(self):
+        """Re-tokenize every entry into the relevance index."""
+        self.relevance.clear()
+        for entry in self.entries:
+            self.relevance.add(entry.id, f"{entry.title} {entry.content}")
 
     def save_entries(self):
         """Save knowledge entries to JSON file."""
         try:
             with open(self.knowledge_file, 'w', encoding='utf-8') as f:
                 data = [entry.to_dict() for entry in self.entries]
-                json.dump(data, f, indent=2)
+                json.dump({"next_id": self.next_id, "entries": data}, f, indent=2)
         except Exception as e:
             print(f"Error saving knowledge entries: {e}")
 
@@ -62,7 +94,8 @@ class KnowledgeManager:
                 tags: List[str] = None, references: List[str] = None,
                 related_tasks: List[int] = None) -> KnowledgeEntry:
         """Add a new knowledge entry with enhanced metadata."""
-        entry_id = len(self.entries) + 1
+        entry_id = self.next_id
+        self.next_id += 1
         now = datetime.now().isoformat()
         
         entry = KnowledgeEntry(
@@ -77,33 +110,31 @@ class KnowledgeManager:
             related_tasks=related_tasks or []
         )
         
-        self.entries.append(entry)
+        self._index.add(entry)
+        self.relevance.add(entry.id, f"{entry.title} {entry.content}")
         self.save_entries()
         return entry
 
     def get_entry(self, entry_id: int) -> Optional[KnowledgeEntry]:
         """Get a knowledge entry by ID."""
-        return next((entry for entry in self.entries if entry.id == entry_id), None)
+        return self._index.get(entry_id)
 
     def update_entry(self, entry_id: int, **kwargs) -> Optional[KnowledgeEntry]:
         """Update knowledge entry attributes."""
-        entry = self.get_entry(entry_id)
+        entry = self._index.update(entry_id, kwargs)
         if not entry:
             return None
-            
-        for key, value in kwargs.items():
-            if hasattr(entry, key):
-                setattr(entry, key, value)
                 
         entry.updated_at = datetime.now().isoformat()
+        if "title" in kwargs or "content" in kwargs:
+            self.relevance.add(entry.id, f"{entry.title} {entry.content}")
         self.save_entries()
         return entry
 
     def delete_entry(self, entry_id: int) -> bool:
         """Delete a knowledge entry."""
-        entry = self.get_entry(entry_id)
-        if entry:
-            self.entries.remove(entry)
+        if self._index.remove(entry_id):
+            self.relevance.remove(entry_id)
             self.save_entries()
             return True
         return False
@@ -111,7 +142,12 @@ class KnowledgeManager:
     def search_entries(self, query: str = None, categories: List[str] = None,
                      tags: List[str] = None, related_task_id: int = None) -> List[KnowledgeEntry]:
         """Enhanced search with multiple criteria."""
-        results = self.entries
+        # indexed filters first, via postings intersection; text match last
+        results = self._index.select({
+            "categories": categories or [],
+            "tags": tags or [],
+            "related_tasks": [related_task_id] if related_task_id is not None else [],
+        })
 
         if query:
             query = query.lower()
@@ -121,41 +157,40 @@ class KnowledgeManager:
                 query in entry.content.lower()
             ]
 
-        if categories:
-            results = [
-                entry for entry in results
-                if any(cat in entry.categories for cat in categories)
-            ]
-
-        if tags:
-            results = [
-                entry for entry in results
-                if any(tag in entry.tags for tag in tags)
-            ]
-
-        if related_task_id is not None:
-            results = [
-                entry for entry in results
-                if related_task_id in entry.related_tasks
-            ]
+        return results
 
+    def semantic_search(self, query: str, k: int = 5) -> List[Tuple[KnowledgeEntry, float]]:
+        """Rank entries by embedding similarity (requires NumPy)."""
+        return self.semantic_search_many([query], k)[0]
+
+    def semantic_search_many(self, queries: Sequence[str],
+                             k: int = 5) -> List[List[Tuple[KnowledgeEntry, float]]]:
+        """Batch semantic search; only new or edited entries get embedded."""
+        if self._semantic is None:
+            self._semantic = SemanticIndex(self.data_dir / "knowledge", embed=self.embedder)
+        self._semantic.sync(self.entries)
+        results = []
+        for hits in self._semantic.search_many(queries, k):
+            ranked = []
+            for entry_id, score in hits:
+                entry = self.get_entry(entry_id)
+                if entry:
+                    ranked.append((entry, score))
+            results.append(ranked)
         return results
 
     def get_entries_by_category(self) -> Dict[str, List[KnowledgeEntry]]:
         """Group entries by category."""
-        categories = {}
-        for entry in self.entries:
-            for category in entry.categories:
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append(entry)
-        return categories
+        return {
+            category: self._index.select({"categories": [category]})
+            for category in self._index.postings["categories"]
+        }
 
     def link_to_task(self, entry_id: int, task_id: int) -> bool:
         """Link a knowledge entry to a task."""
         entry = self.get_entry(entry_id)
         if entry and task_id not in entry.related_tasks:
-            entry.related_tasks.append(task_id)
+            self._index.update(entry_id, {"related_tasks": entry.related_tasks + [task_id]})
             self.save_entries()
             return True
         return False
\ No newline at end of file
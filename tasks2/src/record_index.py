@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+
+class RecordIndex:
+    """Records by id plus value -> ids postings for selected attributes.
+
+    Scalar attributes (``status``, ``priority``) are indexed by value; list
+    attributes (``categories``, ``tags``) by each element. Lookups by id are
+    O(1) and ``select`` intersects postings, smallest first, instead of
+    scanning every record. Indexed attributes of a stored record must be
+    changed through ``update`` so the postings stay in step.
+    """
+
+    def __init__(self, fields: Sequence[str]) -> None:
+        self.fields = tuple(fields)
+        self.clear()
+
+    def clear(self) -> None:
+        self.by_id: Dict[int, Any] = {}
+        self.postings: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in self.fields}
+        self._keys: Dict[int, Dict[str, tuple]] = {}  # values each record is indexed under
+        self._seq: Dict[int, int] = {}  # insertion order, for stable results
+        self._next_seq = 0
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    def __contains__(self, record_id: int) -> bool:
+        return record_id in self.by_id
+
+    def get(self, record_id: int) -> Optional[Any]:
+        return self.by_id.get(record_id)
+
+    def values(self) -> List[Any]:
+        return list(self.by_id.values())
+
+    def ids(self) -> Iterable[int]:
+        return self.by_id.keys()
+
+    @staticmethod
+    def _values(record: Any, field: str) -> tuple:
+        value = getattr(record, field)
+        if isinstance(value, (list, tuple, set)):
+            return tuple(dict.fromkeys(value))
+        return (value,)
+
+    def _index(self, record: Any) -> None:
+        keys = {}
+        for field in self.fields:
+            values = self._values(record, field)
+            postings = self.postings[field]
+            for value in values:
+                postings.setdefault(value, set()).add(record.id)
+            keys[field] = values
+        self._keys[record.id] = keys
+
+    def _unindex(self, record_id: int) -> None:
+        for field, values in self._keys.pop(record_id).items():
+            postings = self.postings[field]
+            for value in values:
+                ids = postings[value]
+                ids.discard(record_id)
+                if not ids:
+                    del postings[value]
+
+    def add(self, record: Any) -> None:
+        """Store a record, replacing any record with the same id."""
+        if record.id in self.by_id:
+            self.remove(record.id)
+        self.by_id[record.id] = record
+        self._seq[record.id] = self._next_seq
+        self._next_seq += 1
+        self._index(record)
+
+    def remove(self, record_id: int) -> Optional[Any]:
+        record = self.by_id.pop(record_id, None)
+        if record is not None:
+            self._unindex(record_id)
+            del self._seq[record_id]
+        return record
+
+    def update(self, record_id: int, changes: Dict[str, Any]) -> Optional[Any]:
+        """Set the attributes in ``changes`` that the record has and re-index it."""
+        record = self.by_id.get(record_id)
+        if record is None:
+            return None
+        self._unindex(record_id)
+        for key, value in changes.items():
+            if hasattr(record, key):
+                setattr(record, key, value)
+        if record.id != record_id:
+            del self.by_id[record_id]
+            self.by_id[record.id] = record
+            self._seq[record.id] = self._seq.pop(record_id)
+        self._index(record)
+        return record
+
+    def in_order(self, ids: Iterable[int]) -> List[int]:
+        """``ids`` sorted by insertion order of their records."""
+        return sorted(ids, key=self._seq.__getitem__)
+
+    def matching(self, field: str, values: Iterable[Any]) -> Set[int]:
+        """Ids whose ``field`` equals (or, for lists, contains) any of ``values``."""
+        postings = self.postings[field]
+        ids: Set[int] = set()
+        for value in values:
+            ids |= postings.get(value, set())
+        return ids
+
+    def select(self, criteria: Dict[str, Sequence[Any]]) -> List[Any]:
+        """Records matching every field's criteria, in insertion order.
+
+        Each field matches if the record has any of the listed values; fields
+        with no values are ignored.
+        """
+        sets = sorted(
+            (self.matching(field, values) for field, values in criteria.items() if values),
+            key=len,
+        )
+        if not sets:
+            return self.values()
+        ids = sets[0]
+        for other in sets[1:]:
+            if not ids:
+                break
+            ids = ids & other
+        return [self.by_id[i] for i in self.in_order(ids)]
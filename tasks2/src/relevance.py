@@ -0,0 +1,148 @@
+from __future__ import annotations
+import heapq
+import math
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; scoring falls back to plain dicts
+    np = None
+
+try:
+    import text_index
+except ImportError:  # run from tasks2/: the shared tokenizer lives at the repo root
+    sys.path.append(str(Path(__file__).resolve().parents[2]))
+    import text_index
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords (text_index's tokenizer and stopword list)."""
+    return [t for t in text_index.tokenize(text) if t not in text_index.STOPWORDS]
+
+
+class BM25Index:
+    """Incrementally maintained BM25 index over short documents.
+
+    Documents are addressed by an external id (a knowledge entry id) and
+    stored in reusable slots so postings can be scored as dense arrays.
+    Tokenization happens once per add/update, never at query time.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.clear()
+
+    def clear(self):
+        self._slots: Dict[int, int] = {}          # doc id -> slot
+        self._doc_ids: List[int] = []             # slot -> doc id (-1 when free)
+        self._lengths: List[int] = []             # slot -> token count
+        self._doc_terms: Dict[int, Dict[str, int]] = {}
+        self._postings: Dict[str, Dict[int, int]] = {}  # term -> {slot: tf}
+        self._free: List[int] = []
+        self._total_length = 0
+        # NumPy views, rebuilt lazily for terms/lengths touched since last query
+        self._array_cache: Dict[str, tuple] = {}
+        self._lengths_array = None
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._slots
+
+    def add(self, doc_id: int, text: str):
+        """Index ``text`` under ``doc_id``, replacing any earlier version."""
+        if doc_id in self._slots:
+            self.remove(doc_id)
+        counts: Dict[str, int] = {}
+        for token in tokenize(text):
+            counts[token] = counts.get(token, 0) + 1
+        length = sum(counts.values())
+
+        if self._free:
+            slot = self._free.pop()
+            self._doc_ids[slot] = doc_id
+            self._lengths[slot] = length
+        else:
+            slot = len(self._doc_ids)
+            self._doc_ids.append(doc_id)
+            self._lengths.append(length)
+        self._slots[doc_id] = slot
+        self._doc_terms[doc_id] = counts
+        self._total_length += length
+        for term, tf in counts.items():
+            self._postings.setdefault(term, {})[slot] = tf
+            self._array_cache.pop(term, None)
+        self._lengths_array = None
+
+    def remove(self, doc_id: int):
+        slot = self._slots.pop(doc_id, None)
+        if slot is None:
+            return
+        for term in self._doc_terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[slot]
+            if not postings:
+                del self._postings[term]
+            self._array_cache.pop(term, None)
+        self._total_length -= self._lengths[slot]
+        self._doc_ids[slot] = -1
+        self._lengths[slot] = 0
+        self._free.append(slot)
+        self._lengths_array = None
+
+    def top_k(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Return up to ``k`` (doc id, score) pairs, highest score first."""
+        n_docs = len(self._slots)
+        terms = [t for t in set(tokenize(query)) if t in self._postings]
+        if not n_docs or not terms or k <= 0:
+            return []
+        avg_length = self._total_length / n_docs or 1.0
+        if np is not None:
+            scores = self._score_numpy(terms, n_docs, avg_length, k)
+        else:
+            scores = self._score_python(terms, n_docs, avg_length)
+        best = heapq.nlargest(k, scores.items(), key=lambda item: (item[1], -item[0]))
+        return [(self._doc_ids[slot], score) for slot, score in best]
+
+    def _idf(self, term: str, n_docs: int) -> float:
+        df = len(self._postings[term])
+        return math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+
+    def _score_python(self, terms: List[str], n_docs: int, avg_length: float) -> Dict[int, float]:
+        k1, b = self.k1, self.b
+        scores: Dict[int, float] = {}
+        for term in terms:
+            idf = self._idf(term, n_docs)
+            for slot, tf in self._postings[term].items():
+                norm = k1 * (1.0 - b + b * self._lengths[slot] / avg_length)
+                scores[slot] = scores.get(slot, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+        return scores
+
+    def _score_numpy(self, terms: List[str], n_docs: int, avg_length: float, k: int) -> Dict[int, float]:
+        if self._lengths_array is None:
+            self._lengths_array = np.asarray(self._lengths, dtype=np.float64)
+        norms = self.k1 * (1.0 - self.b + self.b * self._lengths_array / avg_length)
+        scores = np.zeros(len(self._lengths), dtype=np.float64)
+        for term in terms:
+            arrays = self._array_cache.get(term)
+            if arrays is None:
+                postings = self._postings[term]
+                arrays = (
+                    np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                    np.fromiter(postings.values(), dtype=np.float64, count=len(postings)),
+                )
+                self._array_cache[term] = arrays
+            slots, tfs = arrays
+            idf = self._idf(term, n_docs)
+            # slots are unique within one term, so fancy-index += is safe
+            scores[slots] += idf * tfs * (self.k1 + 1.0) / (tfs + norms[slots])
+        hit = np.flatnonzero(scores)
+        if len(hit) > k:
+            # only the k best candidates (plus ties at the cut) leave NumPy
+            cut = -np.partition(-scores[hit], k - 1)[k - 1]
+            hit = hit[scores[hit] >= cut]
+        return dict(zip(hit.tolist(), scores[hit].tolist()))
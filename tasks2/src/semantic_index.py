@@ -0,0 +1,181 @@
+from __future__ import annotations
+import json
+import os
+import re
+import zlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # semantic search is optional and needs NumPy
+    np = None
+
+Embedder = Callable[[Sequence[str]], "np.ndarray"]
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def hashing_embedder(dim: int = 256) -> Embedder:
+    """Offline embedding: signed feature hashing of words and word pairs.
+
+    Not a learned model, but it is deterministic, needs no downloads and
+    places texts that share vocabulary close together. Any callable with the
+    same signature (e.g. a local sentence-transformers model) can replace it.
+    """
+    def embed(texts: Sequence[str]) -> "np.ndarray":
+        out = np.zeros((len(texts), dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = TOKEN_RE.findall(text.lower())
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                out[row, h % dim] += 1.0 if h & 0x80000000 else -1.0
+        return out
+
+    embed.dim = dim
+    return embed
+
+
+class SemanticIndex:
+    """Cosine top-K search over knowledge entries using a memory-mapped matrix.
+
+    Vectors live in ``<prefix>.vectors.f32`` (raw float32, one row per entry)
+    next to a ``<prefix>.vectors.json`` sidecar mapping entry ids to rows and
+    the ``updated_at`` each row was embedded from. ``sync`` only embeds
+    entries that are new or whose ``updated_at`` changed.
+    """
+
+    def __init__(self, prefix: Path, embed: Optional[Embedder] = None, dim: int = 256):
+        if np is None:
+            raise RuntimeError("Semantic search requires NumPy (pip install numpy)")
+        self.embed = embed or hashing_embedder(dim)
+        self.dim = getattr(self.embed, "dim", dim)
+        self.vectors_file = Path(f"{prefix}.vectors.f32")
+        self.meta_file = Path(f"{prefix}.vectors.json")
+        self._rows: Dict[int, Tuple[int, str]] = {}  # entry id -> (row, updated_at)
+        self._free: List[int] = []
+        self._capacity = 0
+        self._matrix = None
+        self._row_ids = None
+        self._load()
+
+    # --- storage ------------------------------------------------------------
+    def _load(self):
+        meta = {}
+        if self.meta_file.exists() and self.vectors_file.exists():
+            try:
+                meta = json.loads(self.meta_file.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                meta = {}
+        if meta.get("dim") != self.dim:
+            meta = {}  # different embedder: start over
+        self._rows = {int(k): (v[0], v[1]) for k, v in meta.get("rows", {}).items()}
+        self._free = list(meta.get("free", []))
+        self._capacity = meta.get("capacity", 0)
+        if self._capacity:
+            self._matrix = np.memmap(self.vectors_file, dtype=np.float32, mode="r+",
+                                     shape=(self._capacity, self.dim))
+        self._rebuild_row_ids()
+
+    def _save(self):
+        if self._matrix is not None:
+            self._matrix.flush()
+        meta = {
+            "dim": self.dim,
+            "capacity": self._capacity,
+            "rows": {str(k): list(v) for k, v in self._rows.items()},
+            "free": self._free,
+        }
+        tmp = self.meta_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, self.meta_file)
+
+    def _grow(self, needed: int):
+        capacity = max(64, self._capacity)
+        while capacity < needed:
+            capacity *= 2
+        if capacity == self._capacity:
+            return
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+        with open(self.vectors_file, "ab") as f:
+            f.truncate(capacity * self.dim * 4)  # new rows read back as zeros
+        self._capacity = capacity
+        self._matrix = np.memmap(self.vectors_file, dtype=np.float32, mode="r+",
+                                 shape=(self._capacity, self.dim))
+
+    def _rebuild_row_ids(self):
+        self._row_ids = np.full(self._capacity, -1, dtype=np.int64)
+        for entry_id, (row, _) in self._rows.items():
+            self._row_ids[row] = entry_id
+
+    # --- maintenance --------------------------------------------------------
+    def sync(self, entries: Iterable) -> int:
+        """Embed new/changed entries and drop deleted ones; returns rows embedded."""
+        seen = set()
+        changed = []
+        for entry in entries:
+            seen.add(entry.id)
+            current = self._rows.get(entry.id)
+            if current is None or current[1] != entry.updated_at:
+                changed.append(entry)
+
+        removed = [entry_id for entry_id in self._rows if entry_id not in seen]
+        for entry_id in removed:
+            row, _ = self._rows.pop(entry_id)
+            self._matrix[row] = 0.0
+            self._free.append(row)
+
+        if changed:
+            new_rows = sum(1 for e in changed if e.id not in self._rows)
+            in_use = len(self._rows) + len(self._free)
+            self._grow(in_use + max(0, new_rows - len(self._free)))
+            vectors = self._normalize(np.asarray(
+                self.embed([f"{e.title}\n{e.content}" for e in changed]), dtype=np.float32))
+            for entry, vector in zip(changed, vectors):
+                if entry.id in self._rows:
+                    row = self._rows[entry.id][0]
+                elif self._free:
+                    row = self._free.pop()
+                else:
+                    row = in_use
+                    in_use += 1
+                self._matrix[row] = vector
+                self._rows[entry.id] = (row, entry.updated_at)
+
+        if changed or removed:
+            self._rebuild_row_ids()
+            self._save()
+        return len(changed)
+
+    @staticmethod
+    def _normalize(vectors: "np.ndarray") -> "np.ndarray":
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    # --- queries ------------------------------------------------------------
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top-``k`` (entry id, cosine similarity) pairs for one query."""
+        return self.search_many([query], k)[0]
+
+    def search_many(self, queries: Sequence[str], k: int = 5) -> List[List[Tuple[int, float]]]:
+        """Batch form of ``search``: one matrix product for all queries."""
+        if not self._rows or not queries or k <= 0:
+            return [[] for _ in queries]
+        q = self._normalize(np.asarray(self.embed(list(queries)), dtype=np.float32))
+        valid = np.flatnonzero(self._row_ids >= 0)
+        scores = self._matrix[valid] @ q.T  # (rows, queries)
+        k = min(k, len(valid))
+        results = []
+        for col in range(scores.shape[1]):
+            column = scores[:, col]
+            top = np.argpartition(-column, k - 1)[:k]
+            top = top[np.argsort(-column[top], kind="stable")]
+            results.append([
+                (int(self._row_ids[valid[i]]), float(column[i]))
+                for i in top if column[i] > 0
+            ])
+        return results
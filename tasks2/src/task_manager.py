@@ -2,9 +2,12 @@ from __future__ import annotations
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Iterator, List, Optional, Dict
 import json
 
+from .record_index import RecordIndex
+from .task_query import TaskQuery, run_query
+
 @dataclass
 class Task:
     """Task model with enhanced attributes."""
@@ -18,6 +21,8 @@ class Task:
     tags: List[str]
     created_at: str
     completed_at: Optional[str]
+    summary: Optional[str] = None  # short phrase filled in by the summary pipeline
+    summary_hash: Optional[str] = None
     
     @staticmethod
     def from_dict(data: Dict) -> Task:
@@ -33,9 +38,23 @@ class TaskManager:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.tasks_file = self.data_dir / "tasks.json"
-        self.tasks: List[Task] = []
+        self._index = RecordIndex(("status", "priority", "categories", "tags"))
+        self.next_id = 1
         self.load_tasks()
 
+    @property
+    def tasks(self) -> List[Task]:
+        """All tasks in insertion order (a copy; mutate through the manager)."""
+        return self._index.values()
+
+    @tasks.setter
+    def tasks(self, tasks: List[Task]):
+        self._index.clear()
+        for task in tasks:
+            self._index.add(task)
+        # ids are never reused: next_id is persisted and only grows
+        self.next_id = max(self.next_id, max(self._index.ids(), default=0) + 1)
+
     def load_tasks(self):
         """Load tasks from JSON file."""
         if not self.tasks_file.exists():
@@ -45,6 +64,10 @@ class TaskManager:
         try:
             with open(self.tasks_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
+                # {"next_id": N, "tasks": [...]}; plain lists from older versions still load
+                if isinstance(data, dict):
+                    self.next_id = max(self.next_id, data.get("next_id", 1))
+                    data = data["tasks"]
                 self.tasks = [Task.from_dict(task_data) for task_data in data]
         except Exception as e:
             print(f"Error loading tasks: {e}")
@@ -55,7 +78,7 @@ class TaskManager:
         try:
             with open(self.tasks_file, 'w', encoding='utf-8') as f:
                 data = [task.to_dict() for task in self.tasks]
-                json.dump(data, f, indent=2)
+                json.dump({"next_id": self.next_id, "tasks": data}, f, indent=2)
         except Exception as e:
             print(f"Error saving tasks: {e}")
 
@@ -63,7 +86,8 @@ class TaskManager:
                 due_date: Optional[str] = None, categories: List[str] = None,
                 tags: List[str] = None) -> Task:
         """Add a new task with enhanced metadata."""
-        task_id = len(self.tasks) + 1
+        task_id = self.next_id
+        self.next_id += 1
         now = datetime.now().isoformat()
         
         task = Task(
@@ -79,23 +103,19 @@ class TaskManager:
             completed_at=None
         )
         
-        self.tasks.append(task)
+        self._index.add(task)
         self.save_tasks()
         return task
 
     def get_task(self, task_id: int) -> Optional[Task]:
         """Get a task by ID."""
-        return next((task for task in self.tasks if task.id == task_id), None)
+        return self._index.get(task_id)
 
     def update_task(self, task_id: int, **kwargs) -> Optional[Task]:
         """Update task attributes."""
-        task = self.get_task(task_id)
+        task = self._index.update(task_id, kwargs)
         if not task:
             return None
-            
-        for key, value in kwargs.items():
-            if hasattr(task, key):
-                setattr(task, key, value)
                 
         if 'status' in kwargs and kwargs['status'] == 'completed':
             task.completed_at = datetime.now().isoformat()
@@ -105,57 +125,37 @@ class TaskManager:
 
     def delete_task(self, task_id: int) -> bool:
         """Delete a task."""
-        task = self.get_task(task_id)
-        if task:
-            self.tasks.remove(task)
+        if self._index.remove(task_id):
             self.save_tasks()
             return True
         return False
 
     def search_tasks(self, query: str = None, categories: List[str] = None,
                     tags: List[str] = None, status: str = None,
-                    priority: str = None) -> List[Task]:
+                    priority: str = None, due_after: str = None,
+                    due_before: str = None, sort: str = None,
+                    limit: int = None) -> List[Task]:
         """Enhanced search with multiple criteria."""
-        results = self.tasks
-
-        if query:
-            query = query.lower()
-            results = [
-                task for task in results
-                if query in task.title.lower() or
-                query in task.description.lower()
-            ]
-
-        if categories:
-            results = [
-                task for task in results
-                if any(cat in task.categories for cat in categories)
-            ]
-
-        if tags:
-            results = [
-                task for task in results
-                if any(tag in task.tags for tag in tags)
-            ]
-
-        if status:
-            results = [task for task in results if task.status == status]
-
-        if priority:
-            results = [task for task in results if task.priority == priority]
+        return list(self.query(TaskQuery(
+            text=query, categories=categories, tags=tags, status=status,
+            priority=priority, due_after=due_after, due_before=due_before,
+            sort=sort, limit=limit,
+        )))
 
-        return results
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Lazily yield tasks matching ``query``; see ``task_query.run_query``."""
+        return run_query(self._index, query)
 
     def get_tasks_by_priority(self) -> Dict[str, List[Task]]:
         """Group tasks by priority."""
         priorities = {"urgent": [], "high": [], "normal": [], "low": []}
-        for task in self.tasks:
-            priorities[task.priority].append(task)
+        for priority in priorities:
+            priorities[priority] = self._index.select({"priority": [priority]})
         return priorities
 
     def get_tasks_by_status(self) -> Dict[str, List[Task]]:
         """Group tasks by status."""
         statuses = {"not-started": [], "in-progress": [], "completed": []}
-        for task in self.tasks:
-            statuses[task.status].append(task)
+        for status in statuses:
+            statuses[status] = self._index.select({"status": [status]})
         return statuses
\ No newline at end of file
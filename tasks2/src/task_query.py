@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from datetime import date
+from itertools import islice
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from .record_index import RecordIndex
+
+PRIORITY_RANK = {"urgent": 0, "high": 1, "normal": 2, "low": 3}
+
+# sort field -> key; tasks without a due date sort after dated ones (ascending)
+SORT_KEYS: Dict[str, Callable[[Any], tuple]] = {
+    "id": lambda t: (0, t.id),
+    "title": lambda t: (0, t.title.lower()),
+    "priority": lambda t: (0, PRIORITY_RANK.get(t.priority, len(PRIORITY_RANK))),
+    "status": lambda t: (0, t.status),
+    "due": lambda t: (0, t.due_date) if t.due_date else (1, ""),
+    "created": lambda t: (0, t.created_at),
+}
+
+
+@dataclass
+class TaskQuery:
+    """Criteria for ``TaskManager.query``.
+
+    List criteria match if a task has any of the values. ``due_after`` and
+    ``due_before`` are inclusive ISO dates (YYYY-MM-DD) and exclude tasks
+    without a due date. ``sort`` names a key from ``SORT_KEYS``, prefixed with ``-`` for
+    descending order; without it results keep insertion order.
+    """
+
+    text: Optional[str] = None
+    categories: Optional[List[str]] = None
+    tags: Optional[List[str]] = None
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    due_after: Optional[str] = None
+    due_before: Optional[str] = None
+    sort: Optional[str] = None
+    limit: Optional[int] = None
+
+    def indexed(self) -> List[Tuple[str, List[Any]]]:
+        criteria = [
+            ("status", [self.status] if self.status else []),
+            ("priority", [self.priority] if self.priority else []),
+            ("categories", self.categories or []),
+            ("tags", self.tags or []),
+        ]
+        return [(field, values) for field, values in criteria if values]
+
+
+def _sort_key(sort: str) -> Tuple[Callable, bool]:
+    descending = sort.startswith("-")
+    name = sort.lstrip("-")
+    if name not in SORT_KEYS:
+        raise ValueError(f"Unknown sort field {name!r}; choose from {', '.join(SORT_KEYS)}")
+    return SORT_KEYS[name], descending
+
+
+def _iso_date(name: str, value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid {name} date {value!r}; use YYYY-MM-DD") from None
+
+
+def run_query(index: RecordIndex, query: TaskQuery) -> Iterator[Any]:
+    """Yield the tasks matching ``query``.
+
+    The most selective indexed criterion (smallest postings) supplies the
+    candidates. The remaining indexed criteria become O(1) id-membership
+    checks, then the due range is checked, and the substring match runs
+    last. Without ``sort`` the results stream lazily, so ``limit`` stops
+    the scan early. With ``sort`` and ``limit``, a bounded heap keeps only
+    the best ``limit`` tasks.
+
+    Candidates are taken from a snapshot, so adding or deleting tasks while
+    the results are consumed is safe; a task deleted meanwhile is skipped.
+    Raises ValueError for an unknown sort field or a malformed due date.
+    """
+    # validate before any work
+    sort = _sort_key(query.sort) if query.sort else None
+    after = _iso_date("due_after", query.due_after)
+    before = _iso_date("due_before", query.due_before)
+    if query.limit is not None and query.limit <= 0:
+        return iter(())
+
+    # estimate selectivity from postings sizes; cheapest criterion first
+    id_sets = sorted((index.matching(field, values) for field, values in query.indexed()), key=len)
+    if id_sets and not id_sets[0]:
+        return iter(())
+    if id_sets:
+        candidates = (t for t in map(index.get, index.in_order(id_sets[0])) if t is not None)
+    else:
+        candidates = (t for t in index.values() if t.id in index)
+
+    checks: List[Callable[[Any], bool]] = [lambda t, ids=ids: t.id in ids for ids in id_sets[1:]]
+    if after or before:
+        checks.append(
+            lambda t: bool(t.due_date)
+            and (not after or t.due_date[:10] >= after)
+            and (not before or t.due_date[:10] <= before)
+        )
+    if query.text:
+        q = query.text.lower()
+        checks.append(lambda t: q in t.title.lower() or q in t.description.lower())
+
+    matches = (t for t in candidates if all(check(t) for check in checks))
+
+    if sort is None:
+        return islice(matches, query.limit) if query.limit is not None else matches
+
+    key, descending = sort
+    if query.limit is not None:
+        pick = heapq.nlargest if descending else heapq.nsmallest
+        return iter(pick(query.limit, matches, key=key))
+    return iter(sorted(matches, key=key, reverse=descending))
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import List, Optional, Dict
 import json
 
+from .record_index import RecordIndex
+
 
 @dataclass
 class KnowledgeEntry:
@@ -32,9 +34,22 @@ class KnowledgeManager:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.knowledge_file = self.data_dir / "knowledge.json"
-        self.entries: List[KnowledgeEntry] = []
+        self._index = RecordIndex(("categories", "tags", "related_tasks"))
+        self.next_id = 1
         self.load_entries()
 
+    @property
+    def entries(self) -> List[KnowledgeEntry]:
+        """All entries in insertion order (a copy; mutate through the manager)."""
+        return self._index.values()
+
+    @entries.setter
+    def entries(self, entries: List[KnowledgeEntry]) -> None:
+        self._index.clear()
+        for entry in entries:
+            self._index.add(entry)
+        self.next_id = max(self.next_id, max(self._index.ids(), default=0) + 1)
+
     def load_entries(self) -> None:
         if not self.knowledge_file.exists():
             self.entries = []
@@ -43,6 +58,10 @@ class KnowledgeManager:
         try:
             with open(self.knowledge_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
+                # {"next_id": N, "entries": [...]}; plain lists from older versions still load
+                if isinstance(data, dict):
+                    self.next_id = max(self.next_id, data.get("next_id", 1))
+                    data = data["entries"]
                 self.entries = [KnowledgeEntry.from_dict(entry_data) for entry_data in data]
         except Exception:
             self.entries = []
@@ -50,7 +69,7 @@ class KnowledgeManager:
     def save_entries(self) -> None:
         with open(self.knowledge_file, "w", encoding="utf-8") as f:
             data = [entry.to_dict() for entry in self.entries]
-            json.dump(data, f, indent=2)
+            json.dump({"next_id": self.next_id, "entries": data}, f, indent=2)
 
     def add_entry(
         self,
@@ -61,7 +80,8 @@ class KnowledgeManager:
         references: Optional[List[str]] = None,
         related_tasks: Optional[List[int]] = None,
     ) -> KnowledgeEntry:
-        entry_id = len(self.entries) + 1
+        entry_id = self.next_id
+        self.next_id += 1
         now = datetime.now().isoformat()
 
         entry = KnowledgeEntry(
@@ -76,30 +96,24 @@ class KnowledgeManager:
             related_tasks=related_tasks or [],
         )
 
-        self.entries.append(entry)
+        self._index.add(entry)
         self.save_entries()
         return entry
 
     def get_entry(self, entry_id: int) -> Optional[KnowledgeEntry]:
-        return next((entry for entry in self.entries if entry.id == entry_id), None)
+        return self._index.get(entry_id)
 
     def update_entry(self, entry_id: int, **kwargs) -> Optional[KnowledgeEntry]:
-        entry = self.get_entry(entry_id)
+        entry = self._index.update(entry_id, kwargs)
         if not entry:
             return None
 
-        for key, value in kwargs.items():
-            if hasattr(entry, key):
-                setattr(entry, key, value)
-
         entry.updated_at = datetime.now().isoformat()
         self.save_entries()
         return entry
 
     def delete_entry(self, entry_id: int) -> bool:
-        entry = self.get_entry(entry_id)
-        if entry:
-            self.entries.remove(entry)
+        if self._index.remove(entry_id):
             self.save_entries()
             return True
         return False
@@ -111,7 +125,14 @@ class KnowledgeManager:
         tags: Optional[List[str]] = None,
         related_task_id: Optional[int] = None,
     ) -> List[KnowledgeEntry]:
-        results = self.entries
+        # indexed filters first, via postings intersection; text match last
+        results = self._index.select(
+            {
+                "categories": categories or [],
+                "tags": tags or [],
+                "related_tasks": [related_task_id] if related_task_id is not None else [],
+            }
+        )
 
         if query:
             q = query.lower()
@@ -119,30 +140,18 @@ class KnowledgeManager:
                 entry for entry in results if q in entry.title.lower() or q in entry.content.lower()
             ]
 
-        if categories:
-            results = [
-                entry for entry in results if any(cat in entry.categories for cat in categories)
-            ]
-
-        if tags:
-            results = [entry for entry in results if any(tag in entry.tags for tag in tags)]
-
-        if related_task_id is not None:
-            results = [entry for entry in results if related_task_id in entry.related_tasks]
-
         return results
 
     def get_entries_by_category(self) -> Dict[str, List[KnowledgeEntry]]:
-        categories: Dict[str, List[KnowledgeEntry]] = {}
-        for entry in self.entries:
-            for category in entry.categories:
-                categories.setdefault(category, []).append(entry)
-        return categories
+        return {
+            category: self._index.select({"categories": [category]})
+            for category in self._index.postings["categories"]
+        }
 
     def link_to_task(self, entry_id: int, task_id: int) -> bool:
         entry = self.get_entry(entry_id)
         if entry and task_id not in entry.related_tasks:
-            entry.related_tasks.append(task_id)
+            self._index.update(entry_id, {"related_tasks": entry.related_tasks + [task_id]})
             self.save_entries()
             return True
         return False
@@ -3,9 +3,12 @@ from __future__ import annotations
 from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import Dict, Iterator, List, Optional
 import json
 
+from .record_index import RecordIndex
+from .task_query import TaskQuery, run_query
+
 
 @dataclass
 class Task:
@@ -37,9 +40,23 @@ class TaskManager:
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.tasks_file = self.data_dir / "tasks.json"
-        self.tasks: List[Task] = []
+        self._index = RecordIndex(("status", "priority", "categories", "tags"))
+        self.next_id = 1
         self.load_tasks()
 
+    @property
+    def tasks(self) -> List[Task]:
+        """All tasks in insertion order (a copy; mutate through the manager)."""
+        return self._index.values()
+
+    @tasks.setter
+    def tasks(self, tasks: List[Task]) -> None:
+        self._index.clear()
+        for task in tasks:
+            self._index.add(task)
+        # ids are never reused: next_id is persisted and only grows
+        self.next_id = max(self.next_id, max(self._index.ids(), default=0) + 1)
+
     def load_tasks(self) -> None:
         """Load tasks from JSON file."""
         if not self.tasks_file.exists():
@@ -49,6 +66,10 @@ class TaskManager:
         try:
             with open(self.tasks_file, "r", encoding="utf-8") as f:
                 data = json.load(f)
+                # {"next_id": N, "tasks": [...]}; plain lists from older versions still load
+                if isinstance(data, dict):
+                    self.next_id = max(self.next_id, data.get("next_id", 1))
+                    data = data["tasks"]
                 self.tasks = [Task.from_dict(task_data) for task_data in data]
         except Exception:
             # Keep it resilient for tests and demo
@@ -58,7 +79,7 @@ class TaskManager:
         """Save tasks to JSON file."""
         with open(self.tasks_file, "w", encoding="utf-8") as f:
             data = [task.to_dict() for task in self.tasks]
-            json.dump(data, f, indent=2)
+            json.dump({"next_id": self.next_id, "tasks": data}, f, indent=2)
 
     def add_task(
         self,
@@ -70,7 +91,8 @@ class TaskManager:
         tags: Optional[List[str]] = None,
     ) -> Task:
         """Add a new task with enhanced metadata."""
-        task_id = len(self.tasks) + 1
+        task_id = self.next_id
+        self.next_id += 1
         now = datetime.now().isoformat()
 
         task = Task(
@@ -86,22 +108,18 @@ class TaskManager:
             completed_at=None,
         )
 
-        self.tasks.append(task)
+        self._index.add(task)
         self.save_tasks()
         return task
 
     def get_task(self, task_id: int) -> Optional[Task]:
-        return next((task for task in self.tasks if task.id == task_id), None)
+        return self._index.get(task_id)
 
     def update_task(self, task_id: int, **kwargs) -> Optional[Task]:
-        task = self.get_task(task_id)
+        task = self._index.update(task_id, kwargs)
         if not task:
             return None
 
-        for key, value in kwargs.items():
-            if hasattr(task, key):
-                setattr(task, key, value)
-
         if "status" in kwargs and kwargs["status"] == "completed":
             task.completed_at = datetime.now().isoformat()
 
@@ -109,9 +127,7 @@ class TaskManager:
         return task
 
     def delete_task(self, task_id: int) -> bool:
-        task = self.get_task(task_id)
-        if task:
-            self.tasks.remove(task)
+        if self._index.remove(task_id):
             self.save_tasks()
             return True
         return False
@@ -123,41 +139,39 @@ class TaskManager:
         tags: Optional[List[str]] = None,
         status: Optional[str] = None,
         priority: Optional[str] = None,
+        due_after: Optional[str] = None,
+        due_before: Optional[str] = None,
+        sort: Optional[str] = None,
+        limit: Optional[int] = None,
     ) -> List[Task]:
-        results = self.tasks
-
-        if query:
-            q = query.lower()
-            results = [
-                task
-                for task in results
-                if q in task.title.lower() or q in task.description.lower()
-            ]
-
-        if categories:
-            results = [
-                task for task in results if any(cat in task.categories for cat in categories)
-            ]
-
-        if tags:
-            results = [task for task in results if any(tag in task.tags for tag in tags)]
-
-        if status:
-            results = [task for task in results if task.status == status]
-
-        if priority:
-            results = [task for task in results if task.priority == priority]
+        return list(
+            self.query(
+                TaskQuery(
+                    text=query,
+                    categories=categories,
+                    tags=tags,
+                    status=status,
+                    priority=priority,
+                    due_after=due_after,
+                    due_before=due_before,
+                    sort=sort,
+                    limit=limit,
+                )
+            )
+        )
 
-        return results
+    def query(self, query: TaskQuery) -> Iterator[Task]:
+        """Lazily yield tasks matching ``query``; see ``task_query.run_query``."""
+        return run_query(self._index, query)
 
     def get_tasks_by_priority(self) -> Dict[str, List[Task]]:
         priorities: Dict[str, List[Task]] = {"urgent": [], "high": [], "normal": [], "low": []}
-        for task in self.tasks:
-            priorities[task.priority].append(task)
+        for priority in priorities:
+            priorities[priority] = self._index.select({"priority": [priority]})
         return priorities
 
     def get_tasks_by_status(self) -> Dict[str, List[Task]]:
         statuses: Dict[str, List[Task]] = {"not-started": [], "in-progress": [], "completed": []}
-        for task in self.tasks:
-            statuses[task.status].append(task)
+        for status in statuses:
+            statuses[status] = self._index.select({"status": [status]})
         return statuses
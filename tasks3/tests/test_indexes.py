@@ -0,0 +1,92 @@
+import random
+from pathlib import Path
+
+from tasks3.knowledge_manager import KnowledgeManager
+from tasks3.task_manager import TaskManager
+
+STATUSES = ["not-started", "in-progress", "completed"]
+PRIORITIES = ["low", "normal", "high", "urgent"]
+LABELS = ["a", "b", "c", "d"]
+
+
+def _labels(rng: random.Random):
+    return rng.sample(LABELS, rng.randint(0, 2))
+
+
+def _scan_tasks(tasks, query=None, categories=None, tags=None, status=None, priority=None):
+    return [
+        t.id
+        for t in tasks
+        if (not query or query in t.title.lower() or query in t.description.lower())
+        and (not categories or any(c in t.categories for c in categories))
+        and (not tags or any(x in t.tags for x in tags))
+        and (not status or t.status == status)
+        and (not priority or t.priority == priority)
+    ]
+
+
+def test_task_indexes_stay_consistent(tmp_path: Path):
+    rng = random.Random(7)
+    tm = TaskManager(data_dir=str(tmp_path))
+    seen_ids = set()
+    for step in range(400):
+        op = rng.random()
+        ids = [t.id for t in tm.tasks]
+        if op < 0.45 or not ids:
+            task = tm.add_task(f"t{step}", rng.choice(["x", "y"]), priority=rng.choice(PRIORITIES),
+                               categories=_labels(rng), tags=_labels(rng))
+            assert task.id not in seen_ids
+            seen_ids.add(task.id)
+        elif op < 0.8:
+            tm.update_task(rng.choice(ids), status=rng.choice(STATUSES),
+                           priority=rng.choice(PRIORITIES), tags=_labels(rng))
+        else:
+            assert tm.delete_task(rng.choice(ids))
+
+        criteria = dict(
+            query=rng.choice([None, "x"]),
+            categories=rng.choice([None, _labels(rng)]),
+            tags=rng.choice([None, _labels(rng)]),
+            status=rng.choice([None] + STATUSES),
+            priority=rng.choice([None] + PRIORITIES),
+        )
+        assert [t.id for t in tm.search_tasks(**criteria)] == _scan_tasks(tm.tasks, **criteria)
+
+    for task in tm.tasks:
+        assert tm.get_task(task.id) is task
+    by_status = tm.get_tasks_by_status()
+    assert sum(len(v) for v in by_status.values()) == len(tm.tasks)
+
+    reloaded = TaskManager(data_dir=str(tmp_path))
+    assert [t.to_dict() for t in reloaded.tasks] == [t.to_dict() for t in tm.tasks]
+    assert [t.id for t in reloaded.search_tasks(tags=["a"])] == [t.id for t in tm.search_tasks(tags=["a"])]
+
+
+def test_knowledge_indexes_stay_consistent(tmp_path: Path):
+    rng = random.Random(11)
+    km = KnowledgeManager(data_dir=str(tmp_path))
+    for step in range(300):
+        ids = [e.id for e in km.entries]
+        op = rng.random()
+        if op < 0.45 or not ids:
+            km.add_entry(f"e{step}", "body", categories=_labels(rng), tags=_labels(rng))
+        elif op < 0.65:
+            km.update_entry(rng.choice(ids), tags=_labels(rng), categories=_labels(rng))
+        elif op < 0.85:
+            km.link_to_task(rng.choice(ids), rng.randint(1, 5))
+        else:
+            assert km.delete_entry(rng.choice(ids))
+
+        tags = rng.choice([None, _labels(rng)])
+        task_id = rng.choice([None, 1, 2, 3])
+        expected = [
+            e.id
+            for e in km.entries
+            if (not tags or any(t in e.tags for t in tags))
+            and (task_id is None or task_id in e.related_tasks)
+        ]
+        assert [e.id for e in km.search_entries(tags=tags, related_task_id=task_id)] == expected
+
+    by_cat = km.get_entries_by_category()
+    for category, entries in by_cat.items():
+        assert [e.id for e in entries] == [e.id for e in km.entries if category in e.categories]
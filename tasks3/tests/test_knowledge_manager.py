@@ -25,3 +25,11 @@ def test_add_and_search_entry(tmp_path: Path):
 
     assert km.link_to_task(e1.id, 42) is True
     assert 42 in km.get_entry(e1.id).related_tasks
+
+
+def test_entry_ids_are_not_reused_after_reload(tmp_path: Path):
+    km = KnowledgeManager(data_dir=str(tmp_path))
+    km.add_entry(title="a", content="")
+    last = km.add_entry(title="b", content="")
+    km.delete_entry(last.id)
+    assert KnowledgeManager(data_dir=str(tmp_path)).add_entry(title="c", content="").id == last.id + 1
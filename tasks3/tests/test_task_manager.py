@@ -1,3 +1,4 @@
+import json
 from pathlib import Path
 from tasks3.task_manager import TaskManager
 
@@ -30,3 +31,15 @@ def test_search_and_update(tmp_path: Path):
 
     by_priority = tm.get_tasks_by_priority()
     assert any(task.id == t2.id for task in by_priority["high"])
+
+
+def test_ids_are_not_reused_after_reload(tmp_path: Path):
+    tm = TaskManager(data_dir=str(tmp_path))
+    tm.add_task("one", "")
+    last = tm.add_task("two", "")
+    tm.delete_task(last.id)
+    assert TaskManager(data_dir=str(tmp_path)).add_task("three", "").id == last.id + 1
+
+    # files written before next_id was stored are plain lists
+    (tmp_path / "tasks.json").write_text(json.dumps([t.to_dict() for t in tm.tasks]))
+    assert TaskManager(data_dir=str(tmp_path)).add_task("four", "").id == 2
@@ -0,0 +1,75 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from tasks3.task_manager import TaskManager
+from tasks3.task_query import SORT_KEYS, TaskQuery
+
+
+def _manager(tmp_path: Path) -> TaskManager:
+    rng = random.Random(5)
+    tm = TaskManager(data_dir=str(tmp_path))
+    tm.tasks = []
+    for i in range(60):
+        due = rng.choice([None, f"2024-0{rng.randint(1, 9)}-1{rng.randint(0, 9)}"])
+        tm.add_task(f"task {i}", rng.choice(["write docs", "fix bug"]),
+                    priority=rng.choice(["low", "normal", "high", "urgent"]), due_date=due,
+                    tags=rng.sample(["a", "b", "c"], rng.randint(0, 2)))
+    return tm
+
+
+def test_query_matches_brute_force(tmp_path: Path):
+    tm = _manager(tmp_path)
+    tasks = tm.tasks
+    for sort in [None, "due", "-priority", "title"]:
+        for limit in [None, 3]:
+            query = TaskQuery(text="docs", tags=["a", "b"], due_after="2024-03-01",
+                              due_before="2024-07-31", sort=sort, limit=limit)
+            expected = [
+                t for t in tasks
+                if "docs" in t.description and set(t.tags) & {"a", "b"}
+                and t.due_date and "2024-03-01" <= t.due_date <= "2024-07-31"
+            ]
+            if sort:
+                key = SORT_KEYS[sort.lstrip("-")]
+                expected.sort(key=key, reverse=sort.startswith("-"))
+            expected = expected[:limit]
+            got = tm.search_tasks(query="docs", tags=["a", "b"], due_after="2024-03-01",
+                                  due_before="2024-07-31", sort=sort, limit=limit)
+            assert [t.id for t in got] == [t.id for t in expected]
+            assert [t.id for t in tm.query(query)] == [t.id for t in expected]
+
+
+def test_query_is_lazy_and_short_circuits(tmp_path: Path):
+    tm = _manager(tmp_path)
+    results = tm.query(TaskQuery(text="task", limit=2))
+    assert next(results).id == 1
+    assert tm.search_tasks(tags=["missing"], query="docs") == []
+    assert tm.search_tasks(limit=0) == []
+
+
+def test_results_survive_mutation_while_streaming(tmp_path: Path):
+    tm = _manager(tmp_path)
+    results = tm.query(TaskQuery())
+    first = next(results)
+    tm.delete_task(first.id + 1)
+    tm.add_task("added while streaming", "x")
+    rest = [t.id for t in results]
+    assert first.id + 1 not in rest
+    assert len(rest) == 58  # the snapshot: 60 tasks, minus the one consumed and the one deleted
+
+    tagged = tm.query(TaskQuery(tags=["a"]))
+    next(tagged)
+    for t in tm.search_tasks(tags=["a"]):
+        tm.delete_task(t.id)
+    assert list(tagged) == []
+
+
+def test_due_dates_are_validated(tmp_path: Path):
+    tm = _manager(tmp_path)
+    for bad in ("2024-13-01", "next week", "2024/03/01"):
+        with pytest.raises(ValueError, match="Invalid due_after date"):
+            tm.query(TaskQuery(due_after=bad))
+    with pytest.raises(ValueError, match="Invalid due_before date"):
+        tm.search_tasks(due_before="2024-02-30")
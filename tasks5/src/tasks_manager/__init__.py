@@ -2,6 +2,7 @@
 
 from .task import Task
 from .store import TaskStore
+from .sqlite_store import SQLiteTaskStore
 
 __version__ = "0.1.0"
-__all__ = ["Task", "TaskStore"]
+__all__ = ["Task", "TaskStore", "SQLiteTaskStore"]
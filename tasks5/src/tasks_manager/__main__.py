@@ -1,7 +1,33 @@
 """Command-line interface for tasks manager."""
 
+import os
+import shlex
 import sys
+import time
+from typing import List
 from .store import TaskStore
+from .sqlite_store import SQLiteTaskStore, migrate_json
+
+BACKENDS = {
+    "json": (TaskStore, "tasks.json"),
+    "sqlite": (SQLiteTaskStore, "tasks.db"),
+}
+
+try:
+    from .pkms_store import PKMS_BACKENDS
+except ImportError:  # installed on its own, without the pkms package
+    PKMS_BACKENDS = {}
+BACKENDS.update(PKMS_BACKENDS)
+
+
+def open_store(backend: str = None):
+    """Open the task store for ``backend`` (default: $TASKS_BACKEND or json)."""
+    backend = backend or os.environ.get("TASKS_BACKEND", "json")
+    if backend not in BACKENDS:
+        print(f"Error: Unknown backend '{backend}' (choose from {', '.join(BACKENDS)})")
+        sys.exit(1)
+    store_class, data_file = BACKENDS[backend]
+    return store_class(data_file)
 
 
 def print_task(task):
@@ -35,44 +61,164 @@ def cmd_list(store: TaskStore, args: list):
     print()
 
 
-def cmd_complete(store: TaskStore, args: list):
-    """Mark a task as complete."""
+class PartialFailure(Exception):
+    """Some operations of a command failed; the rest were applied."""
+
+    def __init__(self, ops: int):
+        super().__init__(ops)
+        self.ops = ops
+
+
+MAX_RANGE = 100_000  # IDs one ``first-last`` range may expand to
+
+
+def parse_ids(args: list) -> List[int]:
+    """Task IDs from arguments like ``3 5 8``, ``1-100`` or ``2,4``.
+
+    A range may span at most ``MAX_RANGE`` IDs, so a typo such as
+    ``1-1000000000`` is rejected instead of expanding into a huge list.
+    A reversed range such as ``5-3`` is rejected too, rather than
+    matching no tasks.
+    """
+    ids = []
+    for arg in args:
+        for part in arg.split(","):
+            if not part:
+                continue
+            try:
+                if "-" in part[1:]:
+                    first, last = part.split("-", 1)
+                    span = range(int(first), int(last) + 1)
+                else:
+                    span = range(int(part), int(part) + 1)
+            except ValueError:
+                raise ValueError(f"Invalid task ID: {part}") from None
+            if not span:
+                raise ValueError(f"Reversed range: {part} (write it as {span.stop - 1}-{span.start})")
+            if len(span) > MAX_RANGE:
+                raise ValueError(f"Range too large: {part} (at most {MAX_RANGE:,} IDs)")
+            ids.extend(span)
+    return ids
+
+
+def complete_ids(store: TaskStore, ids: List[int]) -> List[int]:
+    """Toggle each task; returns the IDs that were not found."""
+    missing = []
+    for task_id in ids:
+        task = store.toggle_complete(task_id)
+        if task:
+            status = "completed" if task.completed else "uncompleted"
+            print(f"Task {task_id} marked as {status}")
+        else:
+            missing.append(task_id)
+    return missing
+
+
+def delete_ids(store: TaskStore, ids: List[int]) -> List[int]:
+    """Delete each task; returns the IDs that were not found."""
+    missing = []
+    for task_id in ids:
+        if store.delete_task(task_id):
+            print(f"Deleted task {task_id}")
+        else:
+            missing.append(task_id)
+    return missing
+
+
+def _run_ids(store: TaskStore, args: list, action) -> int:
     if not args:
         print("Error: Please provide a task ID")
         sys.exit(1)
     
     try:
-        task_id = int(args[0])
-    except ValueError:
-        print(f"Error: Invalid task ID: {args[0]}")
+        ids = parse_ids(args)
+    except ValueError as e:
+        print(f"Error: {e}")
         sys.exit(1)
     
-    task = store.toggle_complete(task_id)
-    if task:
-        status = "completed" if task.completed else "uncompleted"
-        print(f"Task {task_id} marked as {status}")
-    else:
+    with store.batch():  # one write for any number of IDs
+        missing = action(store, ids)
+    for task_id in missing:
         print(f"Error: Task {task_id} not found")
-        sys.exit(1)
+    if missing:
+        raise PartialFailure(len(ids) - len(missing))
+    return len(ids)
+
+
+def cmd_complete(store: TaskStore, args: list):
+    """Toggle completion of one or more tasks."""
+    return _run_ids(store, args, complete_ids)
 
 
 def cmd_delete(store: TaskStore, args: list):
-    """Delete a task."""
-    if not args:
-        print("Error: Please provide a task ID")
-        sys.exit(1)
-    
+    """Delete one or more tasks."""
+    return _run_ids(store, args, delete_ids)
+
+
+def cmd_batch(store: TaskStore, args: list):
+    """Apply newline-delimited add/complete/delete commands with a single write.
+
+    Commands come from the file named in ``args`` or from stdin. Blank lines
+    and ``#`` comments are skipped; a failing line is reported and the rest
+    still run.
+    """
     try:
-        task_id = int(args[0])
-    except ValueError:
-        print(f"Error: Invalid task ID: {args[0]}")
+        source = open(args[0]) if args and args[0] != "-" else sys.stdin
+    except OSError as e:
+        print(f"Error: Cannot read {args[0]}: {e.strerror}")
         sys.exit(1)
-    
-    if store.delete_task(task_id):
-        print(f"Deleted task {task_id}")
-    else:
-        print(f"Error: Task {task_id} not found")
+    ops = lines = errors = 0
+    try:
+        with store.batch():
+            for number, line in enumerate(source, 1):
+                try:
+                    words = shlex.split(line, comments=True)
+                except ValueError as e:
+                    words, error = None, str(e)
+                else:
+                    error = None
+                if words == []:
+                    continue
+                lines += 1
+                if words:
+                    command, rest = words[0], words[1:]
+                    if command == "add" and rest:
+                        store.add_task(" ".join(rest))
+                        ops += 1
+                    elif command in ("complete", "delete") and rest:
+                        try:
+                            ids = parse_ids(rest)
+                        except ValueError as e:
+                            error = str(e)
+                        else:
+                            action = store.toggle_complete if command == "complete" else store.delete_task
+                            missing = [task_id for task_id in ids if not action(task_id)]
+                            ops += len(ids) - len(missing)
+                            if missing:
+                                error = f"Task(s) not found: {', '.join(map(str, missing))}"
+                    else:
+                        error = f"Invalid command: {line.strip()}"
+                if error:
+                    errors += 1
+                    print(f"Error (line {number}): {error}")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    print(f"Applied {ops} operation(s) from {lines} command(s)")
+    if errors:
+        raise PartialFailure(ops)
+    return ops
+
+
+def cmd_migrate(args: list):
+    """Copy tasks from the JSON file into the SQLite database."""
+    json_file = args[0] if args else BACKENDS["json"][1]
+    db_file = args[1] if len(args) > 1 else BACKENDS["sqlite"][1]
+    if not os.path.exists(json_file):
+        print(f"Error: {json_file} not found")
         sys.exit(1)
+    count = migrate_json(json_file, db_file)
+    print(f"Migrated {count} task(s) from {json_file} to {db_file}")
 
 
 def show_help():
@@ -80,20 +226,32 @@ def show_help():
     print("""
 Tasks Manager - Simple command-line task management
 
-Usage: uv run python -m tasks_manager <command> [arguments]
+Usage: uv run python -m tasks_manager [--backend json|sqlite|pkms-*] [--stats] <command> [arguments]
 
 Commands:
   add <title>       Add a new task
   list              List all tasks
-  complete <id>     Toggle task completion status
-  delete <id>       Delete a task
+  complete <id>...  Toggle task completion status (e.g. 3 5 8 or 1-100)
+  delete <id>...    Delete tasks (e.g. 3 5 8 or 1-100)
+  batch [file]      Apply add/complete/delete lines from a file or stdin
+                    in one process with a single write
+  migrate [json] [db]
+                    Copy tasks.json into tasks.db (SQLite)
   help              Show this help message
 
+The backend can also be chosen with TASKS_BACKEND=sqlite. In a checkout of
+the PKMS repository, pkms-sqlite, pkms-json and pkms-mmap run on the pkms
+storage backends (the same stores main.py and the web app use), and
+pkms-chat, pkms-tasks2 and pkms-tasks3 on the chat assistant's and the
+tasks2/tasks3 managers' task files.
+--stats prints the number of operations and ops/sec when the command ends.
+
 Examples:
   uv run python -m tasks_manager add "Buy groceries"
   uv run python -m tasks_manager list
   uv run python -m tasks_manager complete 1
   uv run python -m tasks_manager delete 1
+  printf 'add Buy milk\ncomplete 1-3\n' | uv run python -m tasks_manager batch
 """)
 
 
@@ -103,20 +261,39 @@ def main():
         show_help()
         sys.exit(1)
     
-    command = sys.argv[1]
-    args = sys.argv[2:]
+    argv = sys.argv[1:]
+    stats = False
+    backend = None
+    # options go before the command word; anything after it belongs to the command
+    while argv and argv[0] in ("--stats", "--backend"):
+        if argv[0] == "--stats":
+            stats, argv = True, argv[1:]
+            continue
+        if len(argv) < 3:
+            show_help()
+            sys.exit(1)
+        backend, argv = argv[1], argv[2:]
+    if not argv:
+        show_help()
+        sys.exit(1)
+    
+    command = argv[0]
+    args = argv[1:]
     
     if command == "help":
         show_help()
         return
     
-    store = TaskStore()
+    if command == "migrate":
+        cmd_migrate(args)
+        return
     
     commands = {
         "add": cmd_add,
         "list": cmd_list,
         "complete": cmd_complete,
         "delete": cmd_delete,
+        "batch": cmd_batch,
     }
     
     if command not in commands:
@@ -124,7 +301,20 @@ def main():
         show_help()
         sys.exit(1)
     
-    commands[command](store, args)
+    started = time.perf_counter()
+    store = open_store(backend)
+    exit_code = 0
+    try:
+        ops = commands[command](store, args)
+    except PartialFailure as e:
+        ops, exit_code = e.ops, 1
+    if stats:
+        elapsed = time.perf_counter() - started
+        ops = 1 if ops is None else ops
+        rate = ops / elapsed if elapsed > 0 else float("inf")
+        print(f"\n{ops} op(s) in {elapsed:.3f}s ({rate:,.0f} ops/sec)")
+    if exit_code:
+        sys.exit(exit_code)
 
 
 if __name__ == "__main__":
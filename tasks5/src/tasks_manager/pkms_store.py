@@ -0,0 +1,178 @@
+"""TaskStore interface over the pkms storage backends."""
+
+import sys
+from contextlib import contextmanager
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+from .task import Task
+
+try:
+    from pkms.models import Task as PkmsTask
+    from pkms.storage import registry
+except ImportError:  # run from a checkout: pkms lives at the repository root
+    sys.path.append(str(Path(__file__).resolve().parents[3]))
+    from pkms.models import Task as PkmsTask
+    from pkms.storage import registry
+
+
+class PkmsTaskStore:
+    """TaskStore with the same interface, backed by a pkms backend.
+
+    ``backend`` is any name in ``pkms.storage.registry.BACKENDS`` (sqlite,
+    json, mmap, or one added with ``register``), so the CLI can run on the
+    same stores as main.py and the web app. Inside ``batch()`` updates and
+    deletes are collected and applied with one ``put_many`` and one
+    ``delete_many`` on exit; adds go through at once, since they need an id.
+    """
+
+    def __init__(self, backend: str, data_file: str):
+        """Initialize task store.
+
+        Args:
+            backend: pkms backend name
+            data_file: Path of the backend's file
+        """
+        self.data_file = Path(data_file)
+        self._store = registry.open_store(backend, self.data_file)
+        self._pending: Optional[Dict[int, Optional[PkmsTask]]] = None  # id -> task, None = deleted
+
+    def close(self):
+        if hasattr(self._store, "close"):
+            self._store.close()
+
+    @contextmanager
+    def batch(self):
+        """Write every update and delete in the block at once, on exit."""
+        if self._pending is not None:
+            yield self
+            return
+        self._pending = {}
+        try:
+            yield self
+            pending = self._pending
+        finally:
+            self._pending = None
+        updated = [t for t in pending.values() if t is not None]
+        if updated:
+            self._store.put_many(updated)
+        deleted = [task_id for task_id, t in pending.items() if t is None]
+        if deleted:
+            self._store.delete_many(deleted)
+
+    @staticmethod
+    def _to_task(t: PkmsTask) -> Task:
+        return Task(id=t.id, title=t.title, completed=t.done, created_at=t.created_at.isoformat())
+
+    def _get(self, task_id: int) -> Optional[PkmsTask]:
+        if self._pending is not None and task_id in self._pending:
+            return self._pending[task_id]
+        return self._store.get(task_id)
+
+    def _put(self, t: PkmsTask):
+        if self._pending is not None:
+            self._pending[t.id] = t
+        else:
+            self._store.put_many([t])
+
+    def add_task(self, title: str) -> Task:
+        """Add a new task.
+
+        Args:
+            title: Task title
+
+        Returns:
+            The created task
+        """
+        t = PkmsTask(None, title, "normal", None, [], None, datetime.now(), False, None)
+        t.id = self._store.add(t)
+        return self._to_task(t)
+
+    def get_all_tasks(self) -> List[Task]:
+        """Get all tasks.
+
+        Returns:
+            List of all tasks
+        """
+        tasks = {t.id: t for t in self._store.query(sort="id")}
+        for task_id, t in (self._pending or {}).items():
+            tasks[task_id] = t
+        return [self._to_task(t) for _, t in sorted(tasks.items()) if t is not None]
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a specific task by ID.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            Task if found, None otherwise
+        """
+        t = self._get(task_id)
+        return self._to_task(t) if t else None
+
+    def update_task(self, task_id: int, **kwargs) -> Optional[Task]:
+        """Update a task.
+
+        Args:
+            task_id: ID of the task to update
+            **kwargs: Fields to update (title, completed, created_at)
+
+        Returns:
+            Updated task if found, None otherwise
+        """
+        t = self._get(task_id)
+        if t is None:
+            return None
+        if "title" in kwargs:
+            t.title = kwargs["title"]
+        if "created_at" in kwargs:
+            t.created_at = datetime.fromisoformat(kwargs["created_at"])
+        if "completed" in kwargs and bool(kwargs["completed"]) != t.done:
+            t.done = bool(kwargs["completed"])
+            t.done_at = datetime.now() if t.done else None
+        self._put(t)
+        return self._to_task(t)
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task.
+
+        Args:
+            task_id: ID of the task to delete
+
+        Returns:
+            True if task was deleted, False otherwise
+        """
+        if self._pending is None:
+            return self._store.delete_many([task_id]) > 0
+        if self._get(task_id) is None:
+            return False
+        self._pending[task_id] = None
+        return True
+
+    def toggle_complete(self, task_id: int) -> Optional[Task]:
+        """Toggle task completion status.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            Updated task if found, None otherwise
+        """
+        t = self._get(task_id)
+        if t is None:
+            return None
+        return self.update_task(task_id, completed=not t.done)
+
+
+# "pkms-sqlite" -> (store factory, default file), one per registered pkms backend.
+# Backends over another front-end's file (pkms-chat, pkms-tasks2, ...) default
+# to where that front-end keeps it, relative to the working directory.
+PKMS_BACKENDS = {
+    f"pkms-{name}": (
+        partial(PkmsTaskStore, name),
+        str(default_path) if not default_path.is_absolute() else f"tasks.pkms{default_path.suffix}",
+    )
+    for name, (_, default_path) in registry.BACKENDS.items()
+}
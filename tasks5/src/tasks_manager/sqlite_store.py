@@ -0,0 +1,191 @@
+"""SQLite task storage."""
+
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional
+from .task import Task
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  title TEXT NOT NULL,
+  completed INTEGER NOT NULL DEFAULT 0,
+  created_at TEXT NOT NULL
+);
+"""
+
+COLUMNS = "id, title, completed, created_at"
+
+
+class SQLiteTaskStore:
+    """TaskStore with the same interface, backed by an SQLite database.
+
+    Every operation is a point query or update by primary key, so its cost
+    grows with log N instead of rewriting the whole file. The database runs
+    in WAL mode so readers don't block the writer. AUTOINCREMENT keeps ids
+    from being reused, like ``next_id`` in the JSON store.
+    """
+
+    def __init__(self, data_file: str = "tasks.db"):
+        """Initialize task store.
+
+        Args:
+            data_file: Path to the SQLite database
+        """
+        self.data_file = Path(data_file)
+        self._con = sqlite3.connect(self.data_file)
+        self._con.execute("PRAGMA journal_mode=WAL")
+        self._con.execute("PRAGMA synchronous=NORMAL")
+        self._con.executescript(SCHEMA)
+        self._in_batch = False
+
+    def close(self):
+        self._con.close()
+
+    @contextmanager
+    def _write(self):
+        """One transaction per operation, or the enclosing batch's transaction."""
+        if self._in_batch:
+            yield self._con
+        else:
+            with self._con:
+                yield self._con
+
+    @contextmanager
+    def batch(self):
+        """Run every operation in the block in one transaction."""
+        if self._in_batch:
+            yield self
+            return
+        self._in_batch = True
+        try:
+            with self._con:
+                yield self
+        finally:
+            self._in_batch = False
+
+    @staticmethod
+    def _row_to_task(row) -> Task:
+        id_, title, completed, created_at = row
+        return Task(id=id_, title=title, completed=bool(completed), created_at=created_at)
+
+    def add_task(self, title: str) -> Task:
+        """Add a new task.
+
+        Args:
+            title: Task title
+
+        Returns:
+            The created task
+        """
+        task = Task(id=0, title=title)
+        with self._write():
+            cur = self._con.execute(
+                "INSERT INTO tasks (title, completed, created_at) VALUES (?, ?, ?)",
+                (task.title, int(task.completed), task.created_at),
+            )
+        task.id = int(cur.lastrowid)
+        return task
+
+    def get_all_tasks(self) -> List[Task]:
+        """Get all tasks.
+
+        Returns:
+            List of all tasks
+        """
+        cur = self._con.execute(f"SELECT {COLUMNS} FROM tasks ORDER BY id")
+        return [self._row_to_task(row) for row in cur]
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Get a specific task by ID.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            Task if found, None otherwise
+        """
+        row = self._con.execute(f"SELECT {COLUMNS} FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return self._row_to_task(row) if row else None
+
+    def update_task(self, task_id: int, **kwargs) -> Optional[Task]:
+        """Update a task.
+
+        Args:
+            task_id: ID of the task to update
+            **kwargs: Fields to update (title, completed, created_at)
+
+        Returns:
+            Updated task if found, None otherwise
+        """
+        fields = {k: v for k, v in kwargs.items() if k in ("title", "completed", "created_at")}
+        if "completed" in fields:
+            fields["completed"] = int(fields["completed"])
+        with self._write():
+            if fields:
+                assignments = ", ".join(f"{name} = ?" for name in fields)
+                self._con.execute(
+                    f"UPDATE tasks SET {assignments} WHERE id = ?", (*fields.values(), task_id)
+                )
+            return self.get_task(task_id)
+
+    def delete_task(self, task_id: int) -> bool:
+        """Delete a task.
+
+        Args:
+            task_id: ID of the task to delete
+
+        Returns:
+            True if task was deleted, False otherwise
+        """
+        with self._write():
+            cur = self._con.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+        return cur.rowcount > 0
+
+    def toggle_complete(self, task_id: int) -> Optional[Task]:
+        """Toggle task completion status.
+
+        Args:
+            task_id: ID of the task
+
+        Returns:
+            Updated task if found, None otherwise
+        """
+        with self._write():
+            cur = self._con.execute(
+                "UPDATE tasks SET completed = 1 - completed WHERE id = ?", (task_id,)
+            )
+        return self.get_task(task_id) if cur.rowcount else None
+
+
+def migrate_json(json_file: str, db_file: str) -> int:
+    """Copy every task from a JSON TaskStore file into an SQLite database.
+
+    Ids are kept, and the id sequence resumes at the JSON file's
+    ``next_id``. Tasks whose id already exists in the database are
+    replaced. Returns the number of tasks copied.
+    """
+    data = json.loads(Path(json_file).read_text())
+    tasks = [Task.from_dict(t) for t in data.get("tasks", [])]
+    store = SQLiteTaskStore(db_file)
+    try:
+        with store._con as con:
+            con.executemany(
+                "INSERT OR REPLACE INTO tasks (id, title, completed, created_at) VALUES (?, ?, ?, ?)",
+                [(t.id, t.title, int(t.completed), t.created_at) for t in tasks],
+            )
+            next_id = data.get("next_id", max((t.id for t in tasks), default=0) + 1)
+            # make sure AUTOINCREMENT continues past every id the JSON store handed out
+            con.execute(
+                "UPDATE sqlite_sequence SET seq = MAX(seq, ?) WHERE name = 'tasks'", (next_id - 1,)
+            )
+            con.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT 'tasks', ?"
+                " WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = 'tasks')",
+                (next_id - 1,),
+            )
+    finally:
+        store.close()
+    return len(tasks)
@@ -1,125 +1,184 @@
 """Task storage manager."""
 
 import json
+import os
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from .task import Task
 
 
 class TaskStore:
-    """Manages task persistence using JSON storage."""
-    
+    """Manages task persistence using JSON storage.
+
+    The file is parsed once and kept in memory as an id-indexed dict. Each
+    operation first checks the file's mtime/size and re-reads it only if
+    another process changed it. Mutations change the in-memory state and
+    write the file once, atomically (temp file + rename).
+    """
+
     def __init__(self, data_file: str = "tasks.json"):
         """Initialize task store.
-        
+
         Args:
             data_file: Path to JSON file for storing tasks
         """
         self.data_file = Path(data_file)
+        self._tasks: Dict[int, dict] = {}
+        self._next_id = 1
+        self._stat: Optional[Tuple[int, int]] = None
+        self._batch_depth = 0
+        self._dirty = False
         self._ensure_file_exists()
-    
+
     def _ensure_file_exists(self):
         """Create data file if it doesn't exist."""
         if not self.data_file.exists():
-            self.data_file.write_text(json.dumps({"tasks": [], "next_id": 1}))
-    
+            self._write_data({"tasks": [], "next_id": 1})
+
+    def _file_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.data_file.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
     def _read_data(self) -> dict:
         """Read data from JSON file."""
         try:
             return json.loads(self.data_file.read_text())
         except (json.JSONDecodeError, FileNotFoundError):
             return {"tasks": [], "next_id": 1}
-    
+
     def _write_data(self, data: dict):
-        """Write data to JSON file."""
-        self.data_file.write_text(json.dumps(data, indent=2))
-    
+        """Write data to JSON file atomically."""
+        tmp = self.data_file.with_name(self.data_file.name + ".tmp")
+        # compact output: json's C encoder is only used without indent
+        tmp.write_text(json.dumps(data))
+        os.replace(tmp, self.data_file)
+        self._stat = self._file_stat()
+
+    def _load(self) -> Dict[int, dict]:
+        """Return the id-indexed tasks, re-reading the file only if it changed."""
+        if self._batch_depth and self._stat is not None:
+            return self._tasks  # pending batch changes win over the file
+        stat = self._file_stat()
+        if stat is None or stat != self._stat:
+            data = self._read_data()
+            self._tasks = {t["id"]: t for t in data["tasks"]}
+            self._next_id = data.get("next_id", max(self._tasks, default=0) + 1)
+            self._stat = stat
+        return self._tasks
+
+    def _save(self):
+        if self._batch_depth:
+            self._dirty = True
+            return
+        try:
+            self._write_data({"tasks": list(self._tasks.values()), "next_id": self._next_id})
+        except BaseException:
+            self._stat = None  # memory may now differ from disk; re-read next time
+            raise
+
+    @contextmanager
+    def batch(self):
+        """Apply every operation in the block with a single write at the end.
+
+        If the block raises, nothing is written and the in-memory state is
+        re-read from the file on the next call.
+        """
+        self._load()
+        self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            if self._batch_depth == 1:
+                self._stat = None
+                self._dirty = False
+            raise
+        finally:
+            self._batch_depth -= 1
+        if not self._batch_depth and self._dirty:
+            self._dirty = False
+            self._save()
+
     def add_task(self, title: str) -> Task:
         """Add a new task.
-        
+
         Args:
             title: Task title
-            
+
         Returns:
             The created task
         """
-        data = self._read_data()
-        task = Task(id=data["next_id"], title=title)
-        data["tasks"].append(task.to_dict())
-        data["next_id"] += 1
-        self._write_data(data)
+        tasks = self._load()
+        task = Task(id=self._next_id, title=title)
+        tasks[task.id] = task.to_dict()
+        self._next_id += 1
+        self._save()
         return task
-    
+
     def get_all_tasks(self) -> List[Task]:
         """Get all tasks.
-        
+
         Returns:
             List of all tasks
         """
-        data = self._read_data()
-        return [Task.from_dict(task_data) for task_data in data["tasks"]]
-    
+        return [Task.from_dict(task_data) for task_data in self._load().values()]
+
     def get_task(self, task_id: int) -> Optional[Task]:
         """Get a specific task by ID.
-        
+
         Args:
             task_id: ID of the task
-            
+
         Returns:
             Task if found, None otherwise
         """
-        tasks = self.get_all_tasks()
-        for task in tasks:
-            if task.id == task_id:
-                return task
-        return None
-    
+        task_data = self._load().get(task_id)
+        return Task.from_dict(task_data) if task_data else None
+
     def update_task(self, task_id: int, **kwargs) -> Optional[Task]:
         """Update a task.
-        
+
         Args:
             task_id: ID of the task to update
             **kwargs: Fields to update
-            
+
         Returns:
             Updated task if found, None otherwise
         """
-        data = self._read_data()
-        for task_data in data["tasks"]:
-            if task_data["id"] == task_id:
-                task_data.update(kwargs)
-                self._write_data(data)
-                return Task.from_dict(task_data)
-        return None
-    
+        task_data = self._load().get(task_id)
+        if task_data is None:
+            return None
+        task_data.update(kwargs)
+        self._save()
+        return Task.from_dict(task_data)
+
     def delete_task(self, task_id: int) -> bool:
         """Delete a task.
-        
+
         Args:
             task_id: ID of the task to delete
-            
+
         Returns:
             True if task was deleted, False otherwise
         """
-        data = self._read_data()
-        original_count = len(data["tasks"])
-        data["tasks"] = [t for t in data["tasks"] if t["id"] != task_id]
-        
-        if len(data["tasks"]) < original_count:
-            self._write_data(data)
-            return True
-        return False
-    
+        if self._load().pop(task_id, None) is None:
+            return False
+        self._save()
+        return True
+
     def toggle_complete(self, task_id: int) -> Optional[Task]:
         """Toggle task completion status.
-        
+
         Args:
             task_id: ID of the task
-            
+
         Returns:
             Updated task if found, None otherwise
         """
-        task = self.get_task(task_id)
-        if task:
-            return self.update_task(task_id, completed=not task.completed)
-        return None
+        task_data = self._load().get(task_id)
+        if task_data is None:
+            return None
+        return self.update_task(task_id, completed=not task_data.get("completed", False))
@@ -0,0 +1,136 @@
+import io
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from tasks_manager import TaskStore
+from tasks_manager import __main__ as cli
+
+
+def run_cli(monkeypatch, *argv, stdin=None):
+    monkeypatch.setattr(sys, "argv", ["tasks", *argv])
+    if stdin is not None:
+        monkeypatch.setattr(sys, "stdin", io.StringIO(stdin))
+    cli.main()
+
+
+def titles(path="tasks.json"):
+    return [t["title"] for t in json.loads(Path(path).read_text())["tasks"]]
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("TASKS_BACKEND", raising=False)
+    return tmp_path
+
+
+def test_parse_ids_forms():
+    assert cli.parse_ids(["3", "5,8", "10-12", "2,,4"]) == [3, 5, 8, 10, 11, 12, 2, 4]
+    assert cli.parse_ids(["7-7"]) == [7]
+    assert len(cli.parse_ids([f"1-{cli.MAX_RANGE}"])) == cli.MAX_RANGE
+    with pytest.raises(ValueError, match="Invalid task ID: x"):
+        cli.parse_ids(["1", "x"])
+    with pytest.raises(ValueError, match="Invalid task ID: 1-"):
+        cli.parse_ids(["1-"])
+    with pytest.raises(ValueError, match="Range too large: 1-1000000000"):
+        cli.parse_ids(["1-1000000000"])
+    with pytest.raises(ValueError, match=r"Reversed range: 5-3 \(write it as 3-5\)"):
+        cli.parse_ids(["1", "5-3"])
+
+
+def test_stats_is_only_an_option_before_the_command(workdir, monkeypatch, capsys):
+    run_cli(monkeypatch, "add", "fix", "--stats", "output")
+    assert titles() == ["fix --stats output"]
+    assert "ops/sec" not in capsys.readouterr().out
+
+    run_cli(monkeypatch, "--stats", "--backend", "json", "add", "second")
+    assert "1 op(s) in" in capsys.readouterr().out
+    run_cli(monkeypatch, "--backend", "json", "--stats", "list")
+    assert "op(s) in" in capsys.readouterr().out
+
+
+def test_multi_id_commands_and_partial_failure(workdir, monkeypatch, capsys):
+    store = TaskStore("tasks.json")
+    for i in range(5):
+        store.add_task(f"task {i}")
+    run_cli(monkeypatch, "complete", "1-3", "5")
+    assert [t.completed for t in store.get_all_tasks()] == [True, True, True, False, True]
+
+    with pytest.raises(SystemExit) as exit_info:
+        run_cli(monkeypatch, "--stats", "delete", "2,4", "9")
+    out = capsys.readouterr().out
+    assert exit_info.value.code == 1
+    assert "Error: Task 9 not found" in out and "2 op(s) in" in out
+    assert [t.id for t in store.get_all_tasks()] == [1, 3, 5]
+
+
+def test_batch_from_file_and_stdin(workdir, monkeypatch, capsys):
+    (workdir / "commands.txt").write_text(
+        "# set up\n"
+        "add Buy milk\n"
+        'add "Call mom"  # trailing comment\n'
+        "\n"
+        "add third\n"
+        "complete 1-2\n"
+        "delete 3\n"
+    )
+    run_cli(monkeypatch, "batch", "commands.txt")
+    assert "Applied 6 operation(s) from 5 command(s)" in capsys.readouterr().out
+    tasks = TaskStore("tasks.json").get_all_tasks()
+    assert [(t.title, t.completed) for t in tasks] == [("Buy milk", True), ("Call mom", True)]
+
+    with pytest.raises(SystemExit):
+        run_cli(monkeypatch, "batch", stdin="add from stdin\ncomplete 1,99\nfrobnicate 2\nadd 'unclosed\n")
+    out = capsys.readouterr().out
+    assert "Error (line 2): Task(s) not found: 99" in out
+    assert "Error (line 3): Invalid command: frobnicate 2" in out
+    assert "Error (line 4)" in out
+    assert "Applied 2 operation(s) from 4 command(s)" in out
+    assert titles() == ["Buy milk", "Call mom", "from stdin"]
+
+    with pytest.raises(SystemExit) as exit_info:
+        run_cli(monkeypatch, "batch", "missing.txt")
+    assert exit_info.value.code == 1
+    assert "Error: Cannot read missing.txt: No such file or directory" in capsys.readouterr().out
+
+
+def test_batch_writes_once(workdir, monkeypatch):
+    store = TaskStore("tasks.json")
+    writes = []
+    real_write = store._write_data
+    monkeypatch.setattr(store, "_write_data", lambda data: (writes.append(data), real_write(data)))
+    with store.batch():
+        for i in range(50):
+            store.add_task(f"task {i}")
+        with store.batch():  # nested batches join the outer one
+            store.toggle_complete(1)
+        store.delete_task(2)
+        assert titles() == []  # nothing on disk until the block ends
+    assert len(writes) == 1
+    assert len(titles()) == 49
+
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.add_task("discarded")
+            raise RuntimeError
+    assert len(writes) == 1
+    assert len(store.get_all_tasks()) == 49
+
+
+@pytest.mark.parametrize("backend", ["pkms-json", "pkms-sqlite", "pkms-mmap"])
+def test_pkms_backends(workdir, monkeypatch, capsys, backend):
+    from pkms.storage import registry
+
+    run_cli(monkeypatch, "--backend", backend, "batch",
+            stdin="add Buy milk\nadd Call mom\nadd Walk dog\ncomplete 1 3\ncomplete 3\ndelete 2\n")
+    assert "Applied 7 operation(s)" in capsys.readouterr().out
+
+    store = cli.open_store(backend)
+    assert [(t.id, t.title, t.completed) for t in store.get_all_tasks()] == [(1, "Buy milk", True), (3, "Walk dog", False)]
+    store.close()
+    name = backend.removeprefix("pkms-")
+    pkms = registry.open_store(name, workdir / f"tasks.pkms{registry.BACKENDS[name][1].suffix}")
+    assert [(t.id, t.done) for t in pkms.query(sort="id")] == [(1, True), (3, False)]
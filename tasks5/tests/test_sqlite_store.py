@@ -0,0 +1,115 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from tasks_manager import SQLiteTaskStore, TaskStore
+from tasks_manager import __main__ as cli
+from tasks_manager.sqlite_store import migrate_json
+
+
+def run_cli(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["tasks", *argv])
+    cli.main()
+
+
+def test_crud_and_ids_are_not_reused(tmp_path: Path):
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    first = store.add_task("Write tests")
+    second = store.add_task("Ship it")
+    assert [t.title for t in store.get_all_tasks()] == ["Write tests", "Ship it"]
+
+    assert store.toggle_complete(first.id).completed is True
+    assert store.toggle_complete(first.id).completed is False
+    assert store.update_task(first.id, title="Write more tests", bogus=1).title == "Write more tests"
+    assert store.toggle_complete(99) is None
+    assert store.update_task(99, title="x") is None
+
+    assert store.delete_task(second.id) is True
+    assert store.delete_task(second.id) is False
+    assert store.add_task("Next").id == second.id + 1
+    store.close()
+
+    reopened = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    assert [t.id for t in reopened.get_all_tasks()] == [first.id, second.id + 1]
+
+
+def test_batch_is_one_transaction(tmp_path: Path):
+    store = SQLiteTaskStore(str(tmp_path / "tasks.db"))
+    with store.batch():
+        for i in range(3):
+            store.add_task(f"task {i}")
+    assert len(store.get_all_tasks()) == 3
+
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.add_task("rolled back")
+            store.delete_task(1)
+            raise RuntimeError
+    assert [t.title for t in store.get_all_tasks()] == ["task 0", "task 1", "task 2"]
+
+
+def test_backend_flag_and_environment(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("TASKS_BACKEND", raising=False)
+    assert isinstance(cli.open_store(), TaskStore)
+
+    run_cli(monkeypatch, "--backend", "sqlite", "add", "Via flag")
+    assert (tmp_path / "tasks.db").exists()
+    assert TaskStore("tasks.json").get_all_tasks() == []
+
+    monkeypatch.setenv("TASKS_BACKEND", "sqlite")
+    store = cli.open_store()
+    assert isinstance(store, SQLiteTaskStore)
+    assert [t.title for t in store.get_all_tasks()] == ["Via flag"]
+    store.close()
+
+    run_cli(monkeypatch, "--backend", "json", "add", "Flag beats env")
+    assert json.loads((tmp_path / "tasks.json").read_text())["tasks"][0]["title"] == "Flag beats env"
+
+    capsys.readouterr()
+    with pytest.raises(SystemExit):
+        run_cli(monkeypatch, "--backend", "csv", "list")
+    assert "Unknown backend 'csv'" in capsys.readouterr().out
+
+
+def test_migrate_keeps_ids_and_resumes_after_next_id(tmp_path: Path):
+    json_store = TaskStore(str(tmp_path / "tasks.json"))
+    for title in ("one", "two", "three", "four"):
+        json_store.add_task(title)
+    json_store.toggle_complete(2)
+    json_store.delete_task(4)  # next_id stays 5
+    json_store.delete_task(1)
+
+    db = str(tmp_path / "tasks.db")
+    assert migrate_json(str(tmp_path / "tasks.json"), db) == 2
+    store = SQLiteTaskStore(db)
+    assert [(t.id, t.title, t.completed) for t in store.get_all_tasks()] == [
+        (2, "two", True), (3, "three", False),
+    ]
+    assert store.get_task(2).created_at == json_store.get_task(2).created_at
+    assert store.add_task("five").id == 5
+    store.close()
+
+
+def test_migrate_again_replaces_instead_of_duplicating(tmp_path: Path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    json_store = TaskStore("tasks.json")
+    json_store.add_task("one")
+    json_store.add_task("two")
+    run_cli(monkeypatch, "migrate")
+    assert "Migrated 2 task(s) from tasks.json to tasks.db" in capsys.readouterr().out
+
+    store = SQLiteTaskStore("tasks.db")
+    store.add_task("added in sqlite")  # id 3
+    json_store.update_task(1, title="one, renamed")
+    assert migrate_json("tasks.json", "tasks.db") == 2
+    assert [(t.id, t.title) for t in store.get_all_tasks()] == [
+        (1, "one, renamed"), (2, "two"), (3, "added in sqlite"),
+    ]
+    assert store.add_task("after").id == 4  # the sequence never moves backwards
+    store.close()
+
+    with pytest.raises(SystemExit):
+        run_cli(monkeypatch, "migrate", "missing.json")
@@ -0,0 +1,80 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from tasks_manager import TaskStore
+from tasks_manager import store as store_module
+
+
+def test_reads_are_served_from_memory(tmp_path: Path, monkeypatch):
+    store = TaskStore(str(tmp_path / "tasks.json"))
+    store.add_task("Buy milk")
+    reads = []
+    real_read = store._read_data
+    monkeypatch.setattr(store, "_read_data", lambda: reads.append(1) or real_read())
+
+    for _ in range(3):
+        assert [t.title for t in store.get_all_tasks()] == ["Buy milk"]
+    store.toggle_complete(1)
+    assert reads == []  # our own write updated the cached stat
+
+
+def test_reload_after_external_write(tmp_path: Path):
+    path = tmp_path / "tasks.json"
+    mine, other = TaskStore(str(path)), TaskStore(str(path))
+    mine.add_task("Buy milk")
+
+    assert other.add_task("Call mom").id == 2  # sees mine's task and next_id
+    assert [t.title for t in mine.get_all_tasks()] == ["Buy milk", "Call mom"]
+
+    data = json.loads(path.read_text())
+    data["tasks"][0]["title"] = "Buy MILK"  # same size: only the mtime shows the change
+    path.write_text(json.dumps(data))
+    os.utime(path, ns=(0, 0))
+    assert mine.get_task(1).title == "Buy MILK"
+
+
+@pytest.mark.parametrize("fail_at", ["write", "replace"])
+def test_interrupted_write_keeps_the_file_and_rereads_it(tmp_path: Path, monkeypatch, fail_at):
+    path = tmp_path / "tasks.json"
+    store = TaskStore(str(path))
+    store.add_task("Buy milk")
+    before = path.read_text()
+
+    def fail(*args, **kwargs):
+        raise OSError("disk full")
+
+    if fail_at == "write":
+        real_write_text = Path.write_text
+
+        def partial_write(self, text):
+            real_write_text(self, text[: len(text) // 2])  # half reaches the temp file
+            fail()
+
+        monkeypatch.setattr(Path, "write_text", partial_write)
+    else:
+        monkeypatch.setattr(store_module.os, "replace", fail)
+    with pytest.raises(OSError, match="disk full"):
+        store.add_task("Call mom")
+    monkeypatch.undo()
+
+    assert path.read_text() == before
+    assert [t.title for t in store.get_all_tasks()] == ["Buy milk"]  # memory re-read from disk
+    assert store.add_task("Call mom").id == 2
+
+
+def test_failed_batch_writes_nothing(tmp_path: Path):
+    path = tmp_path / "tasks.json"
+    store = TaskStore(str(path))
+    store.add_task("Buy milk")
+    before = path.read_text()
+
+    with pytest.raises(RuntimeError):
+        with store.batch():
+            store.add_task("Call mom")
+            store.delete_task(1)
+            raise RuntimeError
+    assert path.read_text() == before
+    assert [t.title for t in store.get_all_tasks()] == ["Buy milk"]
@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# tasks2 is run from its own directory as ``python main.py``; its modules import
+# as ``src.*``. Appended, so root modules such as main.py keep precedence.
+TASKS2 = str(Path(__file__).resolve().parents[1] / "tasks2")
+if TASKS2 not in sys.path:
+    sys.path.append(TASKS2)
@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+import knowledge
+import tasks
+from ai_agent import AIAgent, RecentItems
+from session import DataSession
+
+
+def test_recent_items_matches_sorted():
+    rng = random.Random(3)
+    items = [{"id": i, "k": rng.randint(0, 20)} for i in range(200)]
+    recent = RecentItems(lambda x: x["k"], n=3)
+    for item in items:
+        recent.add(item)
+    assert recent.items() == sorted(items, key=lambda x: x["k"], reverse=True)[:3]
+
+
+def test_brief_is_materialized_and_updated_on_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, "DATA_FILE", str(tmp_path / "tasks.json"))
+    monkeypatch.setattr(knowledge, "DATA_FILE", str(tmp_path / "knowledge.json"))
+    session = DataSession()
+    agent = AIAgent(session)
+    for description in ("plan sprint", "review git history", "write docs"):
+        session.add_task(description)
+
+    brief = agent.get_daily_brief()
+    assert "Focus on your newest task: write docs" in brief
+    assert agent.get_daily_brief() is brief
+
+    session.add_entry("Docs Style", "how to write docs", ["docs"])
+    brief = agent.get_daily_brief()
+    assert "- Docs Style: how to write docs..." in brief
+    assert "Knowledge Base: 1 entries" in brief
+
+    timed = agent.get_daily_brief(timings=True)
+    assert timed.startswith(brief) and "(cached brief)" in timed
+
+
+def test_sessionless_brief_is_reused_until_a_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, "DATA_FILE", str(tmp_path / "tasks.json"))
+    monkeypatch.setattr(knowledge, "DATA_FILE", str(tmp_path / "knowledge.json"))
+    for description in ("plan sprint", "write docs"):
+        tasks.add_task(description, quiet=True)
+    agent = AIAgent()
+
+    brief = agent.get_daily_brief()
+    assert agent.get_daily_brief() is brief
+
+    agent.add_entry("Docs Style", "how to write docs", ["docs"])
+    brief = agent.get_daily_brief()
+    assert "Knowledge Base: 1 entries" in brief
+    assert agent.get_daily_brief() is brief
+
+    tasks.add_task("ship release", quiet=True)  # written by someone else
+    assert "Tasks: 3 total" in agent.get_daily_brief()
@@ -0,0 +1,71 @@
+import io
+import json
+
+import pytest
+
+import knowledge
+import tasks
+
+
+@pytest.fixture(autouse=True)
+def data_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, "DATA_FILE", str(tmp_path / "tasks.json"))
+    monkeypatch.setattr(knowledge, "DATA_FILE", str(tmp_path / "knowledge.json"))
+    return tmp_path
+
+
+def test_batch_writes_once_and_discards_on_error(monkeypatch):
+    writes = []
+    real_write = knowledge._write_knowledge
+    monkeypatch.setattr(knowledge, "_write_knowledge", lambda e: writes.append(len(e)) or real_write(e))
+
+    with knowledge.batch():
+        for i in range(50):
+            knowledge.add_entry(f"t{i}", "body", quiet=True)
+        with knowledge.batch():  # nested batches join the outer one
+            knowledge.add_entry("inner", "body", quiet=True)
+    assert writes == [51]
+
+    with pytest.raises(RuntimeError):
+        with knowledge.batch():
+            knowledge.add_entry("lost", "body", quiet=True)
+            raise RuntimeError
+    assert len(knowledge.load_knowledge()) == 51
+
+
+def test_ids_are_not_reused_after_delete(data_files):
+    for description in ("a", "b", "c"):
+        tasks.add_task(description, quiet=True)
+    loaded = tasks.load_tasks()
+    loaded[:] = [t for t in loaded if t["id"] != 3]
+    tasks.save_tasks(loaded)
+
+    assert tasks.add_task("d", quiet=True)["id"] == 4
+    assert json.loads((data_files / "tasks.json").read_text())["next_id"] == 5
+
+
+def test_legacy_list_file_and_import(data_files):
+    (data_files / "knowledge.json").write_text(json.dumps([{"id": 7, "title": "old", "content": "", "tags": []}]))
+    lines = io.StringIO('{"title": "a", "content": "x", "tags": "git, tips"}\n\n{"title": "b"}\n')
+
+    assert knowledge.import_entries(lines) == 2
+    entries = knowledge.load_knowledge()
+    assert [e["id"] for e in entries] == [7, 8, 9]
+    assert entries[1]["tags"] == ["git", "tips"]
+
+
+def test_ids_come_from_the_list_they_are_added_to(data_files, monkeypatch):
+    (data_files / "a.json").write_text(json.dumps({"next_id": 10, "tasks": [{"id": 9, "description": "a"}]}))
+    (data_files / "b.json").write_text(json.dumps({"next_id": 2, "tasks": [{"id": 1, "description": "b"}]}))
+    monkeypatch.setattr(tasks, "DATA_FILE", str(data_files / "a.json"))
+    first = tasks.load_tasks()
+    monkeypatch.setattr(tasks, "DATA_FILE", str(data_files / "b.json"))
+    tasks.load_tasks()  # a later load of another file must not move first's allocator
+
+    monkeypatch.setattr(tasks, "DATA_FILE", str(data_files / "a.json"))
+    assert tasks.add_task("c", tasks=first, quiet=True)["id"] == 10
+    assert json.loads((data_files / "a.json").read_text())["next_id"] == 11
+
+    entries = knowledge.EntryList([{"id": 4, "title": "x", "content": "", "tags": []}], next_id=7)
+    assert knowledge.add_entry("y", "", entries=entries, quiet=True)["id"] == 7
+    assert knowledge.load_knowledge().next_id == 8
@@ -0,0 +1,44 @@
+import pytest
+
+import knowledge
+import tasks
+from chat import ChatInterface
+
+
+@pytest.fixture
+def chat(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # ChatLogger writes to ./conversations
+    monkeypatch.setattr(tasks, "DATA_FILE", str(tmp_path / "tasks.json"))
+    monkeypatch.setattr(knowledge, "DATA_FILE", str(tmp_path / "knowledge.json"))
+    return ChatInterface()
+
+
+def test_ask_output_streams_and_is_logged_even_on_failure(chat, monkeypatch, capsys):
+    seen_mid_command = []
+
+    def answer(question):
+        print("working on it...")
+        seen_mid_command.append(capsys.readouterr().out)
+        raise RuntimeError("planner crashed")
+
+    monkeypatch.setattr(chat.planner, "answer", answer)
+    with pytest.raises(RuntimeError):
+        chat.onecmd("ask what is due")
+
+    assert seen_mid_command == ["working on it...\n"]  # written through before the command ended
+    logged = [(m["role"], m["message"]) for m in chat.logger.iter_messages(newest_first=False)]
+    assert logged == [("user", "ask what is due"), ("assistant", "working on it...")]
+
+
+def test_only_ask_exchanges_reach_history(chat, capsys):
+    chat.onecmd('task add "Write docs"')
+    chat.onecmd("task list")
+    capsys.readouterr()
+    chat.onecmd("ask for suggestions")
+    answer = capsys.readouterr().out.strip().splitlines()[0]
+
+    chat.onecmd("history")
+    out = capsys.readouterr().out
+    assert "user: ask for suggestions" in out
+    assert f"assistant: {answer[:100]}" in out
+    assert "task list" not in out and "Write docs" not in out
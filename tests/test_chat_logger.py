@@ -0,0 +1,159 @@
+import json
+from pathlib import Path
+
+from chat_logger import OFFSET, ChatLogger
+
+
+def test_messages_are_appended_once(tmp_path: Path):
+    logger = ChatLogger(log_dir=str(tmp_path), flush_every=2)
+    for i in range(5):
+        logger.log_message("user", f"message {i}")
+
+    messages = logger.load_conversations()
+    assert [m["message"] for m in messages] == [f"message {i}" for i in range(5)]
+    assert len(logger._read_offsets(logger.current_date)) == 5
+
+
+
+def test_offsets_round_trip_and_torn_line_rebuilds(tmp_path: Path):
+    logger = ChatLogger(log_dir=str(tmp_path), flush_every=3)
+    for i in range(7):
+        logger.log_message("user", f"héllo {i}\nsecond line")
+    logger.flush()
+
+    day_file = logger._day_file(logger.current_date)
+    raw = day_file.read_bytes()
+    offsets = logger._read_offsets(logger.current_date)
+    lines = [json.loads(raw[start:end]) for start, end in zip(offsets, offsets[1:] + [len(raw)])]
+    assert [m["message"] for m in lines] == [f"héllo {i}\nsecond line" for i in range(7)]
+
+    with open(day_file, "ab") as f:
+        f.write(b'{"timestamp": "torn')
+    assert len(logger._read_offsets(logger.current_date)) == 8
+    assert len(logger.load_conversations()) == 7
+
+
+def test_concurrent_flushes_keep_offsets_in_step(tmp_path: Path):
+    import threading
+
+    logger = ChatLogger(log_dir=str(tmp_path), flush_every=1)
+    threads = [
+        threading.Thread(target=lambda n=n: [logger.log_message("user", f"{n}-{i}") for i in range(50)])
+        for n in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    raw = logger._day_file(logger.current_date).read_bytes()
+    offsets = logger._read_offsets(logger.current_date)
+    assert len(offsets) == 200
+    assert all(o == 0 or raw[o - 1:o] == b"\n" for o in offsets)
+    # the sidecar was written by the flushes, not rebuilt
+    assert logger._index_file(logger.current_date).read_bytes() == b"".join(OFFSET.pack(o) for o in offsets)
+
+
+def test_idle_session_flushes_after_interval(tmp_path: Path):
+    import time
+
+    logger = ChatLogger(log_dir=str(tmp_path), flush_every=100, flush_interval=0.05)
+    logger.log_message("user", "anyone there?")
+    deadline = time.monotonic() + 2
+    while not logger._day_file(logger.current_date).exists() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert logger._day_file(logger.current_date).exists()
+    assert logger._pending == []
+
+
+def test_logger_is_not_kept_alive_by_exit_hook(tmp_path: Path):
+    import gc
+    import weakref
+
+    logger = ChatLogger(log_dir=str(tmp_path))
+    ref = weakref.ref(logger)
+    del logger
+    gc.collect()
+    assert ref() is None
+
+def test_search_filters_and_legacy_files(tmp_path: Path):
+    (tmp_path / "conversation_2024-01-01.json").write_text(json.dumps([
+        {"timestamp": "2024-01-01T09:00:00", "role": "user", "message": "old python notes"},
+    ]))
+    logger = ChatLogger(log_dir=str(tmp_path))
+    logger.log_message("user", "How do I write Python decorators?")
+    logger.log_message("assistant", "Decorators wrap a python function")
+
+    assert len(logger.search_conversations("pyth")) == 3
+    assert [m["role"] for m in logger.search_conversations("python", role="assistant")] == ["assistant"]
+    assert len(logger.search_conversations('"python decorators"')) == 1
+    assert logger.search_conversations("python", until="2024-12-31")[0]["message"] == "old python notes"
+    assert list(logger.get_recent_conversations()) == [logger.current_date, "2024-01-01"]
+
+
+def test_iter_messages_streams_newest_first(tmp_path: Path, monkeypatch):
+    import chat_logger
+    monkeypatch.setattr(chat_logger, "REVERSE_BATCH", 3)
+    (tmp_path / "conversation_2024-01-01.json").write_text(json.dumps([
+        {"timestamp": "2024-01-01T09:00:00", "role": "user", "message": "oldest"},
+    ]))
+    logger = ChatLogger(log_dir=str(tmp_path))
+    for i in range(7):
+        logger.log_message("user", f"m{i}")
+
+    stream = logger.iter_messages()
+    assert [next(stream)["message"] for _ in range(2)] == ["m6", "m5"]
+    assert [m["message"] for m in logger.iter_messages()][-2:] == ["m0", "oldest"]
+    assert [m["message"] for m in logger.iter_messages(newest_first=False)][0] == "oldest"
+    assert [m["message"] for m in logger.iter_messages(since=logger.current_date)][-1] == "m0"
+
+    days = logger.load_days(["2024-01-01", logger.current_date])
+    assert list(days) == ["2024-01-01", logger.current_date]
+    assert len(days[logger.current_date]) == 7
+
+
+def test_archive_is_transparent_and_retention_drops_old_months(tmp_path: Path):
+    from datetime import date
+    for day in ("2024-01-05", "2024-03-02"):
+        (tmp_path / f"conversation_{day}.json").write_text(json.dumps([
+            {"timestamp": f"{day}T09:00:00", "role": "user", "message": f"notes from {day}"},
+        ]))
+    logger = ChatLogger(log_dir=str(tmp_path))
+    logger.log_message("user", "fresh python message")
+
+    stats = logger.archive(older_than_days=30, today=date(2024, 6, 1))
+    assert stats == {"archived": 2, "deleted": 0}
+    assert not list(tmp_path.glob("conversation_2024-0*.json"))
+    assert logger.load_conversations("2024-03-02")[0]["message"] == "notes from 2024-03-02"
+    assert [m["message"] for m in logger.iter_messages()][-1] == "notes from 2024-01-05"
+    assert len(logger.search_conversations("notes")) == 2
+
+    stats = logger.archive(older_than_days=30, retention_days=100, today=date(2024, 6, 1))
+    assert stats == {"archived": 0, "deleted": 1}
+    assert [m["message"] for m in logger.search_conversations("notes")] == ["notes from 2024-03-02"]
+    assert "2024-01-05" not in logger.get_recent_conversations(days=10)
+
+
+def test_archived_days_are_searchable_from_a_fresh_index(tmp_path: Path):
+    from datetime import date
+    (tmp_path / "conversation_2024-01-05.json").write_text(json.dumps([
+        {"timestamp": "2024-01-05T09:00:00", "role": "user", "message": "notes about rust"},
+    ]))
+    logger = ChatLogger(log_dir=str(tmp_path))
+    logger.archive(older_than_days=30, today=date(2024, 6, 1))
+    logger.index.close()
+    (tmp_path / "index.sqlite3").unlink()  # e.g. archived by a build without FTS5
+
+    logger = ChatLogger(log_dir=str(tmp_path))
+    assert [m["message"] for m in logger.search_conversations("rust")] == ["notes about rust"]
+
+    # a day file for an archived date is indexed from its start and archived once
+    (tmp_path / "conversation_2024-01-05.jsonl").write_text(json.dumps(
+        {"timestamp": "2024-01-05T18:00:00", "role": "user", "message": "more rust"}) + "\n")
+    assert len(logger.search_conversations("rust")) == 2
+    logger.archive(older_than_days=30, today=date(2024, 6, 1))
+    assert [m["message"] for m in logger.load_conversations("2024-01-05")] == ["notes about rust", "more rust"]
+    assert len(logger.search_conversations("rust")) == 2
+    (tmp_path / "conversation_2024-01-05.jsonl").write_text(json.dumps(
+        {"timestamp": "2024-01-05T19:00:00", "role": "user", "message": "last rust"}) + "\n")
+    assert len(logger.search_conversations("rust")) == 3
@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+from pkms import instrumentation
+from pkms.instrumentation import Timings, phase
+
+
+def test_nested_phases_are_exclusive(monkeypatch):
+    # open starts at 0s, read runs 0.010-0.030s, open ends at 0.035s
+    clock = iter([0.0, 0.010, 0.030, 0.035])
+    monkeypatch.setattr(instrumentation, "time", SimpleNamespace(perf_counter=lambda: next(clock)))
+    timings = Timings()
+    with timings.phase("open"):
+        with timings.phase("read"):
+            pass
+    assert timings.calls == {"open": 1, "read": 1}
+    assert timings.ms["open"] == pytest.approx(15)
+    assert timings.ms["read"] == pytest.approx(20)
+
+
+def test_hooks_are_noops_when_inactive():
+    instrumentation.stop_timings()
+    with phase("read"):
+        pass  # nothing to record into, nothing raised
+
+
+def test_timings_flag_reports_store_phases(tmp_path, capsys):
+    path = str(tmp_path / "tasks.json")
+    main.main(["--storage", "json", "--json-path", path, "add", "Write report"])
+    main.main(["--storage", "json", "--json-path", path, "--timings", "list"])
+    out, err = capsys.readouterr()
+    assert "Write report" in out and "timings" not in out
+    phases = {line.split()[0]: line for line in err.splitlines()[1:]}
+    assert set(phases) == {"import", "open", "read", "write", "compute", "render", "total"}
+    assert "(1 call)" in phases["open"] and "calls)" in phases["read"]
+
+
+def test_profile_and_memory_reports(tmp_path, capsys):
+    path = str(tmp_path / "tasks.json")
+    dump = tmp_path / "stats.prof"
+    main.main(["--storage", "json", "--json-path", path, "--profile", "--profile-out", str(dump),
+               "--trace-memory", "list"])
+    err = capsys.readouterr().err
+    assert "Ordered by: cumulative time" in err
+    assert "memory peak:" in err
+    assert dump.stat().st_size > 0
+
+
+def test_reports_survive_a_failing_command():
+    def fail():
+        raise RuntimeError("boom")
+
+    reports = []
+    with pytest.raises(RuntimeError, match="boom"):
+        instrumentation.trace_memory(lambda: instrumentation.profile_call(fail, reports.append), reports.append)
+    assert "function calls" in reports[0]
+    assert reports[1].startswith("memory peak:")
+
+
+def test_bad_profile_sort_is_rejected_before_the_command_runs(tmp_path, capsys):
+    path = tmp_path / "tasks.json"
+    with pytest.raises(SystemExit):
+        main.main(["--storage", "json", "--json-path", str(path), "--profile", "--profile-sort", "cumulativ",
+                   "add", "never added"])
+    assert "invalid choice: 'cumulativ'" in capsys.readouterr().err
+    assert not path.exists()
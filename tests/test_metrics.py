@@ -0,0 +1,117 @@
+from datetime import datetime
+
+import pytest
+
+import main
+from pkms.metrics import REGISTRY, Metrics, measured, task_gauges
+from pkms.models import Task
+from pkms.storage import registry
+from pkms.storage.json_store import JSONStore
+from pkms.storage.sqlite_store import SQLiteStore
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def _task(title):
+    return Task(None, title, "normal", None, ["a"], None, datetime(2024, 5, 1), False, None)
+
+
+def test_histogram_rendering():
+    metrics = Metrics()
+    metrics.observe("json", "list", 0.0003, rows=4, error=False)
+    metrics.observe("json", "list", 0.2, rows=None, error=True)
+    text = metrics.render({"pkms_tasks": ("Tasks.", {(("state", "open"),): 3})})
+    assert 'pkms_store_operations_total{backend="json",op="list"} 2' in text
+    assert 'pkms_store_errors_total{backend="json",op="list"} 1' in text
+    assert 'pkms_store_rows_total{backend="json",op="list"} 4' in text
+    assert 'pkms_store_operation_seconds_bucket{backend="json",op="list",le="0.0005"} 1' in text
+    assert 'pkms_store_operation_seconds_bucket{backend="json",op="list",le="0.25"} 2' in text
+    assert 'pkms_store_operation_seconds_count{backend="json",op="list"} 2' in text
+    assert '# TYPE pkms_tasks gauge\npkms_tasks{state="open"} 3' in text
+
+
+def test_store_methods_are_measured(tmp_path):
+    store = SQLiteStore(tmp_path / "tasks.db")
+    store.add(_task("one"))
+    store.list()
+    store.list()
+    assert REGISTRY.calls[("sqlite", "add")] == 1
+    assert REGISTRY.calls[("sqlite", "list")] == 2
+    assert REGISTRY.rows[("sqlite", "list")] == 2
+    assert task_gauges(store)["pkms_tasks"][1][(("backend", "sqlite"), ("state", "open"))] == 1
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite", "mmap"])
+def test_every_operation_is_counted_once_under_its_own_name(tmp_path, backend):
+    store = registry.open_store(backend, tmp_path / f"tasks.{backend}")
+    store.put_many([_task("one"), _task("two")])
+    store.add(_task("three"))
+    store.get(1)
+    store.list()
+    store.search("t")
+    store.query(done=False)
+    assert len(list(store.iterate())) == 3
+    store.counts()
+    store.complete(1)
+    store.set_summary(2, "short", "hash")
+    store.delete(3)
+    store.delete_many([2])
+    store.changes()
+
+    ops = ["put_many", "add", "get", "list", "search", "query", "iterate", "counts",
+           "complete", "set_summary", "delete", "delete_many", "changes"]
+    assert dict(REGISTRY.calls) == {(backend, op): 1 for op in ops}
+    assert REGISTRY.rows[(backend, "iterate")] == 3
+    assert REGISTRY.rows[(backend, "query")] == 3
+
+
+def test_iterator_drained_inside_a_measured_call(tmp_path):
+    source = JSONStore(tmp_path / "source.json")
+    target = SQLiteStore(tmp_path / "target.db")
+    source.put_many([_task("one"), _task("two")])
+    REGISTRY.reset()
+
+    class Copier:
+        metrics_label = "copier"
+
+        @measured
+        def copy(self, tasks):
+            ids = [target.add(t) for t in tasks]  # each next() runs inside copy
+            target.counts()
+            return ids
+
+    assert Copier().copy(source.iterate()) == [1, 2]
+    assert dict(REGISTRY.calls) == {("json", "iterate"): 1, ("copier", "copy"): 1}
+    assert REGISTRY.rows[("json", "iterate")] == 2
+
+
+def test_json_cache_hits_and_isolation(tmp_path):
+    store = JSONStore(tmp_path / "tasks.json")
+    store.add(_task("one"))
+    first = store.list()
+    first[0].title = "changed by caller"
+    first[0].tags.append("b")
+    again = store.list()
+    assert (again[0].title, again[0].tags) == ("one", ["a"])
+    assert REGISTRY.cache_ratio("json", "hot_file") == 1.0  # the write refreshed the cache
+    assert REGISTRY.bytes[("json", "write")] > 0
+
+    JSONStore(tmp_path / "tasks.json").add(_task("two"))  # another writer
+    assert [t.title for t in store.list()] == ["one", "two"]
+    assert REGISTRY.cache[("json", "hot_file", "miss")] >= 1
+    assert REGISTRY.bytes[("json", "read")] > 0
+
+
+def test_stats_command_prometheus(tmp_path, capsys):
+    path = str(tmp_path / "tasks.json")
+    main.main(["--storage", "json", "--json-path", path, "add", "Write report"])
+    capsys.readouterr()
+    main.main(["--storage", "json", "--json-path", path, "stats", "--prometheus"])
+    out = capsys.readouterr().out
+    assert 'pkms_tasks{backend="json",state="open"} 1' in out
+    assert 'pkms_store_operations_total{backend="json",op="list"} 3' in out
@@ -0,0 +1,45 @@
+import pytest
+
+import knowledge
+import tasks
+from ai_agent import AIAgent
+from query_planner import QueryPlanner, parse_intent
+from session import DataSession
+
+
+@pytest.fixture
+def planner(tmp_path, monkeypatch):
+    monkeypatch.setattr(tasks, "DATA_FILE", str(tmp_path / "tasks.json"))
+    monkeypatch.setattr(knowledge, "DATA_FILE", str(tmp_path / "knowledge.json"))
+    session = DataSession()
+    return QueryPlanner(session, AIAgent(session))
+
+
+def test_parse_intent():
+    assert parse_intent("What should I do  NEXT?").action == "suggest"
+    intent = parse_intent("find task knowledge")
+    assert intent.action is None
+    assert intent.search_tasks and intent.search_knowledge and intent.related_knowledge
+    assert parse_intent("hello") == parse_intent("  HELLO ")
+
+
+def test_answers_are_cached_until_data_changes(planner, monkeypatch):
+    planner.session.add_task("write the git guide")
+    calls = []
+    real_brief = planner.agent.get_daily_brief
+    monkeypatch.setitem(planner._actions, "brief", lambda: calls.append(1) or real_brief())
+
+    first = planner.answer("daily brief")
+    assert planner.answer("Daily   Brief") == first
+    assert len(calls) == 1
+
+    planner.session.add_entry("Git Tips", "rebase safely", ["git"])
+    assert "Git Tips" in planner.answer("daily brief")
+    assert len(calls) == 2
+
+
+def test_search_intent_uses_session_snapshot(planner):
+    planner.session.add_task("task list cleanup")
+    answer = planner.answer("task list")
+    assert "Relevant tasks:" in answer
+    assert "1: task list cleanup" in answer
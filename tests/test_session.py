@@ -0,0 +1,47 @@
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+import knowledge
+import tasks
+from ai_agent import AIAgent
+from session import DataSession
+
+
+@pytest.fixture
+def data_files(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(tasks, "DATA_FILE", str(tmp_path / "tasks.json"))
+    monkeypatch.setattr(knowledge, "DATA_FILE", str(tmp_path / "knowledge.json"))
+    return tmp_path
+
+
+def test_session_serves_from_memory_and_writes_through(data_files, monkeypatch):
+    session = DataSession()
+    agent = AIAgent(session)
+
+    calls = []
+    monkeypatch.setattr(tasks, "load_tasks", lambda: calls.append("load") or [])
+    session.add_task("rebase the feature branch")
+    session.add_entry("Git Tips", "how to rebase safely", ["git"])
+
+    assert calls == []  # no reloads for our own writes
+    assert json.loads((data_files / "tasks.json").read_text())["tasks"][0]["description"] == "rebase the feature branch"
+    assert agent.get_relevant_knowledge("rebase")[0]["title"] == "Git Tips"
+
+
+def test_session_reloads_after_external_change(data_files):
+    session = DataSession()
+    agent = AIAgent(session)
+    session.add_task("first")
+    version = session.version
+
+    path = data_files / "tasks.json"
+    path.write_text(json.dumps([{"id": 1, "description": "changed elsewhere"}]))
+    os.utime(path, ns=(0, 0))
+
+    assert session.refresh() is True
+    assert session.version > version
+    assert agent.tasks[0]["description"] == "changed elsewhere"
+    assert session.refresh() is False
@@ -0,0 +1,385 @@
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+import pytest
+
+from pkms.models import Task
+from pkms.storage.adapters import ChatTaskStore, TaskManagerStore
+from pkms.storage.json_store import JSONStore
+from pkms.storage.mmap_store import MMapStore
+from pkms.storage import registry
+from pkms.storage.sqlite_store import SQLiteStore
+
+STORES = {
+    "json": lambda tmp: JSONStore(tmp / "tasks.json"),
+    "sqlite": lambda tmp: SQLiteStore(tmp / "tasks.db"),
+    "mmap": lambda tmp: MMapStore(tmp / "tasks.rec"),
+    "chat": lambda tmp: ChatTaskStore(tmp / "tasks_data.json"),
+    "tasks2": lambda tmp: TaskManagerStore(tmp / "data", summaries=True),
+}
+
+
+@pytest.fixture(params=sorted(STORES))
+def open_store(request, tmp_path: Path):
+    return lambda: STORES[request.param](tmp_path)
+
+
+def _task(title, note=None, **fields):
+    data = dict(id=None, title=title, priority="normal", due=None, tags=[], note=note,
+                created_at=datetime(2024, 5, 1, 9, 30, 0, 123456), done=False, done_at=None)
+    data.update(fields)
+    return Task(**data)
+
+
+def test_add_list_roundtrip(open_store):
+    store = open_store()
+    first = store.add(_task("Write report", note="quarterly numbers", priority="high",
+                            due=date(2024, 6, 1), tags=["work", "q2"]))
+    second = store.add(_task("Buy milk"))
+    assert second > first
+
+    tasks = open_store().list()  # a fresh instance reads what the first wrote
+    assert [t.id for t in tasks] == [first, second]
+    task = tasks[0]
+    assert (task.title, task.note, task.priority, task.due, task.tags) == (
+        "Write report", "quarterly numbers", "high", date(2024, 6, 1), ["work", "q2"])
+    assert task.created_at == datetime(2024, 5, 1, 9, 30, 0, 123456)
+    assert tasks[1].note is None and tasks[1].tags == []
+
+
+def test_complete_delete_and_search(open_store):
+    store = open_store()
+    a = store.add(_task("Alpha", note="needle here"))
+    b = store.add(_task("Beta"))
+    c = store.add(_task("Gamma"))
+
+    assert store.complete(a) is True
+    assert store.complete(a) is False
+    assert store.delete(b) is True
+    assert store.delete(b) is False
+    assert store.complete(999) is False
+
+    assert [t.id for t in store.list()] == [c]
+    everything = store.list(include_done=True)
+    assert [t.id for t in everything] == [a, c]
+    assert everything[0].done and everything[0].done_at is not None
+
+    assert [t.id for t in store.search("NEEDLE")] == [a]
+    assert [t.id for t in store.search("gam")] == [c]
+
+
+def test_set_summary(open_store):
+    store = open_store()
+    task_id = store.add(_task("Long one", note="x" * 300))
+    assert store.set_summary(task_id, "short", "abc") is True
+    assert store.set_summary(12345, "short", "abc") is False
+    task = open_store().list()[0]
+    assert (task.summary, task.summary_hash, task.note) == ("short", "abc", "x" * 300)
+
+
+def test_mmap_store_grows_and_keeps_ids(tmp_path: Path):
+    store = MMapStore(tmp_path / "tasks.rec")
+    ids = [store.add(_task(f"t{i}")) for i in range(2500)]
+    store.delete(ids[-1])
+    assert store.add(_task("after delete")) == ids[-1] + 1
+    assert store.get(ids[1200]).title == "t1200"
+    assert store.get(ids[-1]) is None
+    assert len(MMapStore(tmp_path / "tasks.rec").list()) == 2500
+
+
+def test_mmap_mutations_flush_the_records_they_change(tmp_path: Path, monkeypatch):
+    from pkms.storage.mmap_store import HEADER, RECORD
+
+    store = MMapStore(tmp_path / "tasks.rec")
+    flushed = []
+    sync = store._sync
+    monkeypatch.setattr(store, "_sync", lambda: flushed.append(store._dirty) or sync())
+
+    def record(task_id):
+        return (HEADER.size + (task_id - 1) * RECORD.size, HEADER.size + task_id * RECORD.size)
+
+    def covers(task_id):
+        start, end = record(task_id)
+        return any(lo <= start and end <= hi for lo, hi in filter(None, flushed))
+
+    store.add(_task("a"))
+    assert covers(1) and flushed[-1][0] == 0  # the header's count and next id too
+    store.put_many([_task("b"), _task("c", id=3000)])
+    assert covers(2) and covers(3000)
+    for mutate, task_id in ((store.complete, 1), (lambda i: store.set_summary(i, "s", "h"), 2),
+                            (store.delete, 2), (lambda i: store.delete_many([i]), 3000)):
+        flushed.clear()
+        assert mutate(task_id)
+        assert covers(task_id)
+    assert store._dirty is None
+    store.close()
+    assert [(t.id, t.done) for t in MMapStore(tmp_path / "tasks.rec").list(include_done=True)] == [(1, True)]
+
+
+@pytest.mark.parametrize("name", ["json", "sqlite"])
+def test_archive_moves_old_completed_tasks(name, tmp_path: Path):
+    store = STORES[name](tmp_path)
+    old = store.add(_task("Old report", note="needle", done=True, done_at=datetime(2024, 1, 5)))
+    recent = store.add(_task("Recent", done=True, done_at=datetime(2024, 5, 30)))
+    open_ = store.add(_task("Open"))
+
+    assert store.archive(30, now=datetime(2024, 6, 1)) == 1
+    assert store.archive(30, now=datetime(2024, 6, 1)) == 0
+    assert [t.id for t in store.list()] == [open_]
+    assert [t.id for t in store.list(include_done=True, include_archived=False)] == [recent, open_]
+    assert [t.id for t in store.list(include_done=True)] == [old, recent, open_]
+    assert [t.id for t in store.search("needle")] == [old]
+
+    # archived tasks stay addressable and their ids are never reused
+    assert store.set_summary(old, "short", "abc") is True
+    assert store.delete(old) is True
+    assert store.delete(old) is False
+    assert store.add(_task("New")) > open_
+
+
+def test_json_put_saves_a_revived_task_before_pruning_the_archive(tmp_path: Path, monkeypatch):
+    path = tmp_path / "tasks.json"
+    store = JSONStore(path)
+    old = store.add(_task("Old report", done=True, done_at=datetime(2024, 1, 5)))
+    older = store.add(_task("Older report", done=True, done_at=datetime(2023, 12, 5)))
+    assert store.archive(30, now=datetime(2024, 6, 1)) == 2
+
+    store.put_many([store.get(older)])
+    assert store.counts() == {"open": 0, "done": 1, "archived": 1}
+    assert [t.id for t in store.list(include_done=True, include_archived=False)] == [older]
+    assert [p.name for p in (tmp_path / "tasks.archive").glob("*.json")] == ["tasks-2024-01.json"]
+
+    def crash(task_ids):
+        raise OSError("disk full")
+
+    # a crash between the two writes leaves a duplicate, never a lost task
+    monkeypatch.setattr(store, "_prune_archived", crash)
+    revived = store.get(old)
+    revived.title = "Old report, reopened"
+    with pytest.raises(OSError):
+        store.put_many(t for t in [revived])
+    monkeypatch.undo()
+    reopened = JSONStore(path)
+    assert reopened.counts() == {"open": 0, "done": 2, "archived": 0}
+    assert [t.title for t in reopened.list(include_done=True)] == ["Old report, reopened", "Older report"]
+
+    # the leftover archived copy goes with the hot one
+    assert reopened.delete(old) is True
+    assert reopened.get(old) is None
+    assert not list((tmp_path / "tasks.archive").glob("*.json"))
+
+
+@pytest.mark.parametrize("name", ["json", "sqlite", "mmap"])
+def test_weekly_summary_counts_archived_completions(name, tmp_path: Path, capsys):
+    import main
+    from datetime import timedelta
+
+    path = tmp_path / f"tasks.{name}"
+    store = registry.open_store(name, path)
+    now = datetime.now()
+    store.add(_task("Done this week", done=True, done_at=now - timedelta(days=5)))
+    store.add(_task("Done today", done=True, done_at=now))
+    store.add(_task("Done last month", done=True, done_at=now - timedelta(days=40)))
+    if hasattr(store, "archive"):
+        assert store.archive(3) == 2  # as `pkms archive --days 3` would
+    assert store.query(done=True, done_since=now - timedelta(days=7)) != []
+
+    flag = "--" + main.PATH_ARGS[name].replace("_", "-")
+    for archive_after in ("0", "30", "3"):
+        main.main(["--storage", name, flag, str(path), "--archive-after", archive_after, "weekly-summary"])
+        assert "Completed last 7 days: 2 |" in capsys.readouterr().out
+
+def test_json_header_counts_and_ids(tmp_path: Path):
+    path = tmp_path / "tasks.json"
+    store = JSONStore(path)
+    a = store.add(_task("Alpha"))
+    b = store.add(_task("Beta"))
+    store.complete(a)
+    version = store.header()["version"]
+    store.delete(b)
+    assert store.header()["version"] == version + 1
+    assert store.add(_task("Gamma")) == b + 1  # deleted ids are not reused
+    assert store.counts() == {"open": 1, "done": 1, "archived": 0}
+
+    # the file stays one JSON document for other readers
+    document = json.loads(path.read_text(encoding="utf-8"))
+    assert document["header"]["next_id"] == b + 2
+    assert [t["title"] for t in document["tasks"]] == ["Alpha", "Gamma"]
+
+    # the header is read without touching the task list
+    head = path.read_text(encoding="utf-8").split("\n", 1)[0]
+    path.write_text(head + "\nnot json", encoding="utf-8")
+    assert JSONStore(path).counts() == {"open": 1, "done": 1, "archived": 0}
+
+    # files written with a bare header line before the list still load
+    path.write_text(json.dumps(document["header"]) + "\n" + json.dumps(document["tasks"]), encoding="utf-8")
+    store = JSONStore(path)
+    assert [t.title for t in store.list(include_done=True)] == ["Alpha", "Gamma"]
+    store.add(_task("Delta"))
+    assert json.loads(path.read_text(encoding="utf-8"))["header"]["open"] == 2
+
+
+def test_json_reads_legacy_list_file(tmp_path: Path):
+    path = tmp_path / "tasks.json"
+    legacy = [_task("Old", done=True).to_dict(), _task("Open").to_dict()]
+    legacy[0]["id"], legacy[1]["id"] = 4, 7
+    path.write_text(json.dumps(legacy), encoding="utf-8")
+    store = JSONStore(path)
+    assert store.header()["schema"] == 1
+    assert store.counts() == {"open": 1, "done": 1, "archived": 0}
+    assert store.add(_task("New")) == 8
+    assert store.header()["schema"] == 2
+    assert [t.id for t in store.list(include_done=True)] == [4, 7, 8]
+
+
+def test_counts(open_store):
+    store = open_store()
+    assert store.counts() == {"open": 0, "done": 0, "archived": 0}
+    a = store.add(_task("Alpha"))
+    store.add(_task("Beta"))
+    store.complete(a)
+    assert open_store().counts() == {"open": 1, "done": 1, "archived": 0}
+
+
+def test_backend_protocol(open_store):
+    store = open_store()
+    ids = store.put_many([
+        _task("Write report", note="numbers", priority="high", due=date(2024, 6, 3), tags=["work"]),
+        _task("Buy milk", priority="low", tags=["home"]),
+        _task("File taxes", priority="urgent", due=date(2024, 6, 1), tags=["home", "money"]),
+    ])
+    assert ids == [1, 2, 3]
+    replaced = store.get(2)
+    replaced.title = "Buy oat milk"
+    assert store.put_many([replaced, _task("Imported", id=10)]) == [2, 10]
+    assert store.add(_task("Next")) == 11
+    store.complete(1)
+
+    assert store.get(2).title == "Buy oat milk"
+    assert store.get(99) is None
+    assert [t.id for t in store.iterate()] == [1, 2, 3, 10, 11]
+    assert [t.id for t in store.iterate(include_done=False)] == [2, 3, 10, 11]
+    assert [t.id for t in store.query(tag="home")] == [2, 3]
+    assert [t.id for t in store.query(done=False, sort="priority", limit=2)] == [3, 10]
+    assert [t.id for t in store.query(sort="due")] == [3, 1, 2, 10, 11]
+    assert [t.id for t in store.query(sort="-due", limit=2)] == [11, 10]
+    assert [t.id for t in store.query(due_before=date(2024, 6, 2))] == [3]
+    assert [t.id for t in store.query(text="NUMBERS", done=True)] == [1]
+    with pytest.raises(ValueError):
+        store.query(sort="colour")
+
+    assert store.delete_many([10, 11, 404]) == 2
+    feed = store.changes()
+    assert [(c.op, c.task_id) for c in feed][-3:] == [("put", 1), ("delete", 10), ("delete", 11)]
+    assert store.changes(feed[-2].seq) == feed[-1:]
+    assert store.changes(feed[-1].seq) == []
+
+
+def test_filters_take_wildcards_literally(open_store):
+    store = open_store()
+    store.put_many([
+        _task("Done 100%", tags=["to_do"]),
+        _task("Done 1000", note="a\\b", tags=["toxdo", "Work"]),
+        _task("snake_case", tags=["work"]),
+    ])
+    assert [t.id for t in store.query(text="100%")] == [1]
+    assert [t.id for t in store.query(text="_case")] == [3]
+    assert [t.id for t in store.query(text="e_c")] == [3]
+    assert [t.id for t in store.query(text="a\\b")] == [2]
+    assert [t.id for t in store.query(text="%")] == [1]
+    assert [t.id for t in store.search("100%")] == [1]
+    assert [t.id for t in store.query(tag="to_do")] == [1]
+    assert [t.id for t in store.query(tag="to%")] == []
+    assert [t.id for t in store.query(tag="work")] == [3]
+
+
+@pytest.mark.parametrize("source, target", [("json", "sqlite"), ("sqlite", "mmap"), ("mmap", "json")])
+def test_migrate_keeps_ids(source, target, tmp_path: Path):
+    src = registry.open_store(source, tmp_path / f"src.{source}")
+    for i in range(7):
+        src.add(_task(f"t{i}", tags=["x"] if i % 2 else []))
+    src.delete(3)
+    src.complete(5)
+    dst = registry.open_store(target, tmp_path / f"dst.{target}")
+    assert registry.migrate(src, dst, batch_size=2) == 6
+    assert [t.to_dict() for t in dst.iterate()] == [t.to_dict() for t in src.iterate()]
+    assert dst.add(_task("after")) == 8
+
+
+def test_migrate_refuses_to_copy_a_store_onto_itself(tmp_path: Path):
+    import main
+
+    path = tmp_path / "tasks.db"
+    registry.open_store("sqlite", path).add(_task("keep me"))
+    with pytest.raises(SystemExit, match="is the source store"):
+        main.main(["--storage", "sqlite", "--db-path", str(path), "migrate", "--to", "sqlite",
+                   "--to-path", str(tmp_path / "." / "tasks.db")])
+    assert [t.title for t in registry.open_store("sqlite", path).iterate()] == ["keep me"]
+
+
+def test_list_sort_is_validated_by_argparse(tmp_path: Path, capsys):
+    import main
+
+    path = str(tmp_path / "tasks.db")
+    for title, priority in (("low one", "low"), ("urgent one", "urgent")):
+        main.main(["--storage", "sqlite", "--db-path", path, "add", title, "--priority", priority])
+    capsys.readouterr()
+    main.main(["--storage", "sqlite", "--db-path", path, "list", "--sort=-priority"])
+    assert [line.split(" | ")[1] for line in capsys.readouterr().out.splitlines()] == ["low one", "urgent one"]
+
+    with pytest.raises(SystemExit):
+        main.main(["--storage", "sqlite", "--db-path", path, "list", "--sort", "bogus"])
+    assert "argument --sort: Unknown sort field 'bogus'" in capsys.readouterr().err
+
+
+def test_registered_backend_factories(tmp_path: Path, monkeypatch, capsys):
+    import main
+
+    seen = []
+
+    def documented(path, archive_after_days=None):  # no cold tier: accepts and ignores the option
+        seen.append(archive_after_days)
+        return JSONStore(path)
+
+    backends = dict(registry.BACKENDS)
+    monkeypatch.setattr(registry, "BACKENDS", backends)
+    monkeypatch.setattr(main, "BACKENDS", backends)
+    registry.register("custom", documented, tmp_path / "custom.json")
+    registry.register("plain", lambda path: JSONStore(path), tmp_path / "plain.json")
+
+    main.main(["--storage", "custom", "add", "via register"])
+    main.main(["--storage", "custom", "--archive-after", "0", "list"])
+    main.main(["--storage", "plain", "--archive-after", "0", "add", "no options"])
+    assert seen == [30, None]
+    out = capsys.readouterr().out
+    assert "via register" in out and "Added task #1: no options" in out
+
+
+def test_front_ends_read_what_the_adapters_write(tmp_path: Path, monkeypatch):
+    import tasks
+    from src.task_manager import TaskManager as Tasks2Manager
+    from tasks3.task_manager import TaskManager as Tasks3Manager
+
+    src = registry.open_store("sqlite", tmp_path / "src.db")
+    src.add(_task("plan sprint", note="two weeks", tags=["work"], due=date(2024, 6, 1)))
+    src.add(_task("file taxes", priority="high"))
+    src.complete(2)
+
+    chat = registry.open_store("chat", tmp_path / "tasks_data.json")
+    assert registry.migrate(src, chat) == 2
+    monkeypatch.setattr(tasks, "DATA_FILE", str(tmp_path / "tasks_data.json"))
+    assert [t["description"] for t in tasks.load_tasks()] == ["plan sprint", "file taxes"]
+    tasks.add_task("written by chat.py", quiet=True)
+    assert [t.title for t in chat.list()] == ["plan sprint", "written by chat.py"]
+    assert [t.to_dict() for t in chat.iterate()][:2] == [t.to_dict() for t in src.iterate()]
+
+    for name, manager in (("tasks2", Tasks2Manager), ("tasks3", Tasks3Manager)):
+        store = registry.open_store(name, tmp_path / name)
+        registry.migrate(src, store)
+        loaded = manager(str(tmp_path / name)).tasks
+        assert [(t.title, t.status, t.due_date, t.description) for t in loaded] == [
+            ("plan sprint", "not-started", "2024-06-01", "two weeks"),
+            ("file taxes", "completed", None, ""),
+        ]
+        assert manager(str(tmp_path / name)).add_task("next", "").id == 3
@@ -0,0 +1,62 @@
+from datetime import datetime
+from pathlib import Path
+
+from pkms.models import Task
+from pkms.storage.json_store import JSONStore
+from pkms.summarizer import PkmsSource, SummaryPipeline, local_summarize
+
+
+def _task(note):
+    return Task(None, "t", "normal", None, [], note, datetime.utcnow(), False, None)
+
+
+def test_pipeline_stores_summary_once(tmp_path: Path):
+    store = JSONStore(tmp_path / "tasks.json")
+    long_note = "We need to migrate the billing service, then retire the old cron jobs. " * 5
+    task_id = store.add(_task(long_note))
+    store.add(_task("short note"))
+
+    calls = []
+
+    def summarize(text):
+        calls.append(text)
+        return local_summarize(text)
+
+    pipeline = SummaryPipeline(PkmsSource(store), summarize=summarize)
+    try:
+        assert pipeline.run_once() == 1
+        assert pipeline.run_once() == 0  # unchanged text is not re-summarized
+    finally:
+        pipeline.stop()
+
+    assert len(calls) == 1
+    stored = {t.id: t for t in store.list()}
+    assert stored[task_id].summary == "Migrate the billing service"
+
+
+def test_tasks2_summarize_command(tmp_path: Path, monkeypatch, capsys):
+    from src.command_interface import CommandInterface
+
+    monkeypatch.chdir(tmp_path)  # tasks2 keeps its files under ./data
+    cli = CommandInterface()
+    long_text = "I need to renew the team's cloud contract, compare three vendors and get sign-off. " * 4
+    cli.onecmd(f'task add "Contract" "{long_text}"')
+    cli.onecmd('task add "Short" "tiny description"')
+    cli.onecmd('task add "Done" "' + long_text + '"')
+    cli.onecmd("task complete 3")
+    capsys.readouterr()
+
+    for bad in ("task summarize ten", "task summarize -5", "task summarize 10 20"):
+        cli.onecmd(bad)
+        assert capsys.readouterr().out == "Usage: task summarize [min_length]\n"
+    cli.onecmd("task summarize")
+    assert "Summarized 1 task(s)" in capsys.readouterr().out
+    cli.onecmd("task summarize")
+    assert "(nothing to summarize)" in capsys.readouterr().out
+
+    reloaded = CommandInterface().task_manager
+    assert reloaded.get_task(1).summary == "Renew the team's cloud contract"
+    assert reloaded.get_task(1).summary_hash
+    assert reloaded.get_task(2).summary is None and reloaded.get_task(3).summary is None
+    cli.onecmd("task list pending")
+    assert "Summary: Renew the team's cloud contract" in capsys.readouterr().out
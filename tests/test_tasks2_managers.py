@@ -0,0 +1,31 @@
+import json
+
+from src.knowledge_manager import KnowledgeManager
+from src.task_manager import TaskManager
+
+
+def test_next_id_survives_deleting_the_highest_id(tmp_path):
+    tasks = TaskManager(str(tmp_path))
+    tasks.add_task("one", "")
+    last = tasks.add_task("two", "")
+    tasks.delete_task(last.id)
+    assert json.loads((tmp_path / "tasks.json").read_text())["next_id"] == last.id + 1
+    assert TaskManager(str(tmp_path)).add_task("three", "").id == last.id + 1
+
+    knowledge = KnowledgeManager(str(tmp_path))
+    knowledge.add_entry("a", "")
+    last = knowledge.add_entry("b", "")
+    knowledge.delete_entry(last.id)
+    assert KnowledgeManager(str(tmp_path)).add_entry("c", "").id == last.id + 1
+
+
+def test_legacy_list_files_still_load(tmp_path):
+    (tmp_path / "tasks.json").write_text(json.dumps([{
+        "id": 4, "title": "old", "description": "", "priority": "normal", "due_date": None,
+        "status": "not-started", "categories": [], "tags": [], "created_at": "2024-01-01T00:00:00",
+        "completed_at": None,
+    }]))
+    tasks = TaskManager(str(tmp_path))
+    assert [t.title for t in tasks.tasks] == ["old"]
+    assert tasks.add_task("new", "").id == 5
+    assert json.loads((tmp_path / "tasks.json").read_text())["next_id"] == 6
@@ -0,0 +1,57 @@
+import pytest
+
+from src.command_interface import CommandInterface, parse_search_args
+from src.task_manager import TaskManager
+from src.task_query import TaskQuery
+
+
+def _manager(tmp_path):
+    tm = TaskManager(str(tmp_path))
+    tm.add_task("Write report", "quarterly docs", "high", "2024-03-10", ["work"], ["docs"])
+    tm.add_task("Fix bug", "crash on start", "urgent", "2024-02-01", ["work"], ["bug"])
+    tm.add_task("Buy milk", "errand", "low", None, ["home"], [])
+    tm.add_task("Review docs", "before release", "normal", "2024-04-20", ["work"], ["docs", "review"])
+    return tm
+
+
+def test_search_flags_filter_sort_and_limit(tmp_path):
+    tm = _manager(tmp_path)
+    query = parse_search_args(["docs", "--category", "#work", "--tag", "docs,review",
+                               "--due-after", "2024-03-01", "--sort", "-due", "--limit", "5"])
+    assert query == TaskQuery(text="docs", categories=["work"], tags=["docs", "review"],
+                              due_after="2024-03-01", sort="-due", limit=5)
+    assert [t.title for t in tm.query(query)] == ["Review docs", "Write report"]
+    assert [t.id for t in tm.search_tasks(categories=["work"], sort="priority", limit=2)] == [2, 1]
+    assert [t.id for t in tm.search_tasks(due_before="2024-03-10")] == [1, 2]
+    with pytest.raises(ValueError):
+        parse_search_args(["--colour", "red"])
+
+
+def test_mutating_while_consuming_results(tmp_path):
+    tm = _manager(tmp_path)
+    results = tm.query(TaskQuery())
+    assert next(results).id == 1
+    tm.delete_task(2)
+    tm.add_task("New", "added mid-iteration")
+    assert [t.id for t in results] == [3, 4]
+
+
+def test_bad_due_dates_are_reported(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    cli = CommandInterface()
+    cli.onecmd('task add "Plan" "sprint" normal 2024-05-01')
+    capsys.readouterr()
+    cli.onecmd("task search plan --due-before 2024-13-01")
+    assert "Invalid search: Invalid due_before date '2024-13-01'" in capsys.readouterr().out
+    cli.onecmd("task search plan --due-before 2024-05-01")
+    assert "#1: Plan (due 2024-05-01)" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("module", ["task_query.py", "record_index.py"])
+def test_tasks2_and_tasks3_copies_stay_identical(module):
+    from pathlib import Path
+
+    root = Path(__file__).resolve().parents[1]
+    tasks2 = (root / "tasks2" / "src" / module).read_text(encoding="utf-8")
+    tasks3 = (root / "tasks3" / "src" / "tasks3" / module).read_text(encoding="utf-8")
+    assert tasks2 == tasks3, f"edit tasks2/src/{module} and tasks3/src/tasks3/{module} together"
@@ -0,0 +1,107 @@
+import math
+import random
+
+import pytest
+
+from src import relevance
+from src.ai_assistant import AIAssistant
+from src.knowledge_manager import KnowledgeManager
+from src.relevance import BM25Index, tokenize
+from src.task_manager import TaskManager
+
+WORDS = "python numpy index query cache sqlite docs tests deploy budget report sprint".split()
+
+
+def _docs(n, seed=0):
+    rng = random.Random(seed)
+    return {i: " ".join(rng.choices(WORDS, k=rng.randint(2, 12))) for i in range(1, n + 1)}
+
+
+def _reference(docs, query, k1=1.5, b=0.75):
+    """BM25 straight from the formula, for comparison."""
+    tokens = {i: tokenize(text) for i, text in docs.items()}
+    avg = sum(map(len, tokens.values())) / len(tokens)
+    scores = {}
+    for term in set(tokenize(query)):
+        df = sum(term in t for t in tokens.values())
+        if not df:
+            continue
+        idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+        for i, t in tokens.items():
+            tf = t.count(term)
+            if tf:
+                norm = k1 * (1 - b + b * len(t) / avg)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+
+def _index(docs):
+    index = BM25Index()
+    for doc_id, text in docs.items():
+        index.add(doc_id, text)
+    return index
+
+
+def test_python_scoring_matches_formula(monkeypatch):
+    monkeypatch.setattr(relevance, "np", None)
+    docs = _docs(60)
+    index = _index(docs)
+    for query in ("python cache", "sqlite docs tests", "the budget"):
+        expected = _reference(docs, query)
+        best = sorted(expected.items(), key=lambda item: (-item[1], item[0]))[:5]
+        got = index.top_k(query, 5)
+        assert [doc_id for doc_id, _ in got] == [doc_id for doc_id, _ in best]
+        assert [score for _, score in got] == pytest.approx([score for _, score in best])
+
+
+def test_numpy_and_python_rank_identically(monkeypatch):
+    pytest.importorskip("numpy")
+    index = _index(_docs(300, seed=1))
+    queries = ["python cache", "report sprint deploy", "index", "unknown words"]
+    with_numpy = [index.top_k(q, 7) for q in queries]
+    monkeypatch.setattr(relevance, "np", None)
+    fallback = [index.top_k(q, 7) for q in queries]
+    for a, b in zip(with_numpy, fallback):
+        assert [doc_id for doc_id, _ in a] == [doc_id for doc_id, _ in b]
+        assert [score for _, score in a] == pytest.approx([score for _, score in b])
+
+
+def test_add_remove_update_match_a_fresh_build(monkeypatch):
+    monkeypatch.setattr(relevance, "np", None)
+    docs = _docs(40, seed=2)
+    index = _index(docs)
+    index.add(3, "python python cache")  # update in place
+    docs[3] = "python python cache"
+    for doc_id in (5, 8, 13):
+        index.remove(doc_id)
+        del docs[doc_id]
+    index.remove(999)  # unknown ids are ignored
+    index.add(41, "sqlite query plan")  # reuses a freed slot
+    docs[41] = "sqlite query plan"
+
+    assert len(index) == len(docs) and 5 not in index and 41 in index
+    assert len(index._doc_ids) == 40
+    fresh = _index(docs)
+    for query in ("python cache", "sqlite query", "budget report"):
+        got, expected = index.top_k(query, 10), fresh.top_k(query, 10)
+        assert [doc_id for doc_id, _ in got] == [doc_id for doc_id, _ in expected]
+        assert [score for _, score in got] == pytest.approx([score for _, score in expected])
+    assert all(doc_id not in (5, 8, 13) for doc_id, _ in index.top_k("python numpy index", 50))
+
+
+def test_score_related_knowledge(tmp_path):
+    knowledge = KnowledgeManager(str(tmp_path))
+    cache = knowledge.add_entry("Caching", "Use an LRU cache in front of slow queries")
+    sqlite = knowledge.add_entry("SQLite tips", "Index the columns your slow queries filter on")
+    knowledge.add_entry("Gardening", "Water tomatoes in the morning")
+    tasks = TaskManager(str(tmp_path))
+    task = tasks.add_task("Speed up slow queries", "maybe add a cache")
+    assistant = AIAssistant(tasks, knowledge)
+
+    scored = assistant.score_related_knowledge(task)
+    assert [entry.id for entry, _ in scored] == [cache.id, sqlite.id]
+    assert scored[0][1] > scored[1][1] > 0
+
+    knowledge.update_entry(sqlite.id, content="cache cache cache slow queries")
+    knowledge.delete_entry(cache.id)
+    assert [entry.id for entry in assistant.find_related_knowledge(task)] == [sqlite.id]
@@ -0,0 +1,90 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.knowledge_manager import KnowledgeEntry, KnowledgeManager  # noqa: E402
+from src.semantic_index import SemanticIndex, hashing_embedder  # noqa: E402
+
+
+def _entry(entry_id, title, content, updated_at="2024-01-01T00:00:00"):
+    return KnowledgeEntry(entry_id, title, content, [], [], [], updated_at, updated_at, [])
+
+
+class CountingEmbedder:
+    """hashing_embedder that records which texts it was asked to embed."""
+
+    def __init__(self, dim=64):
+        self.inner = hashing_embedder(dim)
+        self.dim = dim
+        self.seen = []
+
+    def __call__(self, texts):
+        self.seen.extend(texts)
+        return self.inner(texts)
+
+
+def test_sync_embeds_only_new_or_changed_entries(tmp_path):
+    embed = CountingEmbedder()
+    index = SemanticIndex(tmp_path / "kb", embed=embed)
+    entries = [_entry(i, f"note {i}", f"content about topic {i}") for i in range(1, 6)]
+    assert index.sync(entries) == 5
+
+    embed.seen.clear()
+    assert index.sync(entries) == 0
+    assert embed.seen == []
+
+    entries[1] = _entry(2, "note 2", "rewritten about caching", updated_at="2024-02-01T00:00:00")
+    entries[2].content = "edited without touching updated_at"
+    assert index.sync(entries) == 1
+    assert embed.seen == ["note 2\nrewritten about caching"]
+    assert index.search("rewritten caching", 1)[0][0] == 2
+
+
+def test_deleted_rows_are_reused(tmp_path):
+    index = SemanticIndex(tmp_path / "kb", embed=CountingEmbedder())
+    entries = [_entry(i, f"note {i}", f"words {i}") for i in range(1, 5)]
+    index.sync(entries)
+    freed_row = index._rows[3][0]
+
+    index.sync([e for e in entries if e.id != 3])
+    assert 3 not in index._rows
+    assert all(entry_id != 3 for entry_id, _ in index.search("note 3 words 3", 10))
+
+    index.sync([e for e in entries if e.id != 3] + [_entry(9, "fresh", "new entry text")])
+    assert index._rows[9][0] == freed_row
+    assert index._capacity == 64
+    assert index.search("fresh new entry text", 1)[0][0] == 9
+
+
+def test_matrix_reloads_from_disk(tmp_path):
+    entries = [_entry(i, f"note {i}", f"distinct words number {i} " * i) for i in range(1, 8)]
+    index = SemanticIndex(tmp_path / "kb", embed=CountingEmbedder())
+    index.sync(entries)
+    before = [index.search(f"number {i}", 3) for i in range(1, 8)]
+
+    embed = CountingEmbedder()
+    reloaded = SemanticIndex(tmp_path / "kb", embed=embed)
+    assert reloaded.sync(entries) == 0
+    assert isinstance(reloaded._matrix, np.memmap)
+    assert [reloaded.search(f"number {i}", 3) for i in range(1, 8)] == before
+    assert embed.seen == [f"number {i}" for i in range(1, 8)]  # queries only
+
+    # a different embedding size starts over instead of misreading the file
+    assert SemanticIndex(tmp_path / "kb", embed=CountingEmbedder(dim=32)).sync(entries) == 7
+
+
+def test_semantic_search_many_matches_single_queries(tmp_path):
+    knowledge = KnowledgeManager(str(tmp_path), embedder=hashing_embedder(128))
+    knowledge.add_entry("Caching", "Use an LRU cache in front of slow queries")
+    knowledge.add_entry("SQLite tips", "Index the columns your slow queries filter on")
+    knowledge.add_entry("Gardening", "Water tomatoes early in the morning")
+    knowledge.add_entry("Travel", "Book flights and hotels before the conference")
+    queries = ["slow queries cache", "water the tomatoes", "book a hotel", "nothing matches zzz"]
+
+    batch = knowledge.semantic_search_many(queries, k=3)
+    single = [knowledge.semantic_search(q, k=3) for q in queries]
+    for batch_hits, single_hits in zip(batch, single):
+        assert [e.id for e, _ in batch_hits] == [e.id for e, _ in single_hits]
+        assert [s for _, s in batch_hits] == pytest.approx([s for _, s in single_hits])
+    assert batch[0][0][0].title == "Caching"
+    assert batch[1][0][0].title == "Gardening"
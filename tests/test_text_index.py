@@ -0,0 +1,58 @@
+import random
+
+from text_index import KnowledgeGaps, KnowledgeIndex
+
+
+def _entry(id_, title, content="", tags=()):
+    return {"id": id_, "title": title, "content": content, "tags": list(tags)}
+
+
+def test_search_ranks_by_overlap_and_tags():
+    index = KnowledgeIndex([
+        _entry(1, "Git Tips", "Common git commands"),
+        _entry(2, "Python Tips", "Use pathlib", tags=["python", "best-practices"]),
+        _entry(3, "Cooking", "Pasta recipes"),
+    ])
+    assert [e["id"] for e in index.search("fix python git tips")] == [2, 1]
+    assert [e["id"] for e in index.search("best practices")] == [2]
+    assert index.search("pasta recipes", limit=1)[0]["id"] == 3
+
+
+def test_add_replaces_and_remove_drops_postings():
+    index = KnowledgeIndex([_entry(1, "Git Tips", "rebase")])
+    index.add(_entry(1, "Docker", "containers"))
+    assert index.search("rebase") == []
+    assert index.search("docker")[0]["title"] == "Docker"
+    index.remove(1)
+    assert index.search("docker") == [] and len(index) == 0
+
+
+def test_knowledge_gaps_track_incremental_changes():
+    gaps = KnowledgeGaps()
+    gaps.tasks.sync({1: "deploy the docker cluster", 2: "docker cleanup", 3: "write report"})
+    gaps.knowledge.sync({1: "Report writing tips"})
+    assert gaps.top(2) == [("docker", 2), ("cleanup", 1)]
+
+    gaps.knowledge.add(2, "Docker basics")
+    assert "docker" not in dict(gaps.top(10))
+
+    gaps.knowledge.remove(2)
+    gaps.tasks.remove(2)
+    assert gaps.top(1) == [("cluster", 1)]
+
+
+def test_knowledge_gaps_top_matches_a_full_scan():
+    rng = random.Random(7)
+    words = [f"w{i}" for i in range(40)]
+    gaps = KnowledgeGaps()
+    for step in range(2000):
+        index, doc_id = rng.choice([(gaps.tasks, rng.randint(1, 30)), (gaps.knowledge, rng.randint(1, 5))])
+        if rng.random() < 0.2:
+            index.remove(doc_id)
+        else:
+            index.add(doc_id, " ".join(rng.sample(words, rng.randint(1, 4))))
+        if step % 50 == 0:
+            uncovered = {t: c for t, c in gaps.tasks._df.items() if not gaps.knowledge.df(t)}
+            expected = sorted(uncovered.items(), key=lambda item: (-item[1], item[0]))[:8]
+            assert gaps.top(8) == expected
+    assert len(gaps._heap) <= 2 * len(gaps._gaps) + 64
@@ -0,0 +1,230 @@
+"""In-memory text indexes used by the AI agent.
+
+Both the task and knowledge files are small JSON lists, but the agent asks
+the same "which entries mention these words?" question many times per
+command. The indexes below answer it from postings lists and term counts
+instead of re-scanning every entry's text.
+"""
+import heapq
+import re
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_RE = re.compile(r"\w+")
+
+STOPWORDS = frozenset("""
+a about after all also an and any are as at be been but by can could do does
+for from had has have how i if in into is it its me my no not of on or our out
+so some that the their them then there these they this to up us was we were
+what when where which who will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, in order."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def keywords(text: str) -> Set[str]:
+    """Distinct tokens with stopwords removed (falls back to all tokens)."""
+    tokens = set(tokenize(text))
+    return (tokens - STOPWORDS) or tokens
+
+
+class KnowledgeIndex:
+    """Inverted index over knowledge entries: token -> entry ids.
+
+    Title/content tokens and tag tokens are kept in separate postings so tag
+    matches can be weighted higher. Results are ranked by how many query
+    keywords an entry matches, ties broken by insertion order.
+    """
+
+    TAG_WEIGHT = 2
+
+    def __init__(self, entries: Iterable[Dict] = ()) -> None:
+        self.build(entries)
+
+    def build(self, entries: Iterable[Dict]) -> None:
+        self._text_postings: Dict[str, Set[int]] = {}
+        self._tag_postings: Dict[str, Set[int]] = {}
+        self._entries: Dict[int, Dict] = {}
+        self._terms: Dict[int, tuple] = {}
+        self._order: Dict[int, int] = {}
+        self._seq = 0
+        for entry in entries:
+            self.add(entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, entry: Dict) -> None:
+        """Index an entry, replacing any previous version with the same id."""
+        entry_id = entry["id"]
+        if entry_id in self._entries:
+            self.remove(entry_id)
+        text_terms = set(tokenize(entry["title"] + " " + entry["content"]))
+        tag_terms = set()
+        for tag in entry.get("tags") or []:
+            tag = tag.lower()
+            tag_terms.add(tag)
+            tag_terms.update(tokenize(tag))
+        for term in text_terms:
+            self._text_postings.setdefault(term, set()).add(entry_id)
+        for term in tag_terms:
+            self._tag_postings.setdefault(term, set()).add(entry_id)
+        self._entries[entry_id] = entry
+        self._terms[entry_id] = (text_terms, tag_terms)
+        self._order[entry_id] = self._seq
+        self._seq += 1
+
+    def remove(self, entry_id: int) -> None:
+        if entry_id not in self._entries:
+            return
+        text_terms, tag_terms = self._terms.pop(entry_id)
+        for postings, terms in ((self._text_postings, text_terms), (self._tag_postings, tag_terms)):
+            for term in terms:
+                ids = postings.get(term)
+                if ids is not None:
+                    ids.discard(entry_id)
+                    if not ids:
+                        del postings[term]
+        del self._entries[entry_id]
+        del self._order[entry_id]
+
+    def search(self, text: str, limit: Optional[int] = None) -> List[Dict]:
+        """Entries sharing keywords with ``text``, best match first."""
+        scores: Counter = Counter()
+        for term in keywords(text):
+            ids = self._text_postings.get(term)
+            if ids:
+                scores.update(ids)
+            ids = self._tag_postings.get(term)
+            if ids:
+                for _ in range(self.TAG_WEIGHT):
+                    scores.update(ids)
+        if not scores:
+            return []
+
+        order = self._order
+        rank = lambda item: (-item[1], order[item[0]])  # noqa: E731
+        if limit is not None and limit < len(scores):
+            best = heapq.nsmallest(limit, scores.items(), key=rank)
+        else:
+            best = sorted(scores.items(), key=rank)
+        return [self._entries[entry_id] for entry_id, _ in best]
+
+
+def entry_text(entry: Dict) -> str:
+    """Searchable text of a knowledge entry (title, content and tags)."""
+    return " ".join([entry["title"], entry["content"], *(entry.get("tags") or [])])
+
+
+class TermFrequencyIndex:
+    """Document frequency of every term over a changing set of documents.
+
+    Documents are re-tokenized only when their text changes; ``on_change``
+    is called with ``(term, document_frequency)`` whenever a count moves.
+    """
+
+    def __init__(self, on_change: Optional[Callable[[str, int], None]] = None) -> None:
+        self.on_change = on_change
+        self._texts: Dict[int, str] = {}
+        self._terms: Dict[int, Set[str]] = {}
+        self._df: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def df(self, term: str) -> int:
+        return self._df.get(term, 0)
+
+    @staticmethod
+    def terms(text: str) -> Set[str]:
+        return {t for t in tokenize(text) if len(t) > 1 and t not in STOPWORDS}
+
+    def add(self, doc_id: int, text: str) -> bool:
+        """Index or re-index a document; returns False if its text is unchanged."""
+        if self._texts.get(doc_id) == text:
+            return False
+        old = self._terms.get(doc_id, set())
+        new = self.terms(text)
+        self._texts[doc_id] = text
+        self._terms[doc_id] = new
+        for term in old - new:
+            self._bump(term, -1)
+        for term in new - old:
+            self._bump(term, 1)
+        return True
+
+    def remove(self, doc_id: int) -> None:
+        if doc_id not in self._texts:
+            return
+        del self._texts[doc_id]
+        for term in self._terms.pop(doc_id):
+            self._bump(term, -1)
+
+    def sync(self, docs: Dict[int, str]) -> int:
+        """Make the index match ``docs``; returns how many documents changed."""
+        changed = 0
+        for doc_id in [d for d in self._texts if d not in docs]:
+            self.remove(doc_id)
+            changed += 1
+        for doc_id, text in docs.items():
+            changed += self.add(doc_id, text)
+        return changed
+
+    def _bump(self, term: str, delta: int) -> None:
+        count = self._df.get(term, 0) + delta
+        if count:
+            self._df[term] = count
+        else:
+            self._df.pop(term, None)
+        if self.on_change:
+            self.on_change(term, count)
+
+
+class KnowledgeGaps:
+    """Terms used in tasks that no knowledge entry mentions.
+
+    The gap set is kept up to date from term-frequency change events, so
+    editing one task or entry costs time proportional to its own terms.
+    Gaps are also pushed onto a heap ordered like ``top``'s result; entries
+    left stale by later changes are dropped when they surface, so ``top(n)``
+    does not scan every gap.
+    """
+
+    def __init__(self) -> None:
+        self._gaps: Dict[str, int] = {}  # term -> number of tasks using it
+        self._heap: List[Tuple[int, str]] = []  # (-task count, term), may hold stale entries
+        self.tasks = TermFrequencyIndex(self._task_term_changed)
+        self.knowledge = TermFrequencyIndex(self._knowledge_term_changed)
+
+    def _set(self, term: str, count: int) -> None:
+        if count:
+            self._gaps[term] = count
+            heapq.heappush(self._heap, (-count, term))
+            if len(self._heap) > 2 * len(self._gaps) + 64:
+                # mostly stale: rebuild from the live gaps
+                self._heap = [(-c, t) for t, c in self._gaps.items()]
+                heapq.heapify(self._heap)
+        else:
+            self._gaps.pop(term, None)
+
+    def _task_term_changed(self, term: str, count: int) -> None:
+        if not self.knowledge.df(term):
+            self._set(term, count)
+
+    def _knowledge_term_changed(self, term: str, count: int) -> None:
+        self._set(term, 0 if count else self.tasks.df(term))
+
+    def top(self, n: int = 5) -> List[tuple]:
+        """The ``n`` most common uncovered task terms as (term, task count)."""
+        found: List[Tuple[int, str]] = []
+        while self._heap and len(found) < n:
+            entry = heapq.heappop(self._heap)
+            neg_count, term = entry
+            if self._gaps.get(term) == -neg_count and (not found or found[-1] != entry):
+                found.append(entry)
+        for entry in found:
+            heapq.heappush(self._heap, entry)
+        return [(term, -neg_count) for neg_count, term in found]
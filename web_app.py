@@ -6,27 +6,38 @@ Opens browser automatically at http://localhost:5000
 """
 from __future__ import annotations
 
+import os
 import webbrowser
 from pathlib import Path
 from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash
-from pkms.storage.json_store import JSONStore
+from flask import Flask, Response, render_template, request, redirect, url_for, flash
+from pkms.metrics import REGISTRY, task_gauges
+from pkms.storage.registry import open_store
 from pkms.models import Task
+from pkms.summarizer import PkmsSource, SummaryPipeline
 
 app = Flask(__name__)
 app.secret_key = "pkms-secret-key-change-in-production"
 
-# Use demo_tasks.json in repo root by default
+# Use demo_tasks.json in repo root by default; PKMS_STORAGE / PKMS_PATH pick another backend
 DATA_FILE = Path(__file__).parent / "demo_tasks.json"
-store = JSONStore(DATA_FILE)
+STORAGE = os.getenv("PKMS_STORAGE", "json")
+DEMO = STORAGE == "json" and not os.getenv("PKMS_PATH")
+store = open_store(
+    STORAGE,
+    DATA_FILE if DEMO else os.getenv("PKMS_PATH"),
+    # the tracked demo file is never archived; real data moves tasks done 30+ days ago to the cold tier
+    **({} if DEMO else {"archive_after_days": 30}),
+)
 
 
 @app.route("/")
 def index():
     """Main page: list all tasks."""
-    tasks = store.list(include_done=False)
-    completed = store.list(include_done=True)
-    completed = [t for t in completed if t.done]
+    # one read of the hot tier; archived history stays on disk until asked for
+    tasks, completed = [], []
+    for t in store.list(include_done=True, include_archived=False):
+        (completed if t.done else tasks).append(t)
     return render_template("index.html", tasks=tasks, completed=completed)
 
 
@@ -99,6 +110,12 @@ def suggest():
     return render_template("suggest.html", suggestion=suggestion, tasks=tasks)
 
 
+@app.route("/metrics")
+def metrics():
+    """Storage metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(task_gauges(store)), mimetype="text/plain; version=0.0.4")
+
+
 def open_browser():
     """Open the browser after a short delay."""
     import time
@@ -109,6 +126,8 @@ def open_browser():
 if __name__ == "__main__":
     import threading
     threading.Thread(target=open_browser, daemon=True).start()
+    # fill in summaries for long notes in the background; pages only read stored ones
+    SummaryPipeline(PkmsSource(store)).start()
     print("Starting PKMS web app at http://localhost:5001")
     print("Press Ctrl+C to stop")
     app.run(debug=True, use_reloader=False, port=5001)